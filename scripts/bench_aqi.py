@@ -0,0 +1,50 @@
+"""
+Benchmark: per-row compute_aqi_pm25 vs the vectorized AQI engine.
+
+    python -m scripts.bench_aqi --rows 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.features.aqi import POLLUTANTS, compute_aqi, compute_aqi_pm25_vectorized
+from src.features.build_features import compute_aqi_pm25
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--scalar-rows", type=int, default=1_000_000,
+                        help="rows timed on the per-row path (extrapolated to --rows)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        p: np.round(rng.gamma(2.0, 40.0, args.rows), 1) for p in POLLUTANTS
+    })
+    print(f"📦 {args.rows:,} rows x {len(POLLUTANTS)} pollutants")
+
+    # Per-row path on a sample (a full 10M .apply takes minutes)
+    sample = df["pm2_5"].iloc[:args.scalar_rows]
+    t0 = time.perf_counter()
+    scalar = sample.apply(compute_aqi_pm25).to_numpy()
+    scalar_s = (time.perf_counter() - t0) * args.rows / len(sample)
+    print(f"  scalar pm2_5 .apply   : {scalar_s:8.2f} s (extrapolated)")
+
+    t0 = time.perf_counter()
+    vector = compute_aqi_pm25_vectorized(df["pm2_5"].to_numpy())
+    vector_s = time.perf_counter() - t0
+    print(f"  vectorized pm2_5      : {vector_s:8.2f} s ({scalar_s / vector_s:.0f}x)")
+
+    t0 = time.perf_counter()
+    compute_aqi(df)
+    print(f"  all pollutants + argmax: {time.perf_counter() - t0:8.2f} s")
+
+    exact = np.array_equal(scalar, vector[:len(scalar)], equal_nan=True)
+    print(f"  matches scalar exactly: {exact}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: recursive one-step forecasting (ui/utils.generate_forecast
+with the GradientBoosting candidate) vs the direct multi-horizon
+forecaster, on the same held-out origins.
+
+    python -m scripts.bench_direct_forecast --rows 8918 --origins 40
+
+Both models are fitted on the first 80% of a synthetic history; every
+origin in the last 20% forecasts 72h and is scored per horizon.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from scripts.bench_hist_boosting import make_history
+from src.features.feature_engineering import create_lag_features, epoch_hours, FEATURES, TARGET
+from src.models.direct_forecast import DirectForecaster, HourlySeries
+from src.models.train_models import CANDIDATES
+from src.utils.config import FORECAST_HORIZON_HOURS
+from ui.utils import generate_forecast
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=8918)
+    parser.add_argument("--origins", type=int, default=40)
+    args = parser.parse_args()
+
+    horizon = FORECAST_HORIZON_HOURS
+    raw = make_history(args.rows)
+    series = HourlySeries.from_frame(raw)
+    split_hour = series.start + int(args.rows * 0.8)
+
+    # --- Fit both on the first 80% ---
+    lagged = create_lag_features(raw)
+    train = epoch_hours(lagged) < split_hour
+    gb_cls, gb_params = CANDIDATES["GradientBoosting"]
+    t0 = time.perf_counter()
+    one_step = gb_cls(**gb_params).fit(lagged.loc[train, FEATURES], lagged.loc[train, TARGET])
+    one_step_fit = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    direct = DirectForecaster().fit(raw, until_hour=split_hour)
+    direct_fit = time.perf_counter() - t0
+
+    # --- Forecast from evenly spaced held-out origins ---
+    origins = np.linspace(split_hour + 48, series.end - horizon, args.origins).astype("int64")
+    actual = series.at(origins[:, None] + np.arange(1, horizon + 1)[None, :])
+    rec_pred = np.empty_like(actual)
+    dir_pred = np.empty_like(actual)
+    rec_sec = dir_sec = 0.0
+
+    for i, origin in enumerate(origins):
+        history = raw.iloc[: origin - series.start + 1]
+
+        t0 = time.perf_counter()
+        rec_pred[i] = generate_forecast(history, one_step, days=horizon // 24)["aqi_predicted"]
+        rec_sec += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        dir_pred[i] = direct.forecast(history, horizon)["aqi_predicted"]
+        dir_sec += time.perf_counter() - t0
+
+    rec_mae = np.abs(rec_pred - actual).mean(axis=0)
+    dir_mae = np.abs(dir_pred - actual).mean(axis=0)
+
+    print(f"📦 {args.rows:,} hours, {len(origins)} held-out origins, {horizon}h paths")
+    print(f"  fit            : recursive {one_step_fit:6.2f} s | direct {direct_fit:6.2f} s")
+    print(f"  latency / path : recursive {rec_sec / len(origins) * 1000:7.1f} ms | "
+          f"direct {dir_sec / len(origins) * 1000:7.1f} ms "
+          f"({rec_sec / dir_sec:.0f}x faster)")
+    print("  MAE by horizon : recursive | direct")
+    for h in [1, 6, 12, 24, 48, 72]:
+        print(f"    h={h:<3}        : {rec_mae[h - 1]:9.2f} | {dir_mae[h - 1]:6.2f}")
+    print(f"    mean         : {rec_mae.mean():9.2f} | {dir_mae.mean():6.2f}")
+
+
+if __name__ == "__main__":
+    main()
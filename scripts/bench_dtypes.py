@@ -0,0 +1,52 @@
+"""
+Benchmark: memory per 1M rows of feature frames, pandas-default dtypes
+vs the compact dtype policy (src/features/schema.py).
+
+    python -m scripts.bench_dtypes --rows 1000000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from src.features.build_features import build_features
+from src.features.feature_engineering import create_lag_features, FEATURES
+from src.features.schema import apply_dtype_policy, memory_per_million_rows, widen_dtypes
+from src.utils.config import HOURLY_VARIABLES
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    raw = pd.DataFrame({
+        "timestamp": pd.date_range("2000-01-01", periods=args.rows, freq="h", tz="UTC"),
+        **{v: np.round(rng.gamma(2.0, 20.0, args.rows), 1) for v in HOURLY_VARIABLES},
+    })
+    print(f"📦 {args.rows:,} hourly rows")
+
+    # Ingestion: what build_features hands to the feature store
+    compact = build_features(raw)
+    default = widen_dtypes(compact)
+
+    # Training: frame loaded from the store → lag + time features
+    train_compact = create_lag_features(apply_dtype_policy(compact, keep_event_id=False))
+    train_default = widen_dtypes(create_lag_features(default))
+
+    mb = 1024 * 1024
+    for name, before, after in [
+        ("build_features", default, compact),
+        ("training frame", train_default, train_compact),
+    ]:
+        b = memory_per_million_rows(before) / mb
+        a = memory_per_million_rows(after) / mb
+        print(f"  {name:<15}: {b:7.1f} MB → {a:7.1f} MB per 1M rows ({1 - a / b:.0%} less)")
+
+    X = train_compact[FEATURES].to_numpy()
+    print(f"  training matrix dtype : {X.dtype}")
+
+
+if __name__ == "__main__":
+    main()
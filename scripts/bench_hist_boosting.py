@@ -0,0 +1,95 @@
+"""
+Benchmark: training time of exact-split GradientBoosting vs the binned
+HistGradientBoosting candidate at 1x / 10x / 100x the current history
+(8,870 samples).
+
+    python -m scripts.bench_hist_boosting --scales 1 10 100 --max-exact-scale 10
+
+Exact GradientBoosting grows roughly linearly with rows, so by default it
+is only timed up to --max-exact-scale and the rest is extrapolated.
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_squared_error
+
+from src.features.feature_engineering import create_lag_features, epoch_hours, FEATURES, TARGET
+from src.models.hist_boosting import BinnedFeatureCache
+from src.models.train_models import CANDIDATES
+
+BASE_SAMPLES = 8870
+
+
+def make_history(rows, start="2000-01-01", seed=0):
+    """Synthetic hourly AQI history (also the tests' `hourly_aqi` fixture)."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(rows)
+    # Daily cycle + slow mean-reverting drift + noise
+    drift = pd.Series(rng.normal(0, 6, rows)).ewm(alpha=0.02).mean().to_numpy() * 10
+    aqi = 110 + 35 * np.sin(2 * np.pi * t / 24) + drift + rng.normal(0, 4, rows)
+    return pd.DataFrame({
+        "timestamp": pd.date_range(start, periods=rows, freq="h", tz="UTC"),
+        "aqi": np.clip(aqi, 0, 500).astype("float32"),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--max-exact-scale", type=int, default=10)
+    args = parser.parse_args()
+
+    gb_cls, gb_params = CANDIDATES["GradientBoosting"]
+    hgb_cls, hgb_params, _ = CANDIDATES["HistGradientBoosting"]
+    exact_rate = None
+
+    for scale in args.scales:
+        df = create_lag_features(make_history(BASE_SAMPLES * scale + 48))
+        X = df[FEATURES].to_numpy()
+        y = df[TARGET].to_numpy()
+        split = int(len(df) * 0.8)
+        keys = epoch_hours(df)[:split]
+        print(f"📦 {scale}x: {len(df):,} samples")
+
+        folder = tempfile.mkdtemp(prefix="hgb_bins_")
+        try:
+            cache = BinnedFeatureCache(root=folder)
+            t0 = time.perf_counter()
+            edges, codes = cache.transform(keys, X[:split], FEATURES)
+            cold = time.perf_counter() - t0
+
+            # Daily rerun over unchanged rows: every code comes from the cache
+            t0 = time.perf_counter()
+            cache.transform(keys, X[:split], FEATURES)
+            warm = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            hgb = hgb_cls(bin_edges=edges, **hgb_params).fit(codes, y[:split])
+            hgb_fit = time.perf_counter() - t0
+            hgb_rmse = mean_squared_error(y[split:], hgb.predict(X[split:])) ** 0.5
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+        print(f"  binning cold / cached : {cold:8.3f} s / {warm:.3f} s")
+        print(f"  HistGradientBoosting  : {hgb_fit:8.2f} s  ({hgb.n_iter_} iters, RMSE {hgb_rmse:.2f})")
+
+        if scale <= args.max_exact_scale:
+            t0 = time.perf_counter()
+            gb = gb_cls(**gb_params).fit(X[:split], y[:split])
+            gb_fit = time.perf_counter() - t0
+            exact_rate = gb_fit / split
+            gb_rmse = mean_squared_error(y[split:], gb.predict(X[split:])) ** 0.5
+            print(f"  GradientBoosting      : {gb_fit:8.2f} s  (RMSE {gb_rmse:.2f}, "
+                  f"{gb_fit / hgb_fit:.1f}x slower)")
+        elif exact_rate is not None:
+            gb_fit = exact_rate * split
+            print(f"  GradientBoosting      : {gb_fit:8.2f} s  (extrapolated, "
+                  f"{gb_fit / hgb_fit:.1f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
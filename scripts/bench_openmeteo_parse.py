@@ -0,0 +1,87 @@
+"""
+Benchmark: Open-Meteo JSON -> frame, current pandas path vs Arrow fast path.
+
+Builds a synthetic response body (default: 3 years of hourly data) and
+reports wall time and peak memory for each parser.
+
+    python -m scripts.bench_openmeteo_parse --years 3 --repeat 3
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.data_ingestion.fetch_openmeteo import parse_hourly_arrow
+from src.utils.config import HOURLY_VARIABLES
+
+
+def make_payload(hours):
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2020-01-01", periods=hours, freq="h")
+    hourly = {"time": times.strftime("%Y-%m-%dT%H:%M").tolist()}
+    for var in HOURLY_VARIABLES:
+        hourly[var] = np.round(rng.gamma(2.0, 20.0, hours), 1).tolist()
+    return json.dumps({"hourly": hourly}).encode("utf-8")
+
+
+def parse_pandas(content):
+    # Mirrors fetch_openmeteo_data()
+    data = json.loads(content)
+    df = pd.DataFrame(data["hourly"])
+    df["timestamp"] = pd.to_datetime(df["time"], utc=True)
+    df.drop(columns=["time"], inplace=True)
+    return df
+
+
+def bench_pandas(content, repeat):
+    best = float("inf")
+    peak = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        df = parse_pandas(content)
+        best = min(best, time.perf_counter() - t0)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del df
+    return best, peak
+
+
+def bench_arrow(content, repeat):
+    best = float("inf")
+    peak = 0
+    for _ in range(repeat):
+        # Arrow buffers live outside the Python heap, so track them with a
+        # dedicated proxy pool and add whatever Python itself allocates
+        pool = pa.proxy_memory_pool(pa.default_memory_pool())
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        table = parse_hourly_arrow(content, memory_pool=pool)
+        best = min(best, time.perf_counter() - t0)
+        peak = max(peak, pool.max_memory() + tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del table
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    hours = int(args.years * 365 * 24)
+    content = make_payload(hours)
+    print(f"📦 Payload: {hours} hours, {len(content) / 1e6:.1f} MB")
+
+    for name, bench in [("pandas", bench_pandas), ("arrow", bench_arrow)]:
+        seconds, peak = bench(content, args.repeat)
+        print(f"{name:>7}: {seconds * 1000:8.1f} ms | peak {peak / 1e6:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,14 @@ os.environ["HOPSWORKS_DISABLE_MODEL_SERVING"] = "1"
 from dotenv import load_dotenv
 load_dotenv()
 
-import hopsworks
 import pandas as pd
 
-from src.models.train_models import train_models
+from src.feature_store.connect import connect_feature_store
+from src.features.schema import apply_dtype_policy, memory_per_million_rows
+from src.models.train_models import train_models, build_candidates
+from src.models.cross_validation import cross_validate
+from src.models.backtest import backtest
+from src.models.tuning import tune
 from src.models.evaluate import evaluate_models
 from src.models.save_model import save_models
 
@@ -16,25 +20,9 @@ def main():
     print("🚀 Starting DAILY training pipeline...")
 
     # -----------------------
-    # Login with retry
+    # Login with retry (or local store)
     # -----------------------
-    import time
-    
-    for attempt in range(3):
-        try:
-            project = hopsworks.login(
-                api_key_value=os.getenv("HOPSWORKS_API_KEY"),
-                project=os.getenv("HOPSWORKS_PROJECT_NAME"),
-            )
-            break
-        except Exception as e:
-            if attempt < 2:
-                print(f"⚠️ Login attempt {attempt + 1} failed, retrying...")
-                time.sleep(5)
-            else:
-                raise
-    
-    fs = project.get_feature_store()
+    fs = connect_feature_store(retries=3, wait=5)
 
     # -----------------------
     # Feature Group v5
@@ -67,8 +55,13 @@ def main():
     # -----------------------
     print("📥 Reading all data from Feature Store...")
     df = fv.get_batch_data()
+
+    # float32 / int8, timestamp as the only time key — training works on
+    # this frame without upcasting
+    df = apply_dtype_policy(df, keep_event_id=False)
     
-    print(f"📈 Total rows: {df.shape[0]}")
+    print(f"📈 Total rows: {df.shape[0]} "
+          f"({memory_per_million_rows(df) / 2**20:.1f} MB per 1M rows)")
     print(f"📋 Columns: {list(df.columns)}")
 
     # Verify aqi exists
@@ -86,8 +79,24 @@ def main():
     # -----------------------
     # Train → Evaluate → Save
     # -----------------------
+    print("🎯 Tuning hyperparameters (successive halving, budgeted)...")
+    best_params = tune(df)
+
     print("🔧 Training models...")
-    models, metrics = train_models(df)
+    models, metrics, holdout_models = train_models(df, params=best_params)
+
+    print("🔁 Cross-validating models (expanding window)...")
+    cv = cross_validate(df, candidates=build_candidates(best_params))
+    if cv is not None:
+        for name, summary in cv["summary"].items():
+            metrics[name].update(summary)
+
+    # Models fitted before the holdout, so the backtest stays out-of-sample
+    print("🔮 Backtesting 72h forecasts (rolling origin)...")
+    bt = backtest(df, holdout_models)
+    if bt is not None:
+        for name, summary in bt["summary"].items():
+            metrics[name].update(summary)
     
     print("📊 Evaluating models...")
     evaluate_models(metrics)
@@ -1,52 +1,192 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import io
+
 import requests
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pa_json
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from src.utils.config import LATITUDE, LONGITUDE, OPEN_METEO_URL
+from src.utils.config import (
+    LATITUDE,
+    LONGITUDE,
+    OPEN_METEO_URL,
+    HOURLY_VARIABLES,
+    FETCH_MAX_WORKERS,
+    RATE_LIMIT_MAX_RETRIES,
+)
+from src.data_ingestion.rate_limit import get_rate_limiter, parse_retry_after
+from src.data_ingestion.response_cache import cache_key
 
 
-def fetch_openmeteo_data(start_date, end_date=None):
-    session = requests.Session()
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
 
-    retries = Retry(
-        total=5,
-        backoff_factor=1,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET"]
-    )
 
-    session.mount("https://", HTTPAdapter(max_retries=retries))
+def get_session(pool_size=FETCH_MAX_WORKERS):
+    """
+    Return the process-wide pooled session.
+    Built once so every fetch reuses the same keep-alive connections
+    and retry adapter instead of opening a new one per call.
+    """
+    global _SESSION
 
-    # 🔑 Open-Meteo REQUIRES end_date if start_date exists
-    if end_date is None:
-        end_date = start_date
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+
+            retries = Retry(
+                total=5,
+                backoff_factor=1,
+                # 429s are handled by the shared rate limiter in _request
+                status_forcelist=[500, 502, 503, 504],
+                allowed_methods=["GET"]
+            )
+
+            adapter = HTTPAdapter(
+                max_retries=retries,
+                pool_connections=pool_size,
+                pool_maxsize=pool_size,
+            )
+            session.mount("https://", adapter)
+            _SESSION = session
+
+    return _SESSION
 
+
+def _request(session, latitude, longitude, start_date, end_date):
     params = {
-        "latitude": LATITUDE,
-        "longitude": LONGITUDE,
+        "latitude": latitude,
+        "longitude": longitude,
         # ✅ MUST be comma-separated string
-        "hourly": (
-            "pm2_5,pm10,carbon_monoxide,"
-            "nitrogen_dioxide,sulphur_dioxide,ozone"
-        ),
+        "hourly": ",".join(HOURLY_VARIABLES),
         "start_date": start_date,
         "end_date": end_date,
         "timezone": "UTC"
     }
 
-    response = session.get(
-        OPEN_METEO_URL,
-        params=params,
-        timeout=30
-    )
+    limiter = get_rate_limiter()
+
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        if attempt:
+            limiter.on_retry()
+        limiter.acquire()
+
+        response = session.get(
+            OPEN_METEO_URL,
+            params=params,
+            timeout=30
+        )
+
+        if response.status_code != 429:
+            limiter.on_success()
+            break
+
+        limiter.on_throttled(parse_retry_after(response.headers.get("Retry-After")))
+
     response.raise_for_status()
 
-    data = response.json()
+    return response
 
-    if "hourly" not in data:
+
+def _request_hourly(session, latitude, longitude, start_date, end_date):
+    response = _request(session, latitude, longitude, start_date, end_date)
+    return response.json().get("hourly")
+
+
+def _split_hourly_by_day(hourly):
+    """Split one `hourly` payload into {YYYY-MM-DD: hourly} chunks."""
+    days = {}
+    times = hourly["time"]
+    for i, ts in enumerate(times):
+        day = ts[:10]
+        if day not in days:
+            days[day] = {k: [] for k in hourly}
+        chunk = days[day]
+        for k, values in hourly.items():
+            chunk[k].append(values[i])
+    return days
+
+
+def _fetch_hourly_cached(session, cache, latitude, longitude, start_date, end_date):
+    """
+    Serve settled days from the raw cache and only request the rest.
+
+    A day is settled once it is strictly before today (UTC) and has all
+    24 hours. Only settled days are written back, so today's still-
+    changing hours are always re-requested.
+    """
+    today = datetime.utcnow().date()
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+
+    days = [
+        (start + timedelta(days=i)).strftime("%Y-%m-%d")
+        for i in range((end - start).days + 1)
+    ]
+
+    by_day = {}
+    missing = []
+    for day in days:
+        payload = cache.get(cache_key(latitude, longitude, HOURLY_VARIABLES, day))
+        if payload is not None:
+            by_day[day] = payload
+        else:
+            missing.append(day)
+
+    if missing:
+        # One request spanning the missing days keeps the call count at
+        # one per run in the common "yesterday + today" case
+        hourly = _request_hourly(session, latitude, longitude, missing[0], missing[-1])
+        if hourly:
+            for day, chunk in _split_hourly_by_day(hourly).items():
+                if day not in missing:
+                    continue
+                by_day[day] = chunk
+                settled = (
+                    datetime.strptime(day, "%Y-%m-%d").date() < today
+                    and len(chunk["time"]) == 24
+                )
+                if settled:
+                    cache.put(
+                        cache_key(latitude, longitude, HOURLY_VARIABLES, day),
+                        chunk
+                    )
+
+    if not by_day:
+        return None
+
+    merged = {}
+    for day in sorted(by_day):
+        for k, values in by_day[day].items():
+            merged.setdefault(k, []).extend(values)
+    return merged
+
+
+def fetch_openmeteo_data(start_date, end_date=None,
+                         latitude=LATITUDE, longitude=LONGITUDE,
+                         session=None, cache=None):
+    session = session or get_session()
+
+    # 🔑 Open-Meteo REQUIRES end_date if start_date exists
+    if end_date is None:
+        end_date = start_date
+
+    if cache is None:
+        hourly = _request_hourly(session, latitude, longitude, start_date, end_date)
+    else:
+        hourly = _fetch_hourly_cached(
+            session, cache, latitude, longitude, start_date, end_date
+        )
+
+    if not hourly:
         return pd.DataFrame()
 
-    df = pd.DataFrame(data["hourly"])
+    df = pd.DataFrame(hourly)
 
     # ✅ Correct timestamp
     df["timestamp"] = pd.to_datetime(df["time"], utc=True)
@@ -56,3 +196,125 @@ def fetch_openmeteo_data(start_date, end_date=None):
     df.drop(columns=["time"], inplace=True)
 
     return df
+
+
+def parse_hourly_arrow(content, memory_pool=None):
+    """
+    Decode a raw Open-Meteo response body straight into Arrow buffers.
+
+    The JSON is parsed by Arrow's C++ reader against an explicit schema,
+    so the hourly lists never become Python objects:
+      - pollutants   -> float32 columns
+      - event_id     -> int64 epoch seconds (same key as build_features)
+      - timestamp    -> timestamp[s, UTC] view of event_id
+
+    Returns a pyarrow.Table (empty if the body has no `hourly` block).
+    """
+    schema = pa.schema([
+        ("hourly", pa.struct(
+            [("time", pa.list_(pa.string()))]
+            + [(v, pa.list_(pa.float32())) for v in HOURLY_VARIABLES]
+        ))
+    ])
+
+    table = pa_json.read_json(
+        io.BytesIO(content),
+        # The whole body is one JSON line, so one block must hold it
+        read_options=pa_json.ReadOptions(block_size=len(content) + 1),
+        parse_options=pa_json.ParseOptions(
+            explicit_schema=schema,
+            unexpected_field_behavior="ignore"
+        ),
+        memory_pool=memory_pool
+    )
+
+    hourly = table.column("hourly").combine_chunks(memory_pool=memory_pool)
+    if hourly.null_count == len(hourly):
+        return pa.table({})
+
+    epoch = pc.strptime(
+        hourly.field("time").flatten(),
+        format="%Y-%m-%dT%H:%M",
+        unit="s",
+        memory_pool=memory_pool
+    ).cast(pa.int64())
+
+    columns = {v: hourly.field(v).flatten() for v in HOURLY_VARIABLES}
+    columns["event_id"] = epoch
+    columns["timestamp"] = epoch.cast(pa.timestamp("s", tz="UTC"))
+
+    return pa.table(columns)
+
+
+def fetch_openmeteo_arrow(start_date, end_date=None,
+                          latitude=LATITUDE, longitude=LONGITUDE,
+                          session=None):
+    """
+    Same request as fetch_openmeteo_data, but returns a pyarrow.Table
+    built by parse_hourly_arrow() with no pandas step.
+    """
+    session = session or get_session()
+
+    if end_date is None:
+        end_date = start_date
+
+    response = _request(session, latitude, longitude, start_date, end_date)
+    return parse_hourly_arrow(response.content)
+
+
+def fetch_openmeteo_locations(locations, start_date, end_date=None,
+                              max_workers=FETCH_MAX_WORKERS, cache=None):
+    """
+    Fetch many monitoring points concurrently over one pooled session.
+
+    Args:
+        locations:   dict of {location_name: (latitude, longitude)}.
+        start_date:  first day (YYYY-MM-DD).
+        end_date:    last day (YYYY-MM-DD), defaults to start_date.
+        max_workers: upper bound on in-flight requests.
+        cache:       optional RawResponseCache shared by all workers.
+
+    Returns a long-format DataFrame with a `location` column, sorted by
+    (location, timestamp). Locations that fail are reported and skipped
+    so one bad point doesn't sink the whole hourly run.
+    """
+    if not locations:
+        return pd.DataFrame()
+
+    session = get_session()
+
+    def _fetch(item):
+        name, (lat, lon) = item
+        df = fetch_openmeteo_data(
+            start_date,
+            end_date,
+            latitude=lat,
+            longitude=lon,
+            session=session,
+            cache=cache
+        )
+        df["location"] = name
+        return df
+
+    frames = []
+    workers = max(1, min(max_workers, len(locations)))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_fetch, item): item[0]
+            for item in locations.items()
+        }
+        for future, name in futures.items():
+            try:
+                df = future.result()
+            except requests.RequestException as e:
+                print(f"⚠️ Fetch failed for {name}: {e}")
+                continue
+            if not df.empty:
+                frames.append(df)
+
+    if not frames:
+        return pd.DataFrame()
+
+    df = pd.concat(frames, ignore_index=True)
+    return df.sort_values(["location", "timestamp"]).reset_index(drop=True)
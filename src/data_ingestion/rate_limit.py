@@ -0,0 +1,125 @@
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from src.utils.config import (
+    RATE_LIMIT_PER_SEC,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_MIN_PER_SEC,
+)
+
+
+def parse_retry_after(value):
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP date).
+    Returns None when the header is missing or unparseable.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveRateLimiter:
+    """
+    Thread-safe token bucket shared by every ingestion worker in the
+    process.
+
+    The refill rate adapts AIMD-style: each 429 halves it (down to
+    `min_rate`) and pauses the whole bucket for Retry-After seconds;
+    each successful response nudges it back up towards `max_rate`.
+    """
+
+    def __init__(self, rate=RATE_LIMIT_PER_SEC, burst=RATE_LIMIT_BURST,
+                 min_rate=RATE_LIMIT_MIN_PER_SEC):
+        self.max_rate = float(rate)
+        self.min_rate = float(min_rate)
+        self.rate = float(rate)
+        self.burst = float(burst)
+
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+        self.counters = {
+            "requests": 0,
+            "queued": 0,
+            "throttled": 0,
+            "retried": 0,
+        }
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        waited = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._paused_until:
+                    self._refill(now)
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        self.counters["requests"] += 1
+                        if waited:
+                            self.counters["queued"] += 1
+                        return
+                    delay = (1.0 - self._tokens) / self.rate
+                else:
+                    delay = self._paused_until - now
+            waited = True
+            time.sleep(delay)
+
+    def on_success(self):
+        with self._lock:
+            # Additive increase: recover roughly 10% of the ceiling per hit
+            self.rate = min(self.max_rate, self.rate + 0.1 * self.max_rate)
+
+    def on_throttled(self, retry_after=None):
+        """Record a 429 and slow every worker down."""
+        with self._lock:
+            self.counters["throttled"] += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            now = time.monotonic()
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self._paused_until = max(self._paused_until, now + pause)
+            # Drop saved-up burst so the release after the pause is gentle
+            self._refill(now)
+            self._tokens = 0.0
+            self._last = max(now, self._paused_until)
+
+    def on_retry(self):
+        with self._lock:
+            self.counters["retried"] += 1
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, "rate": self.rate}
+
+
+_LIMITER = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the process-wide limiter shared by all fetch paths."""
+    global _LIMITER
+
+    with _LIMITER_LOCK:
+        if _LIMITER is None:
+            _LIMITER = AdaptiveRateLimiter()
+
+    return _LIMITER
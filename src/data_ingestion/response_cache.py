@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from src.utils.config import RAW_CACHE_DIR, RAW_CACHE_MAX_BYTES
+
+
+def cache_key(latitude, longitude, variables, day):
+    """
+    Content address for one day of raw hourly data at one point.
+    """
+    ident = json.dumps(
+        {
+            "lat": round(float(latitude), 4),
+            "lon": round(float(longitude), 4),
+            "vars": sorted(variables),
+            "day": day,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(ident.encode("utf-8")).hexdigest()
+
+
+class RawResponseCache:
+    """
+    On-disk cache of raw Open-Meteo `hourly` payloads, one JSON file per
+    (location, variable set, day).
+
+    Total size is capped at `max_bytes`; when a write goes over the cap
+    the least recently used entries are evicted. Recency is tracked in
+    memory and mirrored to file mtimes so it survives restarts.
+    """
+
+    def __init__(self, root=RAW_CACHE_DIR, max_bytes=RAW_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # key -> size, oldest first
+        self._bytes = 0
+        self._load_index()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def _load_index(self):
+        if not os.path.isdir(self.root):
+            return
+
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if not name.endswith(".json"):
+                    continue
+                st = os.stat(os.path.join(dirpath, name))
+                entries.append((st.st_mtime, name[:-5], st.st_size))
+
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._bytes += size
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._index:
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "r") as f:
+                    payload = json.load(f)
+            except (OSError, ValueError):
+                self._bytes -= self._index.pop(key)
+                return None
+
+            self._index.move_to_end(key)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return payload
+
+    def put(self, key, payload):
+        data = json.dumps(payload).encode("utf-8")
+        path = self._path(key)
+
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            self._bytes -= self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def size_bytes(self):
+        return self._bytes
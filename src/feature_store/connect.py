@@ -0,0 +1,32 @@
+import os
+import time
+
+from src.utils.config import FEATURE_STORE_BACKEND, LOCAL_STORE_DIR
+
+
+def connect_feature_store(retries=1, wait=5):
+    """
+    Return the feature store selected by FEATURE_STORE_BACKEND:
+      - "hopsworks" (default): logs in with HOPSWORKS_API_KEY /
+        HOPSWORKS_PROJECT_NAME, retrying up to `retries` times.
+      - "local": a LocalFeatureStore under LOCAL_STORE_DIR, no login.
+    """
+    if FEATURE_STORE_BACKEND == "local":
+        from src.feature_store.local_store import LocalFeatureStore
+        return LocalFeatureStore(LOCAL_STORE_DIR)
+
+    import hopsworks
+
+    for attempt in range(retries):
+        try:
+            project = hopsworks.login(
+                api_key_value=os.getenv("HOPSWORKS_API_KEY"),
+                project=os.getenv("HOPSWORKS_PROJECT_NAME"),
+            )
+            return project.get_feature_store()
+        except Exception:
+            if attempt < retries - 1:
+                print(f"⚠️ Login attempt {attempt + 1} failed, retrying...")
+                time.sleep(wait)
+            else:
+                raise
@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.features.feature_engineering import epoch_hours
+from src.utils.config import DEDUP_INDEX_DIR, DEFAULT_LOCATION
+
+
+class EventIdIndex:
+    """
+    Membership index of ingested event hours, one sorted int64 array of
+    epoch-hours per location, persisted as `<location>.npy` under
+    DEDUP_INDEX_DIR/<feature group>/.
+
+    filter_new() drops every row of a batch that is already in the store
+    (or repeated inside the batch) with vectorized searchsorted lookups,
+    so hourly runs and backfills can overlap freely.
+    """
+
+    def __init__(self, fg, root=DEDUP_INDEX_DIR):
+        self.path = os.path.join(root, f"{fg.name}_v{fg.version}")
+        self._hours = {}
+        self._dirty = set()
+
+    def _file(self, location):
+        return os.path.join(self.path, f"{location}.npy")
+
+    def hours(self, location=DEFAULT_LOCATION):
+        if location not in self._hours:
+            path = self._file(location)
+            if os.path.exists(path):
+                self._hours[location] = np.load(path)
+            else:
+                self._hours[location] = np.empty(0, dtype="int64")
+        return self._hours[location]
+
+    def contains(self, hours, location=DEFAULT_LOCATION):
+        """Boolean mask: which of `hours` are already indexed."""
+        known = self.hours(location)
+        hours = np.asarray(hours, dtype="int64")
+        if not len(known):
+            return np.zeros(len(hours), dtype=bool)
+        pos = np.searchsorted(known, hours)
+        pos[pos == len(known)] = 0
+        return known[pos] == hours
+
+    def _locations(self, df):
+        if "location" in df.columns:
+            return df["location"].astype(str).to_numpy()
+        return np.full(len(df), DEFAULT_LOCATION, dtype=object)
+
+    def filter_new(self, df):
+        """Rows of df whose (location, event hour) is not yet indexed."""
+        if df.empty:
+            return df
+
+        hours = epoch_hours(df)
+        locations = self._locations(df)
+
+        seen = np.zeros(len(df), dtype=bool)
+        for location in pd.unique(locations):
+            rows = locations == location
+            seen[rows] = self.contains(hours[rows], location)
+
+        # Also drop repeats inside the batch itself (keep the last copy)
+        repeated = pd.DataFrame({"l": locations, "h": hours}).duplicated(keep="last").to_numpy()
+
+        return df[~(seen | repeated)]
+
+    def add(self, df):
+        """Index every row of df (call after the push succeeded)."""
+        if df.empty:
+            return
+
+        hours = epoch_hours(df)
+        locations = self._locations(df)
+
+        for location in pd.unique(locations):
+            new = hours[locations == location]
+            self._hours[location] = np.union1d(self.hours(location), new)
+            self._dirty.add(location)
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        for location in self._dirty:
+            tmp_path = os.path.join(self.path, f"_{location}.npy")
+            np.save(tmp_path, self._hours[location])
+            os.replace(tmp_path, self._file(location))
+        self._dirty.clear()
+
+    def __len__(self):
+        return sum(len(self.hours(loc)) for loc in self._hours)
@@ -0,0 +1,268 @@
+"""
+Local Parquet feature store.
+
+Mirrors the slice of the Hopsworks API the pipeline, trainer and UI use
+(get_or_create_feature_group / insert / read / select_all /
+get_or_create_feature_view / get_batch_data), so it can be swapped in
+with FEATURE_STORE_BACKEND=local.
+
+Layout:
+    <root>/<name>_v<version>/
+        _metadata.json
+        location=<loc>/event_month=<YYYY-MM>/part-0.parquet
+
+Each partition file is sorted by event time and written with row-group
+statistics, so time-range filters prune whole partitions by month and
+skip row groups inside the ones they touch.
+"""
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.feature_store.watermark import as_utc
+from src.features.schema import apply_dtype_policy
+from src.utils.config import DEFAULT_LOCATION, LOCAL_STORE_DIR, LOCAL_STORE_ROW_GROUP_SIZE
+
+# "event_month" rather than "month", which is already a calendar feature
+_PARTITION_COLUMNS = ["location", "event_month"]
+
+
+def _month(ts):
+    return pd.to_datetime(ts, utc=True).dt.strftime("%Y-%m")
+
+
+class LocalQuery:
+    """Stand-in for `fg.select_all()` / `fg.select([...])`."""
+
+    def __init__(self, fg, columns=None):
+        self._fg = fg
+        self._columns = columns
+
+    def read(self, start_time=None, end_time=None, **kwargs):
+        return self._fg.read(start_time=start_time, end_time=end_time, columns=self._columns)
+
+
+class LocalFeatureGroup:
+    # push_features() sends float32/int8 frames as they are
+    compact_dtypes = True
+
+    def __init__(self, root, name, version, primary_key, event_time,
+                 description="", row_group_size=LOCAL_STORE_ROW_GROUP_SIZE):
+        self.name = name
+        self.version = version
+        self.primary_key = list(primary_key)
+        self.event_time = event_time
+        self.description = description
+        self.row_group_size = row_group_size
+        self.path = os.path.join(root, f"{name}_v{version}")
+
+    # ---------------------------
+    # metadata
+    # ---------------------------
+    @property
+    def _metadata_path(self):
+        return os.path.join(self.path, "_metadata.json")
+
+    def _save_metadata(self, has_location=False):
+        os.makedirs(self.path, exist_ok=True)
+        meta = {
+            "name": self.name,
+            "version": self.version,
+            "primary_key": self.primary_key,
+            "event_time": self.event_time,
+            "description": self.description,
+            "has_location": has_location,
+        }
+        with open(self._metadata_path, "w") as f:
+            json.dump(meta, f, indent=4)
+
+    @classmethod
+    def load(cls, root, name, version):
+        path = os.path.join(root, f"{name}_v{version}", "_metadata.json")
+        with open(path, "r") as f:
+            meta = json.load(f)
+        return cls(
+            root, name, version, meta["primary_key"], meta["event_time"],
+            meta.get("description", "")
+        )
+
+    def _has_location(self):
+        try:
+            with open(self._metadata_path, "r") as f:
+                return json.load(f).get("has_location", False)
+        except (OSError, ValueError):
+            return False
+
+    # ---------------------------
+    # write
+    # ---------------------------
+    def _partition_path(self, location, month):
+        return os.path.join(self.path, f"location={location}", f"event_month={month}", "part-0.parquet")
+
+    def insert(self, df, write_options=None):
+        """
+        Idempotent upsert on the primary key (plus location, if present).
+        Only the partitions touched by `df` are rewritten.
+        """
+        if df.empty:
+            return
+
+        has_location = "location" in df.columns or self._has_location()
+        self._save_metadata(has_location)
+
+        df = df.copy()
+        if "location" not in df.columns:
+            df["location"] = DEFAULT_LOCATION
+        df["event_month"] = _month(df[self.event_time])
+
+        key = self.primary_key + ["location"]
+
+        for (location, month), part in df.groupby(_PARTITION_COLUMNS, sort=False):
+            path = self._partition_path(location, month)
+            part = part.drop(columns=["event_month"])
+
+            if os.path.exists(path):
+                existing = pd.read_parquet(path)
+                existing["location"] = location
+                part = pd.concat([existing, part], ignore_index=True)
+
+            # Duplicates within the batch itself go too, so the first write
+            # to a partition keeps the same rows as a repeated one
+            part = part.drop_duplicates(subset=key, keep="last").drop(columns=["location"])
+
+            # Older partitions may still hold float64/int32 columns
+            part = apply_dtype_policy(part.sort_values(self.event_time).reset_index(drop=True))
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # "_" prefix keeps half-written files invisible to readers
+            tmp_path = os.path.join(os.path.dirname(path), "_part-0.parquet.tmp")
+            pq.write_table(
+                pa.Table.from_pandas(part, preserve_index=False),
+                tmp_path,
+                row_group_size=self.row_group_size,
+                write_statistics=True,
+            )
+            os.replace(tmp_path, path)
+
+    # ---------------------------
+    # read
+    # ---------------------------
+    def _dataset(self):
+        return ds.dataset(
+            self.path,
+            format="parquet",
+            partitioning="hive",
+        )
+
+    def read(self, start_time=None, end_time=None, columns=None,
+             locations=None, filter=None, **kwargs):
+        """
+        Read the feature group, optionally restricted to
+        [start_time, end_time), a column subset, some locations and an
+        extra pyarrow.dataset filter expression. Month/location filters
+        prune partition directories; the time filter is also pushed down
+        to row-group statistics.
+        """
+        if not os.path.isdir(self.path):
+            return pd.DataFrame()
+
+        dataset = self._dataset()
+        if not dataset.files:
+            return pd.DataFrame()
+        expr = None
+
+        def _and(e):
+            return e if expr is None else expr & e
+
+        ts_type = dataset.schema.field(self.event_time).type
+        if start_time is not None:
+            start = as_utc(start_time)
+            expr = _and(ds.field("event_month") >= start.strftime("%Y-%m"))
+            expr = _and(ds.field(self.event_time) >= pa.scalar(start, type=ts_type))
+        if end_time is not None:
+            end = as_utc(end_time)
+            expr = _and(ds.field("event_month") <= end.strftime("%Y-%m"))
+            expr = _and(ds.field(self.event_time) < pa.scalar(end, type=ts_type))
+        if locations is not None:
+            expr = _and(ds.field("location").isin(list(locations)))
+        if filter is not None:
+            expr = _and(filter)
+
+        has_location = self._has_location()
+        if columns is not None:
+            columns = list(columns)
+            if has_location and "location" not in columns:
+                columns.append("location")
+
+        df = dataset.to_table(columns=columns, filter=expr).to_pandas()
+
+        df = df.drop(columns=["event_month"], errors="ignore")
+        if not has_location and "location" in df.columns:
+            df = df.drop(columns=["location"])
+        if "location" in df.columns:
+            df["location"] = df["location"].astype(str)
+
+        if self.event_time in df.columns:
+            df = df.sort_values(self.event_time).reset_index(drop=True)
+        return df
+
+    def select_all(self):
+        return LocalQuery(self)
+
+    def select(self, features):
+        return LocalQuery(self, columns=features)
+
+
+class LocalFeatureView:
+    def __init__(self, name, version, fg, description=""):
+        self.name = name
+        self.version = version
+        self.description = description
+        self._fg = fg
+
+    def get_batch_data(self, start_time=None, end_time=None, **kwargs):
+        return self._fg.read(start_time=start_time, end_time=end_time)
+
+
+class LocalFeatureStore:
+    def __init__(self, root=LOCAL_STORE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def get_or_create_feature_group(self, name, version, primary_key=None,
+                                    event_time=None, description="", **kwargs):
+        try:
+            return LocalFeatureGroup.load(self.root, name, version)
+        except OSError:
+            fg = LocalFeatureGroup(
+                self.root, name, version, primary_key or [], event_time, description
+            )
+            fg._save_metadata()
+            return fg
+
+    def get_feature_group(self, name, version):
+        return LocalFeatureGroup.load(self.root, name, version)
+
+    # ---------------------------
+    # feature views
+    # ---------------------------
+    def _view_path(self, name, version):
+        return os.path.join(self.root, "_views", f"{name}_v{version}.json")
+
+    def get_or_create_feature_view(self, name, version, query, description="", **kwargs):
+        fg = query._fg
+        path = self._view_path(name, version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"feature_group": fg.name, "version": fg.version}, f, indent=4)
+        return LocalFeatureView(name, version, fg, description)
+
+    def get_feature_view(self, name, version):
+        with open(self._view_path(name, version), "r") as f:
+            meta = json.load(f)
+        fg = self.get_feature_group(meta["feature_group"], meta["version"])
+        return LocalFeatureView(name, version, fg)
@@ -1,10 +1,18 @@
 ﻿import pandas as pd
 
+from src.features.schema import widen_dtypes
+
 def push_features(fg, df: pd.DataFrame):
     """
-    Push already-built features to Hopsworks Feature Group.
+    Push already-built features to the Feature Group (Hopsworks, or the
+    local Parquet store — both expose the same insert()).
     Assumes fg is already created and logged in.
     """
+    # Existing Hopsworks feature groups have float64/int32 columns; the
+    # local store keeps the compact float32/int8 frames as they are
+    if not getattr(fg, "compact_dtypes", False):
+        df = widen_dtypes(df)
+
     # Don't wait for materialization job to avoid timeouts
     fg.insert(df, write_options={"wait_for_job": False})
     
@@ -0,0 +1,86 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from src.utils.config import WATERMARK_PATH, WATERMARK_MAX_AGE_DAYS
+from src.utils.io import write_json_atomic
+
+
+def as_utc(ts):
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is None:
+        return ts.tz_localize("UTC")
+    return ts.tz_convert("UTC")
+
+
+def watermark_key(fg):
+    return f"{fg.name}_v{fg.version}"
+
+
+def read_watermark(key, path=WATERMARK_PATH):
+    """Last ingested timestamp for `key`, or None if never recorded."""
+    try:
+        with open(path, "r") as f:
+            marks = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    value = marks.get(key)
+    if value is None:
+        return None
+    return as_utc(value["timestamp"])
+
+
+def write_watermark(key, ts, path=WATERMARK_PATH):
+    """Atomically record `ts` as the last ingested timestamp for `key`."""
+    try:
+        with open(path, "r") as f:
+            marks = json.load(f)
+    except (OSError, ValueError):
+        marks = {}
+
+    marks[key] = {
+        "timestamp": as_utc(ts).isoformat(),
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+    write_json_atomic(path, marks)
+
+
+def watermark_looks_wrong(ts, max_age_days=WATERMARK_MAX_AGE_DAYS):
+    """
+    A local watermark is only trusted if it exists, isn't in the future
+    and isn't older than `max_age_days` (which usually means the file was
+    restored from an old cache or another writer has been ingesting).
+    """
+    if ts is None:
+        return True
+    now = pd.Timestamp.now(tz="UTC")
+    if ts > now:
+        return True
+    return ts < now - timedelta(days=max_age_days)
+
+
+def resolve_watermark(fg, read_fn, path=WATERMARK_PATH):
+    """
+    Return the ingestion watermark for `fg`.
+
+    Uses the local file when it looks sane — no feature group read at all.
+    Otherwise reconciles against the store with `read_fn(fg)` (one full
+    read), persists the result and returns it. Returns None if the store
+    is empty.
+    """
+    key = watermark_key(fg)
+    ts = read_watermark(key, path)
+
+    if not watermark_looks_wrong(ts):
+        return ts
+
+    print(f"🔁 Reconciling watermark for {key} against the feature store...")
+    df_hist = read_fn(fg)
+    if df_hist.empty:
+        return None
+
+    ts = as_utc(df_hist["timestamp"].max())
+    write_watermark(key, ts, path)
+    return ts
@@ -0,0 +1,198 @@
+import itertools
+import os
+import threading
+import time
+
+import pandas as pd
+
+from src.feature_store.push_to_hopsworks import push_features
+from src.utils.config import (
+    WRITE_BUFFER_MAX_ROWS,
+    WRITE_BUFFER_MAX_AGE_SEC,
+    WRITE_BUFFER_MAX_PENDING_ROWS,
+    WRITE_BUFFER_SPILL_DIR,
+)
+from src.utils.metrics import Histogram
+
+
+class WriteBehindBuffer:
+    """
+    Write-behind buffer in front of push_features().
+
+    Producers call add(); batches are merged (deduplicated on the primary
+    key) and flushed by a background thread once `max_rows` rows are
+    waiting or the oldest batch is `max_age` seconds old.
+
+    Durability: every batch is written to a spill file before add()
+    returns and removed only after a successful flush. A new buffer
+    reloads any leftover spill files, so a crash loses nothing.
+
+    Backpressure: add() blocks while more than `max_pending_rows` rows
+    are waiting, so a slow sink slows producers down instead of growing
+    memory without bound.
+
+    `on_flush(df)` is called from the flusher thread with every frame the
+    sink accepted — recovered spill batches included — so callers can
+    mark rows as stored only once they really are.
+    """
+
+    def __init__(self, fg, max_rows=WRITE_BUFFER_MAX_ROWS,
+                 max_age=WRITE_BUFFER_MAX_AGE_SEC,
+                 max_pending_rows=WRITE_BUFFER_MAX_PENDING_ROWS,
+                 spill_dir=WRITE_BUFFER_SPILL_DIR,
+                 key=("event_id",), sink=push_features, on_flush=None):
+        self.fg = fg
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self.max_pending_rows = max_pending_rows
+        self.spill_dir = os.path.join(spill_dir, f"{fg.name}_v{fg.version}")
+        self.key = list(key)
+        self.sink = sink
+        self.on_flush = on_flush
+
+        self._pending = []          # [(spill_path, df, added_at)]
+        self._pending_rows = 0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self.flush_latency = Histogram([0.1, 0.5, 1, 2, 5, 10, 30, 60])
+        self.batch_rows = Histogram([10, 50, 100, 500, 1000, 5000, 10000])
+        self.errors = 0
+
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self._recover()
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # ---------------------------
+    # producers
+    # ---------------------------
+    def add(self, df):
+        if df is None or df.empty:
+            return
+
+        with self._cond:
+            while self._pending_rows >= self.max_pending_rows and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                raise RuntimeError("WriteBehindBuffer is closed")
+
+        path = self._spill(df)
+
+        with self._cond:
+            self._pending.append((path, df, time.monotonic()))
+            self._pending_rows += len(df)
+            self._cond.notify_all()
+
+    def _spill(self, df):
+        name = f"{time.time_ns()}-{next(self._seq):06d}.parquet"
+        path = os.path.join(self.spill_dir, name)
+        tmp_path = os.path.join(self.spill_dir, f"_{name}.tmp")
+
+        df.to_parquet(tmp_path, index=False)
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return path
+
+    def _recover(self):
+        files = sorted(f for f in os.listdir(self.spill_dir) if f.endswith(".parquet"))
+        for name in files:
+            path = os.path.join(self.spill_dir, name)
+            df = pd.read_parquet(path)
+            self._pending.append((path, df, time.monotonic() - self.max_age))
+            self._pending_rows += len(df)
+        if files:
+            print(f"♻️ Recovered {self._pending_rows} spilled row(s) from {len(files)} batch(es)")
+
+    # ---------------------------
+    # flusher
+    # ---------------------------
+    def _due(self):
+        if not self._pending:
+            return False
+        if self._closed or self._pending_rows >= self.max_rows:
+            return True
+        return time.monotonic() - self._pending[0][2] >= self.max_age
+
+    def _run(self):
+        close_failures = 0
+        while True:
+            with self._cond:
+                while not self._due():
+                    if self._closed and not self._pending:
+                        return
+                    timeout = None
+                    if self._pending:
+                        timeout = max(0.0, self.max_age - (time.monotonic() - self._pending[0][2]))
+                    self._cond.wait(timeout)
+                batches = list(self._pending)
+
+            if self._flush(batches) or not self._closed:
+                continue
+
+            # Closing with a sink that keeps failing: give up after a few
+            # tries and leave the spill files for the next run to recover
+            close_failures += 1
+            if close_failures >= 3:
+                print(f"⚠️ Leaving {self._pending_rows} row(s) spilled in {self.spill_dir}")
+                return
+
+    def _flush(self, batches):
+        df = pd.concat([b[1] for b in batches], ignore_index=True)
+        key = [k for k in self.key + ["location"] if k in df.columns]
+        df = df.drop_duplicates(subset=key, keep="last")
+
+        t0 = time.perf_counter()
+        try:
+            self.sink(self.fg, df)
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Flush of {len(df)} row(s) failed, will retry: {e}")
+            with self._cond:
+                self._cond.wait(min(self.max_age, 5))
+            return False
+
+        self.flush_latency.observe(time.perf_counter() - t0)
+        self.batch_rows.observe(len(df))
+
+        for path, _, _ in batches:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+        with self._cond:
+            del self._pending[:len(batches)]
+            self._pending_rows -= sum(len(b[1]) for b in batches)
+            self._cond.notify_all()
+
+        if self.on_flush is not None:
+            self.on_flush(df)
+        return True
+
+    # ---------------------------
+    # lifecycle
+    # ---------------------------
+    def close(self, timeout=None):
+        """Flush everything still pending and stop the flusher."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stats(self):
+        return {
+            "pending_rows": self._pending_rows,
+            "errors": self.errors,
+            "flush_latency_sec": self.flush_latency.snapshot(),
+            "batch_rows": self.batch_rows.snapshot(),
+        }
@@ -0,0 +1,156 @@
+"""
+Vectorized EPA AQI engine.
+
+Every pollutant is described by a breakpoint table in its EPA unit plus
+the factor that converts the Open-Meteo value (µg/m³) into that unit.
+Sub-indices are computed for whole columns at once with searchsorted,
+so there is no per-row Python.
+"""
+import numpy as np
+import pandas as pd
+
+
+# Molar volume at 25 °C / 1 atm, used for µg/m³ -> ppb
+_MOLAR_VOLUME = 24.45
+
+# pollutant: (µg/m³ -> EPA unit factor, EPA truncation decimals, breakpoints)
+# Breakpoints are (conc_lo, conc_hi, aqi_lo, aqi_hi), ascending.
+POLLUTANT_BREAKPOINTS = {
+    # µg/m³ (24-hr). Not truncated, so results match compute_aqi_pm25 exactly
+    "pm2_5": (1.0, None, [
+        (0,     12.0,   0,  50),
+        (12.1,  35.4,  51, 100),
+        (35.5,  55.4, 101, 150),
+        (55.5, 150.4, 151, 200),
+        (150.5, 250.4, 201, 300),
+        (250.5, 350.4, 301, 400),
+        (350.5, 500.4, 401, 500),
+    ]),
+    # µg/m³ (24-hr)
+    "pm10": (1.0, 0, [
+        (0,    54,   0,  50),
+        (55,  154,  51, 100),
+        (155, 254, 101, 150),
+        (255, 354, 151, 200),
+        (355, 424, 201, 300),
+        (425, 504, 301, 400),
+        (505, 604, 401, 500),
+    ]),
+    # ppb, EPA 8-hr ozone table. It stops at 200 ppb (AQI 300) — EPA
+    # reports higher levels from 1-hr averages — so anything above takes
+    # the "500 + excess" tail like every other value past its table
+    "ozone": (_MOLAR_VOLUME / 48.00, 0, [
+        (0,    54,   0,  50),
+        (55,   70,  51, 100),
+        (71,   85, 101, 150),
+        (86,  105, 151, 200),
+        (106, 200, 201, 300),
+    ]),
+    # ppb (1-hr)
+    "nitrogen_dioxide": (_MOLAR_VOLUME / 46.01, 0, [
+        (0,      53,   0,  50),
+        (54,    100,  51, 100),
+        (101,   360, 101, 150),
+        (361,   649, 151, 200),
+        (650,  1249, 201, 300),
+        (1250, 1649, 301, 400),
+        (1650, 2049, 401, 500),
+    ]),
+    # ppb (1-hr)
+    "sulphur_dioxide": (_MOLAR_VOLUME / 64.07, 0, [
+        (0,    35,   0,  50),
+        (36,   75,  51, 100),
+        (76,  185, 101, 150),
+        (186, 304, 151, 200),
+        (305, 604, 201, 300),
+        (605, 804, 301, 400),
+        (805, 1004, 401, 500),
+    ]),
+    # ppm (8-hr)
+    "carbon_monoxide": (_MOLAR_VOLUME / 28.01 / 1000, 1, [
+        (0.0,   4.4,   0,  50),
+        (4.5,   9.4,  51, 100),
+        (9.5,  12.4, 101, 150),
+        (12.5, 15.4, 151, 200),
+        (15.5, 30.4, 201, 300),
+        (30.5, 40.4, 301, 400),
+        (40.5, 50.4, 401, 500),
+    ]),
+}
+
+POLLUTANTS = list(POLLUTANT_BREAKPOINTS)
+
+
+def _table(pollutant):
+    factor, decimals, rows = POLLUTANT_BREAKPOINTS[pollutant]
+    table = np.asarray(rows, dtype="float64")
+    return factor, decimals, table
+
+
+def sub_index(pollutant, values):
+    """
+    EPA sub-index for one pollutant over an array of Open-Meteo values.
+
+    Mirrors compute_aqi_pm25 element for element: a value inside a band
+    is interpolated with the same arithmetic; anything outside every
+    band (above the table, or in a gap between bands) takes the linear
+    "500 + excess" tail; NaN stays NaN.
+    """
+    factor, decimals, table = _table(pollutant)
+    conc = np.asarray(values, dtype="float64")
+    if factor != 1.0:
+        conc = conc * factor
+    if decimals is not None:
+        # EPA truncates concentrations before looking up the band
+        scale = 10.0 ** decimals
+        conc = np.trunc(conc * scale) / scale
+
+    lo, hi, aqi_lo, aqi_hi = table.T
+
+    idx = np.searchsorted(lo, conc, side="right") - 1
+    safe = np.clip(idx, 0, len(lo) - 1)
+    in_band = (idx >= 0) & (conc <= hi[safe])
+
+    band_lo = lo[safe]
+    out = aqi_lo[safe] + (conc - band_lo) * (aqi_hi[safe] - aqi_lo[safe]) / (hi[safe] - band_lo)
+    return np.where(in_band, out, 500 + (conc - hi[-1]))
+
+
+def compute_aqi_pm25_vectorized(pm25):
+    """Array version of build_features.compute_aqi_pm25."""
+    return sub_index("pm2_5", pm25)
+
+
+def compute_aqi(df, pollutants=None):
+    """
+    Overall AQI and dominant pollutant for every row in one pass.
+
+    Args:
+        df:         frame with Open-Meteo pollutant columns (µg/m³).
+        pollutants: subset to use; defaults to every known pollutant
+                    present in df.
+
+    Returns a DataFrame (same index as df) with one `aqi_<pollutant>`
+    column per sub-index, plus `aqi` (the max) and `dominant_pollutant`.
+    Rows where every sub-index is NaN get NaN / None.
+    """
+    if pollutants is None:
+        pollutants = [p for p in POLLUTANTS if p in df.columns]
+    if not pollutants:
+        raise ValueError(f"No known pollutant columns in {list(df.columns)}")
+
+    subs = np.column_stack([sub_index(p, df[p].to_numpy()) for p in pollutants])
+
+    filled = np.where(np.isnan(subs), -np.inf, subs)
+    winner = filled.argmax(axis=1)
+    aqi = filled[np.arange(len(filled)), winner]
+    missing = np.isneginf(aqi)
+
+    names = np.asarray(pollutants, dtype=object)
+    dominant = names[winner]
+    dominant[missing] = None
+
+    out = pd.DataFrame(subs, index=df.index, columns=[f"aqi_{p}" for p in pollutants])
+    out["aqi"] = np.where(missing, np.nan, aqi)
+    out["dominant_pollutant"] = dominant
+    return out
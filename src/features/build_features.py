@@ -1,5 +1,30 @@
+import json
+
+import numpy as np
 import pandas as pd
 
+from src.features.feature_engineering import epoch_hours, SECONDS_PER_HOUR
+from src.features.registry import FeaturePlan
+from src.features.rolling import RollingFeatures
+from src.features.schema import apply_dtype_policy
+from src.utils.config import FEATURE_STATE_PATH, ROLLING_FEATURES_ENABLED, ROLLING_WINDOWS
+from src.utils.io import write_json_atomic
+
+
+# Columns written to the feature group, in order
+BUILD_FEATURES = [
+    "event_id", "aqi",
+    "hour", "day", "month", "weekday",
+    "pm2_5_lag1", "pm2_5_lag2", "pm2_5_roll3",
+]
+BUILD_PLAN = FeaturePlan(BUILD_FEATURES)
+
+# Deepest pm2_5 look-back used below (lag2 / roll3 need the 2 prior hours)
+PM25_TAIL = BUILD_PLAN.lookback
+
+# History a fresh rolling engine must see before its widest window is full
+ROLLING_SEED_HOURS = max(ROLLING_WINDOWS.values())
+
 
 def compute_aqi_pm25(pm25):
     # EPA standard AQI breakpoints for PM2.5 (24-hr, but works for hourly too)
@@ -18,26 +43,160 @@ def compute_aqi_pm25(pm25):
     # If somehow above 500.4, scale linearly beyond 500
     return 500 + (pm25 - 500.4)
 
-def build_features(df):
+def _state_hours(state):
+    """Epoch hours of a state's pm2_5 tail (older states assumed contiguous)."""
+    if "event_hour" in state:
+        return np.asarray(state["event_hour"], dtype="int64")
+    last = pd.Timestamp(state["timestamp"]).value // (SECONDS_PER_HOUR * 10**9)
+    return np.arange(last - len(state["pm2_5"]) + 1, last + 1, dtype="int64")
+
+
+def build_features(df, context=None, rolling=None):
+    """
+    Args:
+        df:      raw hourly rows (timestamp + pollutants).
+        context: optional {"event_hour": [...], "pm2_5": [...]} for the
+                 hours right before df (oldest first), i.e. a feature
+                 state. With the PM25_TAIL previous hours the lag/rolling
+                 features are defined for every row of df, so nothing
+                 is dropped for lack of history.
+        rolling: optional RollingFeatures engine; adds its 3h/24h/7d
+                 pollutant statistics, continuing from whatever hours it
+                 has already seen.
+    """
     df = df.copy()
 
     df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
 
-    # ✅ REQUIRED PRIMARY KEY
-    df["event_id"] = df["timestamp"].astype("int64") // 10**9
+    # The carried-over context hours feed the lag/rolling windows so the
+    # first new rows have them
+    context_df = None
+    if context:
+        context_df = pd.DataFrame({
+            "event_hour": _state_hours(context),
+            "pm2_5": np.asarray(context["pm2_5"], dtype="float64"),
+        })
+
+    # ✅ event_id is the REQUIRED PRIMARY KEY; definitions live in registry.py
+    df = BUILD_PLAN.compute(df, context=context_df)
+
+    # Rolling stats may be NaN early on (e.g. std of one value); that
+    # alone is no reason to drop a row
+    rolling_columns = []
+    if rolling is not None:
+        stats = rolling.transform(df.sort_values("timestamp"))
+        rolling_columns = list(stats.columns)
+        df = df.join(stats)
+
+    df.dropna(subset=[c for c in df.columns if c not in rolling_columns], inplace=True)
+
+    # float32 measurements / int8 calendar; event_id stays (primary key)
+    return apply_dtype_policy(df)
+
+
+# ===========================
+# INCREMENTAL (STREAMING) BUILD
+# ===========================
+def seed_feature_state(df_hist, rolling=None):
+    """
+    Build a tail state from raw rows that are already ingested, up to
+    and including the watermark hour.
+
+    `rolling` is an engine that has already seen df_hist (the bootstrap
+    build); otherwise, when rolling features are enabled, a fresh one is
+    fed df_hist here — which then needs ROLLING_SEED_HOURS of it, or the
+    widest window restarts from a partial one.
+    """
+    if df_hist is None or df_hist.empty:
+        return None
+
+    df_hist = df_hist.sort_values("timestamp")
+    tail = df_hist.tail(PM25_TAIL)
+    state = {
+        "timestamp": pd.Timestamp(tail["timestamp"].iloc[-1]).isoformat(),
+        "event_hour": [int(h) for h in epoch_hours(tail)],
+        "pm2_5": [float(v) for v in tail["pm2_5"]],
+    }
+
+    if rolling is None and ROLLING_FEATURES_ENABLED:
+        hours = epoch_hours(df_hist)
+        if hours[-1] - hours[0] + 1 < ROLLING_SEED_HOURS:
+            print(f"⚠️ Seeding rolling features from {hours[-1] - hours[0] + 1}h of history "
+                  f"(< {ROLLING_SEED_HOURS}h): the widest window starts partial")
+        rolling = RollingFeatures()
+        rolling.transform(df_hist)
+    if rolling is not None:
+        state["rolling"] = rolling.state()
+    return state
+
+
+def _rolling_from_state(state):
+    if state and state.get("rolling"):
+        return RollingFeatures.from_state(state["rolling"])
+    return RollingFeatures() if ROLLING_FEATURES_ENABLED else None
+
+
+def build_features_incremental(df_new, state=None):
+    """
+    Stateful version of build_features for hourly runs.
+
+    `state` carries the last PM25_TAIL pm2_5 values and their timestamp
+    from the previous run, so lags and roll3 are correct from the very
+    first new row — no history re-read, no rows dropped, O(new rows).
+    It also carries the rolling-statistics accumulators, if any.
+
+    Returns (features, new_state). Rows at or before the state timestamp
+    are ignored, so overlapping fetches are safe.
+    """
+    df_new = df_new.sort_values("timestamp")
+
+    if state is not None:
+        last_ts = pd.Timestamp(state["timestamp"])
+        df_new = df_new[pd.to_datetime(df_new["timestamp"], utc=True) > last_ts]
+
+    if df_new.empty:
+        return build_features(df_new), state
+
+    rolling = _rolling_from_state(state)
+    features = build_features(df_new, context=state, rolling=rolling)
+
+    # Next state = last PM25_TAIL hours of (old tail + new rows)
+    tail = pd.concat([
+        pd.DataFrame({
+            "event_hour": _state_hours(state) if state else [],
+            "pm2_5": state["pm2_5"] if state else [],
+        }),
+        pd.DataFrame({
+            "event_hour": epoch_hours(df_new),
+            "pm2_5": df_new["pm2_5"].to_numpy(dtype="float64"),
+        }),
+    ], ignore_index=True).tail(PM25_TAIL)
+
+    new_state = {
+        "timestamp": pd.Timestamp(df_new["timestamp"].iloc[-1]).isoformat(),
+        "event_hour": [int(h) for h in tail["event_hour"]],
+        "pm2_5": [float(v) for v in tail["pm2_5"]],
+    }
+    if rolling is not None:
+        new_state["rolling"] = rolling.state()
 
-    df["aqi"] = df["pm2_5"].apply(compute_aqi_pm25)
+    return features, new_state
 
-    df["hour"] = df["timestamp"].dt.hour
-    df["day"] = df["timestamp"].dt.day
-    df["month"] = df["timestamp"].dt.month
-    df["weekday"] = df["timestamp"].dt.weekday
 
-    df["pm2_5_lag1"] = df["pm2_5"].shift(1)
-    df["pm2_5_lag2"] = df["pm2_5"].shift(2)
-    df["pm2_5_roll3"] = df["pm2_5"].rolling(3).mean()
+def load_feature_state(key, path=FEATURE_STATE_PATH):
+    try:
+        with open(path, "r") as f:
+            return json.load(f).get(key)
+    except (OSError, ValueError):
+        return None
 
-    df.dropna(inplace=True)
 
-    return df
+def save_feature_state(key, state, path=FEATURE_STATE_PATH):
+    try:
+        with open(path, "r") as f:
+            states = json.load(f)
+    except (OSError, ValueError):
+        states = {}
 
+    states[key] = state
+    write_json_atomic(path, states)
@@ -1,3 +1,6 @@
+import numpy as np
+import pandas as pd
+
 # ===========================
 # SINGLE SOURCE OF TRUTH
 # These constants are imported by train_models.py and utils.py
@@ -9,25 +12,151 @@ TARGET = "aqi"
 FEATURES = [f"{TARGET}_lag_{lag}" for lag in LAGS] + TIME_FEATURES
 # Result: ["aqi_lag_1", "aqi_lag_24", "aqi_lag_48", "hour", "day", "month", "weekday"]
 
+SECONDS_PER_HOUR = 3600
+
+
+# ===========================
+# HOURLY GRID ALIGNMENT
+# ===========================
+def epoch_hours(df):
+    """
+    Integer epoch-hour of every row. Reuses the `event_id` primary key
+    (epoch seconds) when present, otherwise derives it from `timestamp`.
+    """
+    if "event_id" in df.columns:
+        return df["event_id"].to_numpy(dtype="int64") // SECONDS_PER_HOUR
+
+    ts = pd.to_datetime(df["timestamp"], utc=True)
+    return ((ts - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(hours=1)).to_numpy(dtype="int64")
+
+
+def calendar_features(hours):
+    """TIME_FEATURES (UTC hour / day / month / weekday) of epoch `hours`, one row each."""
+    ts = pd.to_datetime(np.asarray(hours, dtype="int64") * SECONDS_PER_HOUR, unit="s", utc=True)
+    return np.column_stack([ts.hour, ts.day, ts.month, ts.weekday])
+
+
+class HourlyGrid:
+    """
+    Dense epoch-hour index over one or many series.
+
+    Each group (e.g. location) gets a contiguous block covering its first
+    to last hour, so "value `lag` hours ago" is a single array lookup at
+    `position - lag` — no sorting, no per-row Python. Hours that never
+    arrived are simply absent from the grid and come back masked.
+    """
+
+    def __init__(self, hours, groups=None):
+        hours = np.asarray(hours, dtype="int64")
+
+        if groups is None:
+            codes = np.zeros(len(hours), dtype="int64")
+        else:
+            codes = pd.factorize(np.asarray(groups))[0].astype("int64")
+
+        by_group = pd.Series(hours).groupby(codes)
+        hmin = by_group.min().to_numpy()
+        span = by_group.max().to_numpy() - hmin + 1
+        base = np.concatenate([[0], np.cumsum(span)[:-1]])
 
-def create_lag_features(df):
+        self.offset = hours - hmin[codes]          # hours since group start
+        self.pos = base[codes] + self.offset       # slot in the dense grid
+        self.size = int(span.sum())
+
+        self.present = np.zeros(self.size, dtype=bool)
+        self.present[self.pos] = True
+        if self.present.sum() != len(hours):
+            raise ValueError("Duplicate (group, hour) rows — dedupe on event_id first")
+
+    def dense(self, values):
+        # float32 inputs stay float32 (no upcast copy); anything else → float64
+        values = np.asarray(values)
+        out = np.full(self.size, np.nan, dtype=np.result_type(values.dtype, np.float32))
+        out[self.pos] = values
+        return out
+
+    def lag(self, values, lag, dense=None):
+        """
+        Value `lag` hours before each row, plus a mask saying whether that
+        hour exists. Missing hours give NaN and mask False.
+        """
+        if dense is None:
+            dense = self.dense(values)
+
+        src = self.pos - lag
+        mask = self.offset >= lag
+        mask[mask] = self.present[src[mask]]
+
+        out = np.full(len(self.pos), np.nan, dtype=dense.dtype)
+        out[mask] = dense[src[mask]]
+        return out, mask
+
+    def rolling_mean(self, values, window, dense=None):
+        """
+        Mean over the `window` hours ending at each row. Rows whose window
+        touches a missing hour get NaN.
+        """
+        if dense is None:
+            dense = self.dense(values)
+
+        total = np.zeros(len(self.pos))
+        complete = np.ones(len(self.pos), dtype=bool)
+        for lag in range(window):
+            shifted, mask = self.lag(values, lag, dense=dense)
+            total += shifted
+            complete &= mask
+        return np.where(complete, total / window, np.nan)
+
+
+def align_hourly(df, column=TARGET, lags=LAGS, by=None):
+    """
+    Hour-aligned lags of `column`.
+
+    Returns a frame (same index as df) with `<column>_lag_<lag>` values
+    and a boolean `<column>_lag_<lag>_present` mask per lag. Nothing is
+    dropped or reordered; callers decide what to do with masked rows.
+    """
+    grid = HourlyGrid(epoch_hours(df), df[by] if by else None)
+    dense = grid.dense(df[column].to_numpy(dtype="float64"))
+
+    out = {}
+    for lag in lags:
+        values, mask = grid.lag(None, lag, dense=dense)
+        out[f"{column}_lag_{lag}"] = values
+        out[f"{column}_lag_{lag}_present"] = mask
+
+    return pd.DataFrame(out, index=df.index)
+
+
+def create_lag_features(df, by=None):
     """
     Creates lag features and time features on the historical DataFrame.
     Call this ONCE before training or before you hand data to the forecast loop.
+
+    Lags are looked up by epoch hour, not row position, so a gap in
+    ingestion never turns `aqi_lag_24` into "24 rows ago". Pass `by`
+    (e.g. "location") for multi-location frames.
     """
-    df = df.sort_values("timestamp").copy()
+    # Imported here: registry.py / schema.py build on the constants above
+    from src.features.registry import FeaturePlan
+    from src.features.schema import apply_dtype_policy
+
+    # One row per (group, hour): feature-store reads can repeat an hour
+    # (re-pushed batches); the latest copy wins
+    keys = pd.DataFrame({"event_hour": epoch_hours(df)}, index=df.index)
+    if by is not None:
+        keys[by] = df[by].to_numpy()
+    df = df[~keys.duplicated(keep="last")]
 
-    # Lag features — shift AQI by 1h, 24h, 48h
-    for lag in LAGS:
-        df[f"{TARGET}_lag_{lag}"] = df[TARGET].shift(lag)
+    df = df.sort_values("timestamp", kind="stable")
 
-    # Time features
-    df["hour"] = df["timestamp"].dt.hour
-    df["day"] = df["timestamp"].dt.day
-    df["month"] = df["timestamp"].dt.month
-    df["weekday"] = df["timestamp"].dt.weekday  # <-- was missing before
+    # Lag features (AQI exactly 1h, 24h, 48h earlier) + time features,
+    # from the same definitions ingestion and forecasting use
+    df = FeaturePlan(FEATURES, by=by).compute(df)
 
-    # Drop rows where any lag is NaN (the first 48 rows)
+    # Drop rows whose lag hours are missing (the first 48 hours, plus
+    # the hours right after any ingestion gap)
     df.dropna(subset=FEATURES, inplace=True)
 
-    return df
\ No newline at end of file
+    # Compact dtypes (no-op for frames loaded through the policy already)
+    return apply_dtype_policy(df)
@@ -0,0 +1,258 @@
+"""
+Declarative feature registry.
+
+Every feature is defined once — name, the columns it depends on, how many
+hours of history it looks back and a vectorized function — and a
+FeaturePlan resolves only what a set of target features needs, in
+dependency order. The same plan runs in two modes:
+
+  - batch        plan.compute(df)                       (training)
+  - streaming    plan.compute(df_new, context=tail)     (hourly ingestion)
+
+Features with no look-back ("row-local") are computed on the new rows
+only; window features run over context + new rows. Row-local columns
+the context frame already carries (e.g. the event_hour of a feature
+state's tail) are used as-is instead of being recomputed within the
+call; nothing is persisted between calls.
+"""
+from dataclasses import dataclass
+from typing import Callable, Tuple
+
+import pandas as pd
+
+from src.features.aqi import compute_aqi_pm25_vectorized
+from src.features.feature_engineering import (
+    HourlyGrid,
+    SECONDS_PER_HOUR,
+    LAGS,
+    TARGET,
+)
+
+
+@dataclass(frozen=True)
+class Feature:
+    name: str
+    deps: Tuple[str, ...]
+    lookback: int
+    fn: Callable
+
+
+FEATURE_REGISTRY = {}
+
+
+def register(name, deps=(), lookback=0):
+    """Decorator: register `fn(ctx) -> array` as feature `name`."""
+    def decorator(fn):
+        FEATURE_REGISTRY[name] = Feature(name, tuple(deps), lookback, fn)
+        return fn
+    return decorator
+
+
+class FeatureContext:
+    """What a feature function sees: the frame plus a lazily built grid."""
+
+    def __init__(self, df, by=None):
+        self.df = df
+        self.by = by
+        self._grid = None
+
+    def __getitem__(self, column):
+        return self.df[column]
+
+    @property
+    def grid(self):
+        if self._grid is None:
+            groups = self.df[self.by] if self.by else None
+            self._grid = HourlyGrid(self.df["event_hour"].to_numpy(), groups)
+        return self._grid
+
+
+# ===========================
+# DEFINITIONS
+# ===========================
+@register("event_id", deps=("timestamp",))
+def _event_id(ctx):
+    ts = pd.to_datetime(ctx["timestamp"], utc=True)
+    return ((ts - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)).to_numpy(dtype="int64")
+
+
+@register("event_hour", deps=("event_id",))
+def _event_hour(ctx):
+    return ctx["event_id"].to_numpy(dtype="int64") // SECONDS_PER_HOUR
+
+
+@register("aqi", deps=("pm2_5",))
+def _aqi(ctx):
+    return compute_aqi_pm25_vectorized(ctx["pm2_5"].to_numpy())
+
+
+def _calendar(attr):
+    def fn(ctx):
+        return getattr(pd.to_datetime(ctx["timestamp"], utc=True).dt, attr).to_numpy()
+    return fn
+
+
+for _name, _attr in [("hour", "hour"), ("day", "day"), ("month", "month"), ("weekday", "weekday")]:
+    register(_name, deps=("timestamp",))(_calendar(_attr))
+
+
+def _floats(series):
+    """Float values of a column, without upcasting float32."""
+    if pd.api.types.is_float_dtype(series.dtype):
+        return series.to_numpy()
+    return series.to_numpy(dtype="float64")
+
+
+def _lag(source, lag):
+    def fn(ctx):
+        return ctx.grid.lag(_floats(ctx[source]), lag)[0]
+    return fn
+
+
+def _rolling_mean(source, window):
+    def fn(ctx):
+        return ctx.grid.rolling_mean(ctx[source].to_numpy(dtype="float64"), window)
+    return fn
+
+
+for _lag_hours in (1, 2):
+    register(f"pm2_5_lag{_lag_hours}", deps=("pm2_5", "event_hour"), lookback=_lag_hours)(
+        _lag("pm2_5", _lag_hours)
+    )
+
+register("pm2_5_roll3", deps=("pm2_5", "event_hour"), lookback=2)(_rolling_mean("pm2_5", 3))
+
+for _lag_hours in LAGS:
+    register(f"{TARGET}_lag_{_lag_hours}", deps=(TARGET, "event_hour"), lookback=_lag_hours)(
+        _lag(TARGET, _lag_hours)
+    )
+
+
+# ===========================
+# PLANS
+# ===========================
+class FeaturePlan:
+    def __init__(self, targets, by=None):
+        self.targets = list(targets)
+        self.by = by
+
+    def resolve(self, available=(), fallback=()):
+        """
+        Registered features needed for the targets, in dependency order.
+
+        Columns in `available` are taken as given. A column in `fallback`
+        is computed if its inputs are there, otherwise taken as given too
+        (used for columns only the context rows carry, e.g. past AQI).
+        """
+        available = set(available)
+        fallback = set(fallback)
+        order, done = [], set()
+
+        def visit(name, path=()):
+            if name in available or name in done:
+                return
+            if name in path:
+                raise ValueError(f"Feature cycle: {' -> '.join(path + (name,))}")
+            try:
+                if name not in FEATURE_REGISTRY:
+                    raise KeyError(f"No feature or input column named {name!r}")
+                for dep in FEATURE_REGISTRY[name].deps:
+                    visit(dep, path + (name,))
+            except KeyError:
+                if name in fallback:
+                    available.add(name)
+                    return
+                raise
+            done.add(name)
+            order.append(name)
+
+        for target in self.targets:
+            visit(target)
+        return order
+
+    def _split(self, order):
+        """(row-local features, window features) preserving order."""
+        windowed = set()
+        for name in order:
+            f = FEATURE_REGISTRY[name]
+            if f.lookback or any(d in windowed for d in f.deps):
+                windowed.add(name)
+        return [n for n in order if n not in windowed], [n for n in order if n in windowed]
+
+    @property
+    def lookback(self):
+        """Hours of history the targets need (deepest chain of look-backs)."""
+        memo = {}
+
+        def depth(name):
+            if name not in FEATURE_REGISTRY:
+                return 0
+            if name not in memo:
+                f = FEATURE_REGISTRY[name]
+                memo[name] = f.lookback + max((depth(d) for d in f.deps), default=0)
+            return memo[name]
+
+        return max((depth(t) for t in self.targets), default=0)
+
+    def context_columns(self, available=()):
+        """Columns a streaming context must carry for the window features."""
+        order = self.resolve(available)
+        _, window = self._split(order)
+        needed = {"event_hour"} if window else set()
+        for name in window:
+            needed.update(FEATURE_REGISTRY[name].deps)
+        needed -= set(window)
+        if self.by and window:
+            needed.add(self.by)
+        return sorted(needed)
+
+    def compute(self, df, context=None, keep_intermediates=False):
+        """
+        Add the target columns to a copy of df.
+
+        `context` holds rows immediately before df (any order) and is only
+        used to feed window features; the returned frame has df's rows.
+        Intermediate columns (e.g. event_hour) are dropped unless
+        `keep_intermediates` is set.
+        """
+        df = df.copy()
+        columns = list(df.columns)
+        ctx_columns = set(context.columns) if context is not None else set()
+        order = self.resolve(df.columns, fallback=ctx_columns)
+        local, window = self._split(order)
+        intermediates = [] if keep_intermediates else [n for n in order if n not in self.targets]
+
+        ctx = FeatureContext(df, self.by)
+        for name in local:
+            df[name] = FEATURE_REGISTRY[name].fn(ctx)
+
+        if not window:
+            return self._finish(df, columns, order, intermediates)
+
+        if context is not None and len(context):
+            # Row-local inputs the context doesn't carry yet are filled in
+            # when it has what they need; cached ones are reused as-is
+            context = context.copy()
+            cctx = FeatureContext(context, self.by)
+            for name in local:
+                deps = FEATURE_REGISTRY[name].deps
+                if name not in context.columns and all(d in context.columns for d in deps):
+                    context[name] = FEATURE_REGISTRY[name].fn(cctx)
+            full = pd.concat([context, df], ignore_index=True)
+        else:
+            full = df.reset_index(drop=True)
+
+        fctx = FeatureContext(full, self.by)
+        for name in window:
+            full[name] = FEATURE_REGISTRY[name].fn(fctx)
+
+        n_ctx = len(full) - len(df)
+        for name in window:
+            df[name] = full[name].to_numpy()[n_ctx:]
+        return self._finish(df, columns, order, intermediates)
+
+    def _finish(self, df, columns, order, intermediates):
+        """New columns in target order (then intermediates), after df's own."""
+        new = [n for n in self.targets if n not in columns]
+        new += [n for n in order if n not in new and n not in intermediates]
+        return df[columns + new]
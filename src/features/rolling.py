@@ -0,0 +1,306 @@
+"""
+Incremental rolling-window statistics.
+
+RollingStats keeps mean / std / min / max / EWMA over the last `window`
+hours of one series with O(1) amortized work per update:
+
+  - mean / variance: Welford's algorithm, with the matching "remove"
+    step when an hour falls out of the window
+  - min / max:       monotonic deques (each value enters and leaves once)
+  - EWMA:            time-aware, decays by (1 - alpha) per elapsed hour
+
+Windows are in hours, not rows: an ingestion gap shrinks the window
+instead of stretching it.
+
+RollingFeatures runs one accumulator per (column, window). Streaming
+mode (`update`) advances them one hour at a time. Batch mode
+(`transform`) is vectorized over a dense hourly grid (pandas rolling /
+ewm) that starts from whatever the accumulators already hold, then
+leaves them at the last row so streaming carries on from there; both
+modes agree to floating-point rounding. `state()` / `from_state()`
+carry the accumulators between hourly runs.
+"""
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from src.features.feature_engineering import epoch_hours
+from src.utils.config import HOURLY_VARIABLES, ROLLING_WINDOWS, ROLLING_STATS
+
+
+class RollingStats:
+    def __init__(self, window, span=None):
+        self.window = int(window)
+        self.alpha = 2.0 / ((span or window) + 1)
+
+        self.items = deque()      # (hour, value) inside the window
+        self.mins = deque()       # increasing values
+        self.maxs = deque()       # decreasing values
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.ewma = math.nan
+        self.ewma_hour = None     # hour of the last observed value
+        self.last_hour = None
+
+    def update(self, hour, value):
+        """Add the value observed at epoch `hour` (NaN = missing)."""
+        hour = int(hour)
+        if self.last_hour is not None and hour <= self.last_hour:
+            raise ValueError(f"Hours must increase: {hour} after {self.last_hour}")
+
+        # EWMA decays over the hours since the previous observation
+        if value == value:
+            if self.ewma != self.ewma:
+                self.ewma = value
+            else:
+                decay = (1.0 - self.alpha) ** (hour - self.ewma_hour)
+                self.ewma = decay * self.ewma + (1.0 - decay) * value
+            self.ewma_hour = hour
+
+        self._evict(hour)
+        self.last_hour = hour
+
+        if value != value:
+            return
+
+        self.items.append((hour, value))
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+        while self.mins and self.mins[-1][1] >= value:
+            self.mins.pop()
+        self.mins.append((hour, value))
+        while self.maxs and self.maxs[-1][1] <= value:
+            self.maxs.pop()
+        self.maxs.append((hour, value))
+
+    def _evict(self, hour):
+        oldest = hour - self.window
+        while self.items and self.items[0][0] <= oldest:
+            _, value = self.items.popleft()
+            if self.n == 1:
+                self.n, self.mean, self.m2 = 0, 0.0, 0.0
+                continue
+            self.n -= 1
+            delta = value - self.mean
+            self.mean -= delta / self.n
+            self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+
+        while self.mins and self.mins[0][0] <= oldest:
+            self.mins.popleft()
+        while self.maxs and self.maxs[0][0] <= oldest:
+            self.maxs.popleft()
+
+    def stats(self):
+        """{stat: value} for the current window (NaN when undefined)."""
+        return {
+            "mean": self.mean if self.n else math.nan,
+            "std": math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else math.nan,
+            "min": self.mins[0][1] if self.mins else math.nan,
+            "max": self.maxs[0][1] if self.maxs else math.nan,
+            "ewma": self.ewma,
+        }
+
+    def reset(self, hour, items, ewma, ewma_hour):
+        """
+        Jump to epoch `hour`: the window now holds `items` ((hour, value)
+        pairs, increasing, inside the window) and the EWMA is `ewma` as
+        of `ewma_hour`.
+        """
+        self.items = deque((int(h), float(v)) for h, v in items)
+        values = np.array([v for _, v in self.items])
+        self.n = len(values)
+        self.mean = float(values.mean()) if self.n else 0.0
+        self.m2 = float(((values - self.mean) ** 2).sum()) if self.n else 0.0
+
+        self.mins, self.maxs = deque(), deque()
+        for h, v in self.items:
+            while self.mins and self.mins[-1][1] >= v:
+                self.mins.pop()
+            self.mins.append((h, v))
+            while self.maxs and self.maxs[-1][1] <= v:
+                self.maxs.pop()
+            self.maxs.append((h, v))
+
+        self.ewma = float(ewma)
+        self.ewma_hour = None if ewma_hour is None else int(ewma_hour)
+        self.last_hour = int(hour)
+
+    def batch(self, hours, values, stats):
+        """
+        Vectorized `update` over increasing `hours`: {stat: array} for
+        the requested stats, with the accumulator left at the last hour.
+        """
+        hours = np.asarray(hours, dtype="int64")
+        values = np.asarray(values, dtype="float64")
+        if len(hours) and (np.any(np.diff(hours) <= 0)
+                           or (self.last_hour is not None and hours[0] <= self.last_hour)):
+            raise ValueError("Hours must increase")
+
+        # Dense grid from the oldest hour still needed (what the window
+        # holds, or the hour of the carried EWMA) to the last new hour
+        prev_hours = np.array([h for h, _ in self.items], dtype="int64")
+        prev_values = np.array([v for _, v in self.items], dtype="float64")
+        carried = self.ewma == self.ewma
+        start = int(hours[0])
+        if len(prev_hours):
+            start = min(start, int(prev_hours[0]))
+        if carried:
+            start = min(start, self.ewma_hour)
+        grid = np.full(int(hours[-1]) - start + 1, np.nan)
+        grid[prev_hours - start] = prev_values
+        grid[hours - start] = values
+        pos = hours - start
+
+        window = pd.Series(grid).rolling(self.window, min_periods=1)
+        out = {}
+        if "mean" in stats:
+            out["mean"] = window.mean().to_numpy()[pos]
+        if "std" in stats:
+            out["std"] = window.std().to_numpy()[pos]
+        if "min" in stats:
+            out["min"] = window.min().to_numpy()[pos]
+        if "max" in stats:
+            out["max"] = window.max().to_numpy()[pos]
+
+        # Time-aware EWMA: a gap of k hours before value x decays the old
+        # level by (1 - alpha)^k towards x — exactly k hourly steps of the
+        # plain recurrence with input x. So the carried level plus the new
+        # observations, each gap back-filled with the next observation,
+        # go through one constant-alpha ewm.
+        level = np.full(len(grid), np.nan)
+        level[pos] = values
+        if carried:
+            level[self.ewma_hour - start] = self.ewma
+        observed = ~np.isnan(level)
+        smooth = pd.Series(level).bfill().ffill().ewm(alpha=self.alpha, adjust=False).mean().to_numpy()
+
+        # A row reports the level as of the last observation at or before it
+        last_obs = pd.Series(np.where(observed, np.arange(len(grid)), np.nan)).ffill().to_numpy()[pos]
+        seen = ~np.isnan(last_obs)
+        ewma = np.full(len(pos), np.nan)
+        ewma[seen] = smooth[last_obs[seen].astype("int64")]
+        if "ewma" in stats:
+            out["ewma"] = ewma
+
+        # Accumulator = streaming state after the last hour
+        end = int(hours[-1])
+        keep = (np.arange(len(grid)) + start > end - self.window) & ~np.isnan(grid)
+        ewma_hour = int(last_obs[-1]) + start if seen[-1] else None
+        self.reset(end, zip(np.flatnonzero(keep) + start, grid[keep]), ewma[-1], ewma_hour)
+        return out
+
+    # ---------------------------
+    # persistence (JSON-safe)
+    # ---------------------------
+    def state(self):
+        return {
+            "window": self.window,
+            "alpha": self.alpha,
+            "items": [list(i) for i in self.items],
+            "mins": [list(i) for i in self.mins],
+            "maxs": [list(i) for i in self.maxs],
+            "n": self.n,
+            "mean": self.mean,
+            "m2": self.m2,
+            "ewma": None if self.ewma != self.ewma else self.ewma,
+            "ewma_hour": self.ewma_hour,
+            "last_hour": self.last_hour,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        acc = cls(state["window"])
+        acc.alpha = state["alpha"]
+        acc.items = deque((int(h), float(v)) for h, v in state["items"])
+        acc.mins = deque((int(h), float(v)) for h, v in state["mins"])
+        acc.maxs = deque((int(h), float(v)) for h, v in state["maxs"])
+        acc.n = state["n"]
+        acc.mean = state["mean"]
+        acc.m2 = state["m2"]
+        acc.ewma = math.nan if state["ewma"] is None else state["ewma"]
+        acc.last_hour = state["last_hour"]
+        acc.ewma_hour = state.get("ewma_hour", acc.last_hour)
+        return acc
+
+
+class RollingFeatures:
+    """
+    Rolling statistics for several columns and windows, named
+    `<column>_<stat>_<window label>` (e.g. pm2_5_std_24h).
+    """
+
+    def __init__(self, columns=HOURLY_VARIABLES, windows=ROLLING_WINDOWS, stats=ROLLING_STATS):
+        self.columns = list(columns)
+        self.windows = dict(windows)
+        self.stats = list(stats)
+        self.accumulators = {
+            (col, label): RollingStats(hours)
+            for col in self.columns
+            for label, hours in self.windows.items()
+        }
+
+    @property
+    def feature_names(self):
+        return [
+            f"{col}_{stat}_{label}"
+            for col in self.columns
+            for label in self.windows
+            for stat in self.stats
+        ]
+
+    def update(self, hour, values):
+        """Streaming mode: one hour of {column: value} → {feature: value}."""
+        out = {}
+        for col in self.columns:
+            value = float(values[col]) if values.get(col) is not None else math.nan
+            for label in self.windows:
+                acc = self.accumulators[(col, label)]
+                acc.update(hour, value)
+                current = acc.stats()
+                for stat in self.stats:
+                    out[f"{col}_{stat}_{label}"] = current[stat]
+        return out
+
+    def transform(self, df):
+        """
+        Batch mode: feed every row of df (sorted by time) and return the
+        features as a frame aligned with df's index.
+        """
+        if df.empty:
+            return pd.DataFrame(columns=self.feature_names, index=df.index, dtype="float64")
+
+        hours = epoch_hours(df)
+        out = {}
+        for col in self.columns:
+            values = df[col].to_numpy(dtype="float64")
+            for label in self.windows:
+                stats = self.accumulators[(col, label)].batch(hours, values, self.stats)
+                for stat in self.stats:
+                    out[f"{col}_{stat}_{label}"] = stats[stat]
+
+        return pd.DataFrame(out, index=df.index)[self.feature_names]
+
+    def state(self):
+        return {
+            "columns": self.columns,
+            "windows": self.windows,
+            "stats": self.stats,
+            "accumulators": {
+                f"{col}|{label}": acc.state()
+                for (col, label), acc in self.accumulators.items()
+            },
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        engine = cls(state["columns"], state["windows"], state["stats"])
+        for key, acc_state in state["accumulators"].items():
+            col, label = key.split("|", 1)
+            engine.accumulators[(col, label)] = RollingStats.from_state(acc_state)
+        return engine
@@ -0,0 +1,85 @@
+"""
+Compact dtype policy for feature frames.
+
+pandas defaults to float64 / int64 everywhere, which is 8 bytes per cell
+for values that are hourly sensor readings (float32 is plenty) and
+calendar fields that fit in one byte. apply_dtype_policy() casts a frame
+to the schema below:
+
+  - measurements, AQI and every derived float feature   → float32
+  - calendar features (hour / day / month / weekday)    → int8
+  - `timestamp` (UTC) is the one canonical time key; `event_id` is the
+    same instant in epoch seconds and is only kept where the store needs
+    it as primary key (ingestion), not in frames loaded for training
+"""
+import numpy as np
+import pandas as pd
+
+from src.features.feature_engineering import TIME_FEATURES
+
+TIME_KEY = "timestamp"
+REDUNDANT_TIME_KEYS = ["event_id"]
+
+FLOAT_DTYPE = "float32"
+
+# Explicit column dtypes; any other float column falls back to FLOAT_DTYPE
+FEATURE_SCHEMA = {
+    **{col: "int8" for col in TIME_FEATURES},
+    "event_id": "int64",
+}
+
+# Hopsworks feature groups were created from pandas-default frames, so
+# pushes there keep those types
+WIDE_DTYPES = {"float32": "float64", "int8": "int32"}
+
+MILLION = 1_000_000
+
+
+def dtype_for(column, dtype):
+    """Target dtype for `column` (currently `dtype`), or None to leave it."""
+    if column in FEATURE_SCHEMA:
+        return FEATURE_SCHEMA[column]
+    if pd.api.types.is_float_dtype(dtype):
+        return FLOAT_DTYPE
+    return None
+
+
+def apply_dtype_policy(df, keep_event_id=True):
+    """
+    Cast df to the compact schema. Only columns whose dtype actually
+    changes are touched; already-compact frames come back without a copy
+    of their data.
+
+    keep_event_id: True at ingestion (primary key of the feature group),
+                   False when loading frames for training / the UI.
+    """
+    if not keep_event_id and TIME_KEY in df.columns:
+        df = df.drop(columns=[c for c in REDUNDANT_TIME_KEYS if c in df.columns])
+
+    casts = {}
+    for column, dtype in df.dtypes.items():
+        target = dtype_for(column, dtype)
+        if target is not None and dtype != np.dtype(target):
+            casts[column] = target
+
+    if TIME_KEY in df.columns and not isinstance(df[TIME_KEY].dtype, pd.DatetimeTZDtype):
+        df = df.assign(**{TIME_KEY: pd.to_datetime(df[TIME_KEY], utc=True)})
+
+    return df.astype(casts) if casts else df
+
+
+def widen_dtypes(df):
+    """Undo the compact casts for sinks whose schema uses pandas defaults."""
+    casts = {
+        column: WIDE_DTYPES[str(dtype)]
+        for column, dtype in df.dtypes.items()
+        if str(dtype) in WIDE_DTYPES
+    }
+    return df.astype(casts) if casts else df
+
+
+def memory_per_million_rows(df):
+    """Bytes a frame like df takes per 1M rows (index included)."""
+    if not len(df):
+        return 0
+    return int(df.memory_usage(deep=True).sum() * MILLION / len(df))
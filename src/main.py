@@ -3,7 +3,6 @@ from tracemalloc import start
 os.environ["HOPSWORKS_DISABLE_MODEL_SERVING"] = "1"
 
 from datetime import datetime, timedelta
-import hopsworks
 import pandas as pd
 import time
 from dotenv import load_dotenv  # ← ADD THIS
@@ -12,8 +11,22 @@ from dotenv import load_dotenv  # ← ADD THIS
 load_dotenv()  # ← ADD THIS
 
 from src.data_ingestion.fetch_openmeteo import fetch_openmeteo_data
-from src.features.build_features import build_features
-from src.feature_store.push_to_hopsworks import push_features
+from src.data_ingestion.backfill import backfill
+from src.data_ingestion.response_cache import RawResponseCache
+from src.features.build_features import (
+    build_features,
+    build_features_incremental,
+    seed_feature_state,
+    load_feature_state,
+    ROLLING_SEED_HOURS,
+    save_feature_state,
+)
+from src.features.rolling import RollingFeatures
+from src.feature_store.connect import connect_feature_store
+from src.feature_store.dedup_index import EventIdIndex
+from src.feature_store.write_buffer import WriteBehindBuffer
+from src.feature_store.watermark import resolve_watermark, watermark_key, write_watermark
+from src.utils.config import ROLLING_FEATURES_ENABLED
 
 
 BOOTSTRAP = False  
@@ -32,11 +45,7 @@ def safe_read(fg, retries=3, wait=10):
 def main():
     print("🔄 Starting Open-Meteo AQI pipeline...")
 
-    project = hopsworks.login(
-        api_key_value=os.getenv("HOPSWORKS_API_KEY"),
-        project=os.getenv("HOPSWORKS_PROJECT_NAME"),
-    )
-    fs = project.get_feature_store()
+    fs = connect_feature_store()
 
     fg = fs.get_or_create_feature_group(
     name="karachi_air_quality",
@@ -56,27 +65,38 @@ def main():
         end = datetime.utcnow().strftime("%Y-%m-%d")
 
         print(f"🆕 Bootstrapping {start} → {end}")
-        df_raw = fetch_openmeteo_data(start, end)
+        df_raw = backfill(start, end)
 
     # ---------------------------
     # INCREMENTAL
     # ---------------------------
     else:
-        df_hist = safe_read(fg)
+        # Local watermark; only falls back to a full read if it looks wrong
+        last_ts = resolve_watermark(fg, safe_read)
     
-        if df_hist.empty:
+        if last_ts is None:
             print("🟡 Feature store empty — run BOOTSTRAP")
             return
     
-        last_ts = df_hist["timestamp"].max()
         print(f"⏱️ Last timestamp in FS: {last_ts}")
     
-        start = last_ts.strftime("%Y-%m-%d")
+        # Carry the pm2_5 tail (and rolling windows) across runs so no new
+        # hour is dropped. A stale state is rebuilt from the fetched rows
+        # up to the watermark — with rolling features on, that has to
+        # reach a full 7d window back, not just the watermark day
+        state = load_feature_state(watermark_key(fg))
+        stale = state is None or pd.Timestamp(state["timestamp"]) != last_ts
+        seed_from = last_ts
+        if stale and ROLLING_FEATURES_ENABLED:
+            seed_from = last_ts - timedelta(hours=ROLLING_SEED_HOURS)
+
+        start = seed_from.strftime("%Y-%m-%d")
         end = datetime.utcnow().strftime("%Y-%m-%d")
         
         df_raw = fetch_openmeteo_data(
             start_date=start,
-            end_date=end
+            end_date=end,
+            cache=RawResponseCache()
         )
 
     
@@ -90,24 +110,46 @@ def main():
     # ---------------------------
     
     if BOOTSTRAP:
-        df_features = build_features(df_raw)
+        rolling = RollingFeatures() if ROLLING_FEATURES_ENABLED else None
+        df_features = build_features(df_raw, rolling=rolling)
+        state = seed_feature_state(df_raw, rolling=rolling)
     else:
-        last_ts = safe_read(fg)["timestamp"].max()
-        print(f"⏱️ Last timestamp in FS: {last_ts}")
-    
         df_new = df_raw[df_raw["timestamp"] > last_ts]
     
         if df_new.empty:
             print("🟡 No new data to ingest. Skipping insert.")
             return
     
-        df_features = build_features(df_new)
+        if stale:
+            state = seed_feature_state(df_raw[df_raw["timestamp"] <= last_ts])
+    
+        df_features, state = build_features_incremental(df_new, state)
+    
+    # Drop event hours that are already in the store (overlapping
+    # re-fetches, re-run backfills)
+    index = EventIdIndex(fg)
+    df_features = index.filter_new(df_features)
     
     if df_features.empty:
         print("🟡 No features generated")
         return
     
-    push_features(fg, df_features)
+    # Write-behind: spilled to disk first, flushed (with any batches a
+    # crashed run left behind) when the buffer closes. Rows are indexed
+    # as their flush succeeds, recovered batches included
+    with WriteBehindBuffer(fg, on_flush=index.add) as buffer:
+        buffer.add(df_features)
+    index.save()
+    
+    stats = buffer.stats()
+    print(f"📤 Flushed {stats['batch_rows']['count']} batch(es), "
+          f"mean latency {stats['flush_latency_sec']['mean']:.2f}s")
+    if stats["pending_rows"]:
+        print("⚠️ Push failed — rows stay spilled for the next run")
+        return
+    
+    write_watermark(watermark_key(fg), df_features["timestamp"].max())
+    save_feature_state(watermark_key(fg), state)
     df_features.to_parquet("latest_features.parquet", index=False)
     
     print("✅ Pipeline finished successfully")
@@ -0,0 +1,155 @@
+"""
+Rolling-origin backtest of the 72h forecast.
+
+metrics.json scores one-step-ahead predictions; the dashboard shows a
+72-hour path. This replays that path from every BACKTEST_ORIGIN_STRIDE-th
+hour of the holdout (models are fitted before it, so nothing is seen in
+advance) and scores it against what actually happened, per horizon:
+
+  - one-step candidates: the recursive forecast, exactly as
+    ui/utils.generate_forecast runs it (src/models/recursive_forecast.py)
+  - the direct forecaster: its own batched multi-horizon predict
+
+Origins are split into chunks that run in parallel worker processes,
+one (model, chunk) per task. The report (BACKTEST_REPORT_PATH) holds
+MAE / RMSE by horizon per model, a summary, and timing.
+"""
+import multiprocessing
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.features.feature_engineering import create_lag_features, epoch_hours, LAGS, TARGET, SECONDS_PER_HOUR
+from src.models.direct_forecast import DirectForecaster, HourlySeries
+from src.models.recursive_forecast import recursive_forecast_origins
+from src.models.train_models import test_start_hour
+from src.utils.config import (
+    BACKTEST_ORIGIN_STRIDE,
+    BACKTEST_REPORT_PATH,
+    FORECAST_HORIZON_HOURS,
+    TRAIN_MAX_WORKERS,
+)
+from src.utils.io import write_json_atomic
+
+
+def origin_rows(df, start_hour, horizon=FORECAST_HORIZON_HOURS, stride=BACKTEST_ORIGIN_STRIDE):
+    """
+    Row positions of the forecast origins: every `stride`-th row whose
+    forecast starts at or after start_hour, with a full lag window
+    behind it and the whole horizon inside the history.
+    """
+    hours = epoch_hours(df)
+    rows = np.flatnonzero((hours >= start_hour - 1) & (hours + horizon <= hours[-1]))
+    return rows[rows >= max(LAGS) - 1][::stride]
+
+
+# ===========================
+# WORKER
+# ===========================
+def _forecast_chunk(task):
+    """Worker: 72h paths of one model from one chunk of origins."""
+    model_path, frame, rows, horizon, threads = task
+    model = joblib.load(model_path)
+    if getattr(model, "n_jobs", None) == -1:
+        model.n_jobs = threads
+
+    t0 = time.perf_counter()
+    if isinstance(model, DirectForecaster):
+        paths = model.predict_origins(HourlySeries.from_frame(frame), epoch_hours(frame)[rows], horizon)
+    else:
+        paths = recursive_forecast_origins(model, frame, rows, horizon)
+    return paths, time.perf_counter() - t0
+
+
+# ===========================
+# ENGINE
+# ===========================
+def _iso(hour):
+    return pd.Timestamp(int(hour) * SECONDS_PER_HOUR, unit="s", tz="UTC").isoformat()
+
+
+def backtest(df, models, start_hour=None, horizon=FORECAST_HORIZON_HOURS,
+             stride=BACKTEST_ORIGIN_STRIDE, max_workers=TRAIN_MAX_WORKERS,
+             report_path=BACKTEST_REPORT_PATH):
+    """
+    Backtest {name: fitted model} on the raw history df (timestamp, aqi)
+    from origins at or after start_hour (default: the train_models
+    holdout — pass its holdout models, fitted before it). Returns (and writes to report_path) the per-horizon error
+    curves, a per-model summary and timing.
+    """
+    t_start = time.perf_counter()
+    frame = df.sort_values("timestamp").reset_index(drop=True)[["timestamp", TARGET]]
+    if start_hour is None:
+        start_hour = test_start_hour(create_lag_features(frame))
+
+    rows = origin_rows(frame, start_hour, horizon, stride)
+    if not len(rows):
+        print("⚠️ Not enough holdout history for a backtest")
+        return None
+
+    hours = epoch_hours(frame)
+    steps = np.arange(1, horizon + 1)
+    actual = HourlySeries.from_frame(frame).at(hours[rows][:, None] + steps[None, :])
+
+    chunks = [c for c in np.array_split(rows, max(1, min(max_workers, len(rows)))) if len(c)]
+    workers = max(1, min(max_workers, len(chunks) * len(models)))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    # Models go to the workers as joblib files rather than through the
+    # task pickle, once per model instead of once per chunk
+    with tempfile.TemporaryDirectory(prefix="aqi_backtest_") as folder:
+        tasks, owners = [], []
+        for name, model in models.items():
+            path = os.path.join(folder, f"{name}.joblib")
+            joblib.dump(model, path)
+            for chunk in chunks:
+                tasks.append((path, frame, chunk, horizon, threads))
+                owners.append(name)
+
+        if workers <= 1:
+            outputs = [_forecast_chunk(task) for task in tasks]
+        else:
+            ctx = multiprocessing.get_context("spawn")
+            with ctx.Pool(workers) as pool:
+                outputs = pool.map(_forecast_chunk, tasks, chunksize=1)
+
+    curves, summary = {}, {}
+    for name in models:
+        parts = [out for owner, out in zip(owners, outputs) if owner == name]
+        pred = np.vstack([paths for paths, _ in parts])
+        forecast_sec = sum(sec for _, sec in parts)
+
+        err = pred - actual
+        mae = np.nanmean(np.abs(err), axis=0)
+        rmse = np.sqrt(np.nanmean(err ** 2, axis=0))
+        curves[name] = {"MAE": mae.tolist(), "RMSE": rmse.tolist()}
+        summary[name] = {
+            "BT_MAE": float(np.nanmean(np.abs(err))),
+            "BT_RMSE": float(np.sqrt(np.nanmean(err ** 2))),
+            "BT_MAE_h1": float(mae[0]),
+            "BT_MAE_h24": float(mae[min(24, horizon) - 1]),
+            "BT_MAE_h72": float(mae[-1]),
+            "BT_ms_per_path": forecast_sec / len(rows) * 1000,
+        }
+
+    report = {
+        "horizon": horizon,
+        "origins": len(rows),
+        "stride": stride,
+        "first_origin": _iso(hours[rows[0]]),
+        "last_origin": _iso(hours[rows[-1]]),
+        "summary": summary,
+        "curves": curves,
+        "workers": workers,
+        "wall_sec": time.perf_counter() - t_start,
+    }
+    if report_path:
+        write_json_atomic(report_path, report)
+
+    print(f"🔮 Backtest: {len(rows)} origin(s) x {len(models)} model(s), "
+          f"{horizon}h paths, {workers} worker(s), {report['wall_sec']:.1f}s")
+    return report
@@ -0,0 +1,250 @@
+"""
+Expanding-window (rolling-origin) cross-validation.
+
+Test windows are CV_TEST_HOURS long and aligned to multiples of that
+length on the epoch-hour axis, so a fold is a fixed slice of time: each
+trains on every row before its window and tests on the window. When new
+hours are appended, the old folds keep their exact rows, so their
+results are read back from the cache and only new folds (or folds whose
+rows changed, e.g. after a backfill) are fitted.
+
+Per fold, the train/test matrices are written once under CV_CACHE_DIR
+and memory-mapped by the worker processes; (fold, model) pairs run in
+parallel.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from src.features.feature_engineering import (
+    create_lag_features,
+    epoch_hours,
+    FEATURES,
+    TARGET,
+    SECONDS_PER_HOUR,
+)
+from src.models.hist_boosting import apply_bins, fit_bin_edges
+from src.models.scheduler import n_jobs_share
+from src.models.train_models import CANDIDATES
+from src.utils.config import (
+    CV_FOLDS,
+    CV_TEST_HOURS,
+    CV_MIN_TRAIN_HOURS,
+    CV_CACHE_DIR,
+    CV_REPORT_PATH,
+    TRAIN_MAX_WORKERS,
+)
+from src.utils.io import write_json_atomic
+
+
+# ===========================
+# FOLDS
+# ===========================
+def expanding_folds(hours, n_folds=CV_FOLDS, test_hours=CV_TEST_HOURS,
+                    min_train_hours=CV_MIN_TRAIN_HOURS):
+    """
+    [(test_start_hour, test_end_hour)] for the last `n_folds` complete,
+    aligned test windows that have at least `min_train_hours` of history
+    before them. Oldest first.
+    """
+    if not len(hours):
+        return []
+    first = int(hours.min())
+    end = (int(hours.max()) + 1) // test_hours * test_hours
+
+    folds = []
+    while len(folds) < n_folds:
+        start = end - test_hours
+        if start - first < min_train_hours:
+            break
+        folds.append((start, end))
+        end = start
+    return folds[::-1]
+
+
+def _fingerprint(*arrays):
+    h = hashlib.sha1()
+    for a in arrays:
+        h.update(np.ascontiguousarray(a).tobytes())
+    return h.hexdigest()[:16]
+
+
+def _model_key(name, cls, params):
+    spec = json.dumps([name, f"{cls.__module__}.{cls.__name__}", params], sort_keys=True, default=str)
+    return hashlib.sha1(spec.encode()).hexdigest()[:12]
+
+
+def prepare_folds(X, y, hours, folds, cache_dir=CV_CACHE_DIR):
+    """
+    Write each fold's train/test matrices under cache_dir/folds (once per
+    distinct fold content). Returns (fold info dicts, fold directories).
+    """
+    fold_root = os.path.join(cache_dir, "folds")
+    os.makedirs(fold_root, exist_ok=True)
+
+    fold_info, fold_dirs = [], []
+    for start, end in folds:
+        train = hours < start
+        test = (hours >= start) & (hours < end)
+        fp = _fingerprint(X[train], y[train], X[test], y[test])
+
+        # Each fold's matrices are written once and reused while its rows
+        # stay the same
+        fold_dir = os.path.join(fold_root, f"{start}_{fp}")
+        if not os.path.isdir(fold_dir):
+            tmp_dir = fold_dir + ".tmp"
+            os.makedirs(tmp_dir, exist_ok=True)
+            for name, array in [("X_train", X[train]), ("y_train", y[train]),
+                                ("X_test", X[test]), ("y_test", y[test])]:
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+            os.replace(tmp_dir, fold_dir)
+        fold_dirs.append(fold_dir)
+
+        fold_info.append({
+            "test_start": pd.Timestamp(start * SECONDS_PER_HOUR, unit="s", tz="UTC").isoformat(),
+            "test_end": pd.Timestamp(end * SECONDS_PER_HOUR, unit="s", tz="UTC").isoformat(),
+            "train_rows": int(train.sum()),
+            "test_rows": int(test.sum()),
+            "key": f"{start}_{fp}",
+        })
+    return fold_info, fold_dirs
+
+
+# ===========================
+# WORKER
+# ===========================
+def run_fold(task):
+    """Worker: fit one model on one fold's memmapped matrices."""
+    name, cls, params, binned, fold_dir = task
+    X_train = np.load(os.path.join(fold_dir, "X_train.npy"), mmap_mode="r")
+    y_train = np.load(os.path.join(fold_dir, "y_train.npy"), mmap_mode="r")
+    X_test = np.load(os.path.join(fold_dir, "X_test.npy"), mmap_mode="r")
+    y_test = np.load(os.path.join(fold_dir, "y_test.npy"), mmap_mode="r")
+
+    t0 = time.perf_counter()
+    if binned:
+        edges = fit_bin_edges(X_train)
+        model = cls(**{**params, "bin_edges": edges}).fit(apply_bins(X_train, edges), y_train)
+    else:
+        model = cls(**params).fit(X_train, y_train)
+    fit_sec = time.perf_counter() - t0
+
+    y_pred = model.predict(X_test)
+    return {
+        "MAE": float(mean_absolute_error(y_test, y_pred)),
+        "RMSE": float(mean_squared_error(y_test, y_pred) ** 0.5),
+        "R2": float(r2_score(y_test, y_pred)),
+        "fit_sec": fit_sec,
+    }
+
+
+# ===========================
+# ENGINE
+# ===========================
+def _load_results(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def cross_validate(df, candidates=None, n_folds=CV_FOLDS, test_hours=CV_TEST_HOURS,
+                   min_train_hours=CV_MIN_TRAIN_HOURS, max_workers=TRAIN_MAX_WORKERS,
+                   cache_dir=CV_CACHE_DIR, report_path=CV_REPORT_PATH):
+    """
+    Cross-validate {name: (estimator class, params[, "binned"])} on the
+    raw history df (timestamp, aqi). Returns (and writes to report_path)
+    per-fold metrics per model plus a per-model summary.
+    """
+    if candidates is None:
+        candidates = CANDIDATES
+
+    t_start = time.perf_counter()
+    df = create_lag_features(df)
+    hours = epoch_hours(df)
+    X = df[FEATURES].to_numpy()
+    y = df[TARGET].to_numpy()
+
+    folds = expanding_folds(hours, n_folds, test_hours, min_train_hours)
+    if not folds:
+        print("⚠️ Not enough history for cross-validation")
+        return None
+
+    fold_info, fold_dirs = prepare_folds(X, y, hours, folds, cache_dir)
+
+    results_path = os.path.join(cache_dir, "fold_results.json")
+    cached = _load_results(results_path)
+    tasks, task_keys = [], []
+
+    keys = {}
+    for name, (cls, params, *input_kind) in candidates.items():
+        model_key = _model_key(name, cls, params)
+        run_params = dict(params)
+        if run_params.get("n_jobs") == -1:
+            run_params["n_jobs"] = n_jobs_share(len(candidates), max_workers)
+        for info, fold_dir in zip(fold_info, fold_dirs):
+            key = f"{model_key}|{info['key']}"
+            keys[(name, info["key"])] = key
+            if key not in cached:
+                tasks.append((name, cls, run_params, input_kind == ["binned"], fold_dir))
+                task_keys.append(key)
+
+    if tasks:
+        if max_workers <= 1 or len(tasks) == 1:
+            outputs = [run_fold(task) for task in tasks]
+        else:
+            ctx = multiprocessing.get_context("spawn")
+            with ctx.Pool(min(max_workers, len(tasks))) as pool:
+                outputs = pool.map(run_fold, tasks, chunksize=1)
+        cached.update(zip(task_keys, outputs))
+
+    # Keep only the results and fold matrices still in use
+    live = set(keys.values())
+    write_json_atomic(results_path, {k: v for k, v in cached.items() if k in live})
+    fold_root = os.path.join(cache_dir, "folds")
+    live_dirs = {os.path.basename(d) for d in fold_dirs}
+    for entry in os.listdir(fold_root):
+        if entry not in live_dirs:
+            shutil.rmtree(os.path.join(fold_root, entry), ignore_errors=True)
+
+    fitted = set(task_keys)
+    per_fold, summary = {}, {}
+    for name in candidates:
+        rows = [
+            {**cached[keys[(name, info["key"])]],
+             "test_start": info["test_start"],
+             "cached": keys[(name, info["key"])] not in fitted}
+            for info in fold_info
+        ]
+        per_fold[name] = rows
+        rmse = np.array([r["RMSE"] for r in rows])
+        summary[name] = {
+            "CV_MAE": float(np.mean([r["MAE"] for r in rows])),
+            "CV_RMSE": float(rmse.mean()),
+            "CV_RMSE_std": float(rmse.std()),
+            "CV_R2": float(np.mean([r["R2"] for r in rows])),
+        }
+
+    report = {
+        "folds": [{k: v for k, v in f.items() if k != "key"} for f in fold_info],
+        "per_fold": per_fold,
+        "summary": summary,
+        "computed": len(tasks),
+        "reused": len(keys) - len(tasks),
+        "wall_sec": time.perf_counter() - t_start,
+    }
+    if report_path:
+        _write_json(report_path, report)
+
+    print(f"🔁 CV: {len(folds)} fold(s) x {len(candidates)} model(s), "
+          f"{report['computed']} fitted, {report['reused']} reused "
+          f"in {report['wall_sec']:.1f}s")
+    return report
@@ -0,0 +1,208 @@
+"""
+Direct multi-horizon AQI forecaster.
+
+Instead of predicting one hour and feeding the prediction back in 72
+times, one model learns AQI at origin + h directly, with the horizon h
+as a feature. Every row only uses values known at the origin:
+
+  - AQI at the origin and ORIGIN_LAGS hours before it
+  - AQI 24h / 48h before the *target* hour, when that is still in the
+    past at the origin (NaN otherwise; the booster handles missing)
+  - the horizon and the target hour's calendar features
+
+So a whole 72-hour path is a single (72, features) batch predict, and
+errors don't compound from step to step.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from src.features.feature_engineering import calendar_features, epoch_hours, TARGET, TIME_FEATURES
+from src.utils.config import (
+    FORECAST_HORIZON_HOURS,
+    DIRECT_ORIGIN_STRIDE,
+)
+
+DIRECT_MODEL_NAME = "DirectMultiHorizon"
+
+ORIGIN_LAGS = [0, 1, 2, 3, 6, 12, 23, 47]
+TARGET_LAGS = [24, 48]
+DIRECT_FEATURES = (
+    [f"{TARGET}_origin_lag_{lag}" for lag in ORIGIN_LAGS]
+    + [f"{TARGET}_target_lag_{lag}" for lag in TARGET_LAGS]
+    + ["horizon"]
+    + TIME_FEATURES
+)
+
+
+# ===========================
+# DESIGN MATRIX
+# ===========================
+class HourlySeries:
+    """One AQI series laid out densely by epoch hour (missing hours NaN)."""
+
+    def __init__(self, hours, values):
+        hours = np.asarray(hours, dtype="int64")
+        self.start = int(hours.min())
+        self.values = np.full(int(hours.max()) - self.start + 1, np.nan)
+        self.values[hours - self.start] = values
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(epoch_hours(df), df[TARGET].to_numpy(dtype="float64"))
+
+    @property
+    def end(self):
+        """Last hour in the series."""
+        return self.start + len(self.values) - 1
+
+    def at(self, hours):
+        """Values at epoch `hours` (NaN outside the series)."""
+        hours = np.asarray(hours, dtype="int64")
+        pos = hours - self.start
+        ok = (pos >= 0) & (pos < len(self.values))
+        out = np.full(hours.shape, np.nan)
+        out[ok] = self.values[pos[ok]]
+        return out
+
+
+def direct_design(series, origins, horizons):
+    """
+    Feature matrix for every (origin, horizon) pair, origin-major:
+    row i * len(horizons) + j is origins[i] + horizons[j].
+    Returns (X, target hours).
+    """
+    origins = np.asarray(origins, dtype="int64")[:, None]
+    horizons = np.asarray(horizons, dtype="int64")[None, :]
+    target = origins + horizons
+
+    columns = [np.broadcast_to(series.at(origins - lag), target.shape) for lag in ORIGIN_LAGS]
+    for lag in TARGET_LAGS:
+        # Only usable while target - lag is at or before the origin
+        known = np.where(horizons <= lag, series.at(target - lag), np.nan)
+        columns.append(known)
+    columns.append(np.broadcast_to(horizons, target.shape).astype("float64"))
+
+    X = np.column_stack([c.reshape(-1) for c in columns] + [calendar_features(target.reshape(-1))])
+    return X.astype("float32"), target.reshape(-1)
+
+
+def _complete_origins(series, origins):
+    """Origins whose ORIGIN_LAGS hours are all present."""
+    ok = np.ones(len(origins), dtype=bool)
+    for lag in ORIGIN_LAGS:
+        ok &= ~np.isnan(series.at(origins - lag))
+    return origins[ok]
+
+
+# ===========================
+# MODEL
+# ===========================
+class DirectForecaster:
+    def __init__(self, horizon=FORECAST_HORIZON_HOURS, origin_stride=DIRECT_ORIGIN_STRIDE,
+                 max_iter=300, learning_rate=0.05, max_leaf_nodes=31,
+                 validation_fraction=0.1, random_state=42):
+        self.horizon = horizon
+        self.origin_stride = origin_stride
+        self.max_iter = max_iter
+        self.learning_rate = learning_rate
+        self.max_leaf_nodes = max_leaf_nodes
+        self.validation_fraction = validation_fraction
+        self.random_state = random_state
+
+    def _training_rows(self, series, first_origin, last_origin):
+        origins = np.arange(first_origin, last_origin + 1, self.origin_stride)
+        origins = _complete_origins(series, origins)
+        X, target = direct_design(series, origins, np.arange(1, self.horizon + 1))
+        y = series.at(target)
+        keep = ~np.isnan(y)
+        return X[keep], y[keep]
+
+    def fit(self, df, until_hour=None):
+        """
+        Fit on the raw history (timestamp, aqi). With `until_hour`, only
+        targets before that epoch hour are used (time-based holdout).
+        """
+        series = HourlySeries.from_frame(df)
+        last_target = series.end if until_hour is None else until_hour - 1
+        X, y = self._training_rows(series, series.start + max(ORIGIN_LAGS),
+                                   last_target - self.horizon)
+
+        # Early stopping on the most recent origins (rows are time-ordered)
+        n_val = max(1, int(len(y) * self.validation_fraction))
+        self.model_ = HistGradientBoostingRegressor(
+            max_iter=self.max_iter,
+            learning_rate=self.learning_rate,
+            max_leaf_nodes=self.max_leaf_nodes,
+            early_stopping=True,
+            random_state=self.random_state,
+        )
+        self.model_.fit(X[:-n_val], y[:-n_val], X_val=X[-n_val:], y_val=y[-n_val:])
+        return self
+
+    def predict_origins(self, series, origins, horizon=None):
+        """(n_origins, horizon) forecasts — one predict call for all of them."""
+        horizon = horizon or self.horizon
+        X, _ = direct_design(series, origins, np.arange(1, horizon + 1))
+        return self.model_.predict(X).reshape(len(origins), horizon)
+
+    def forecast(self, historical_df, horizon=None):
+        """
+        Forecast the `horizon` hours after the last row of historical_df
+        (timestamp, aqi). Returns timestamp + aqi_predicted.
+        """
+        horizon = horizon or self.horizon
+        series = HourlySeries.from_frame(historical_df)
+        path = self.predict_origins(series, [series.end], horizon)[0]
+
+        last_ts = pd.to_datetime(historical_df["timestamp"].iloc[-1])
+        return pd.DataFrame({
+            "timestamp": [last_ts + pd.Timedelta(hours=h) for h in range(1, horizon + 1)],
+            "aqi_predicted": path,
+        })
+
+
+# ===========================
+# TRAINING + EVALUATION
+# ===========================
+def train_direct_forecaster(df, split_hour, **params):
+    """
+    Fit on targets before epoch hour `split_hour` (the same holdout as
+    the one-step candidates) and score every origin after it, then refit
+    on the whole history for serving.
+    Returns (model, metrics, holdout model) — the last one is what an
+    out-of-sample backtest must use.
+    """
+    series = HourlySeries.from_frame(df)
+    holdout = DirectForecaster(**params).fit(df, until_hour=split_hour)
+
+    origins = _complete_origins(
+        series, np.arange(split_hour - 1, series.end - holdout.horizon + 1, holdout.origin_stride)
+    )
+
+    t0 = time.perf_counter()
+    pred = holdout.predict_origins(series, origins)
+    predict_sec = time.perf_counter() - t0
+    actual = series.at(origins[:, None] + np.arange(1, holdout.horizon + 1)[None, :])
+
+    ok = ~np.isnan(actual)
+    mae_by_h = np.array([
+        mean_absolute_error(actual[ok[:, j], j], pred[ok[:, j], j]) for j in range(holdout.horizon)
+    ])
+    metrics = {
+        "MAE": mean_absolute_error(actual[ok], pred[ok]),
+        "RMSE": mean_squared_error(actual[ok], pred[ok]) ** 0.5,
+        "R2": r2_score(actual[ok], pred[ok]),
+        "MAE_h1": mae_by_h[0],
+        "MAE_h24": mae_by_h[min(23, holdout.horizon - 1)],
+        "MAE_h72": mae_by_h[holdout.horizon - 1],
+        "predict_sec_per_path": predict_sec / max(1, len(origins)),
+    }
+
+    t0 = time.perf_counter()
+    model = DirectForecaster(**params).fit(df)
+    metrics["fit_sec"] = time.perf_counter() - t0
+    return model, metrics, holdout
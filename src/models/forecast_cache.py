@@ -0,0 +1,124 @@
+import hashlib
+import io
+import os
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.features.feature_engineering import epoch_hours, TARGET
+from src.utils.config import FORECAST_CACHE_DIR, FORECAST_CACHE_MAX_ENTRIES, FORECAST_CACHE_KEEP_HOURS
+
+
+def load_artifact(path):
+    """
+    (object, content hash) of a joblib artifact, both from the same read
+    — so the hash names exactly the model that was loaded, even if the
+    file is replaced while (or after) loading it.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    return joblib.load(io.BytesIO(data)), hashlib.sha256(data).hexdigest()
+
+
+class ForecastCache:
+    """
+    On-disk cache of forecast frames, one Parquet file per
+    (model hash, last hour of history, horizon).
+
+    The file name carries the key, so any process pointed at the same
+    root shares the entries: writes are atomic (tmp file + os.replace)
+    and a lookup is a single read. The model hash is the one taken when
+    the model was loaded (load_artifact), not of whatever file is on
+    disk now. The key also includes a digest of the hours and AQI values
+    of the last `history_rows` rows — the whole window the forecast
+    reads — so a backfill that rewrites any of them doesn't serve a
+    forecast made from the old ones.
+
+    Eviction runs on every write: entries whose last hour is more than
+    `keep_hours` behind the newest entry can't be asked for again, and
+    beyond `max_entries` the least recently used go (recency = mtime).
+    """
+
+    def __init__(self, root=FORECAST_CACHE_DIR, max_entries=FORECAST_CACHE_MAX_ENTRIES,
+                 keep_hours=FORECAST_CACHE_KEEP_HOURS):
+        self.root = str(root)
+        self.max_entries = max_entries
+        self.keep_hours = keep_hours
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.parquet")
+
+    @staticmethod
+    def key(model_hash, historical_df, horizon, history_rows):
+        window = historical_df.tail(history_rows)
+        hours = epoch_hours(window)
+        digest = hashlib.sha256(hours.tobytes())
+        digest.update(np.ascontiguousarray(window[TARGET].to_numpy(dtype="float64")).tobytes())
+        return f"{model_hash[:16]}_{int(hours[-1])}_{horizon}_{digest.hexdigest()[:12]}"
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            df = pd.read_parquet(path)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return df
+
+    def put(self, key, df):
+        path = self._path(key)
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def get_or_compute(self, model_hash, historical_df, horizon, history_rows, compute):
+        """
+        (forecast frame, cache hit?) for the last `history_rows` rows of
+        `historical_df` under the model with hash `model_hash`;
+        `compute()` runs only on a miss.
+        """
+        key = self.key(model_hash, historical_df, horizon, history_rows)
+        cached = self.get(key)
+        if cached is not None:
+            return cached, True
+
+        df = compute()
+        if df is not None and not df.empty:
+            self.put(key, df)
+        return df, False
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".parquet"):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                entries.append((os.stat(path).st_mtime, int(name.split("_")[1]), path))
+            except (OSError, IndexError, ValueError):
+                continue
+        if not entries:
+            return
+
+        newest = max(hour for _, hour, _ in entries)
+        stale = [path for _, hour, path in entries if hour < newest - self.keep_hours]
+        live = sorted((e for e in entries if e[2] not in stale), reverse=True)
+        for path in stale + [path for _, _, path in live[self.max_entries:]]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def __len__(self):
+        if not os.path.isdir(self.root):
+            return 0
+        return sum(name.endswith(".parquet") for name in os.listdir(self.root))
@@ -0,0 +1,238 @@
+"""
+Histogram-based boosting candidate with a binned feature cache.
+
+HistGradientBoosting buckets every feature into at most 255 bins before
+growing trees, so split finding is O(bins) instead of O(rows). Here the
+bucketing is done up front with fixed quantile edges and the uint8 bin
+codes are cached on disk per (location, event hour): a lag/calendar
+row never changes once ingested, so a daily run only bins the hours
+added since the last one. Codes are fed to the booster as-is (≤255
+distinct values per feature map one-to-one onto its own bins).
+
+Early stopping scores the time-ordered tail of the training rows, not a
+random split, so the stopping point reflects forecasting the future.
+"""
+import json
+import os
+import time
+
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.ensemble import HistGradientBoostingRegressor
+
+from src.utils.config import HGB_BIN_CACHE_DIR, HGB_BIN_CACHE_MAX_AGE_DAYS, HGB_MAX_BINS
+
+
+# Cache keys pack (location code, epoch hour) into one int64
+LOCATION_SHIFT = 2 ** 32
+
+
+# ===========================
+# BINNING
+# ===========================
+def fit_bin_edges(X, max_bins=HGB_MAX_BINS):
+    """Per-feature quantile edges (≤ max_bins - 1 cut points each)."""
+    X = np.asarray(X)
+    quantiles = np.linspace(0, 1, max_bins + 1)[1:-1]
+    edges = []
+    for j in range(X.shape[1]):
+        col = X[:, j]
+        col = col[~np.isnan(col)]
+        distinct = np.unique(col)
+        if len(distinct) <= max_bins:
+            # Few values (calendar features): cut between each of them
+            cuts = (distinct[:-1] + distinct[1:]) / 2
+        else:
+            cuts = np.unique(np.quantile(col, quantiles))
+        edges.append(cuts.astype("float64"))
+    return edges
+
+
+def apply_bins(X, edges):
+    """uint8 bin codes of X under `edges` (NaN → last code)."""
+    X = np.asarray(X)
+    codes = np.empty(X.shape, dtype=np.uint8)
+    for j, cuts in enumerate(edges):
+        col = X[:, j]
+        out = np.searchsorted(cuts, col, side="right")
+        out[np.isnan(col)] = len(cuts) + 1
+        codes[:, j] = out
+    return codes
+
+
+class BinnedFeatureCache:
+    """
+    On-disk cache of bin codes keyed by (location, event hour), so
+    series of different locations never share an entry.
+
+    Layout (HGB_BIN_CACHE_DIR): meta.json (with the location names; a
+    location's code is its position there), edges.npz, keys.npy (sorted
+    int64 code * LOCATION_SHIFT + hour), values.npy (float32 rows the
+    codes were made from) and codes.npy. A cached row is reused only if
+    its values are unchanged;
+    the edges are rebuilt when the feature list changes or they are
+    older than HGB_BIN_CACHE_MAX_AGE_DAYS (drift).
+    """
+
+    def __init__(self, root=HGB_BIN_CACHE_DIR, max_bins=HGB_MAX_BINS,
+                 max_age_days=HGB_BIN_CACHE_MAX_AGE_DAYS):
+        self.root = root
+        self.max_bins = max_bins
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def _load(self, features):
+        try:
+            with open(self._path("meta.json")) as f:
+                meta = json.load(f)
+            if meta["features"] != list(features) or meta["max_bins"] != self.max_bins:
+                return None
+            if not isinstance(meta["locations"], list):
+                return None
+            if time.time() - meta["created"] > self.max_age_days * 86400:
+                return None
+            with np.load(self._path("edges.npz")) as z:
+                edges = [z[f"e{j}"] for j in range(len(features))]
+            return (
+                meta,
+                edges,
+                np.load(self._path("keys.npy")),
+                np.load(self._path("values.npy")),
+                np.load(self._path("codes.npy")),
+            )
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save(self, meta, edges, keys, values, codes):
+        os.makedirs(self.root, exist_ok=True)
+        # Arrays first, meta.json last: a crash mid-save leaves a cache
+        # that fails validation and is simply rebuilt
+        np.savez(self._path("edges.npz"), **{f"e{j}": e for j, e in enumerate(edges)})
+        for name, array in [("keys", keys), ("values", values), ("codes", codes)]:
+            tmp = self._path(f"_{name}.npy")
+            np.save(tmp, array)
+            os.replace(tmp, self._path(f"{name}.npy"))
+        tmp = self._path("_meta.json")
+        with open(tmp, "w") as f:
+            json.dump(meta, f, indent=4)
+        os.replace(tmp, self._path("meta.json"))
+
+    def transform(self, hours, X, features, locations=None):
+        """
+        (edges, codes) for rows X identified by epoch `hours` and, for
+        multi-location frames, their `locations` (one name per row).
+        Reuses cached codes where possible and stores the rest.
+        """
+        X = np.asarray(X, dtype="float32")
+
+        cached = self._load(features)
+        if cached is None:
+            meta = {"features": list(features), "max_bins": self.max_bins,
+                    "locations": [], "created": time.time()}
+            keys = _location_keys(meta, hours, locations)
+            edges = fit_bin_edges(X, self.max_bins)
+            codes = apply_bins(X, edges)
+            self.hits, self.misses = 0, len(X)
+            self._save(meta, edges, *_sorted(keys, X, codes))
+            return edges, codes
+
+        meta, edges, c_keys, c_values, c_codes = cached
+        keys = _location_keys(meta, hours, locations)
+        codes = np.empty(X.shape, dtype=np.uint8)
+
+        pos = np.searchsorted(c_keys, keys)
+        pos[pos == len(c_keys)] = 0
+        hit = (c_keys[pos] == keys) if len(c_keys) else np.zeros(len(keys), dtype=bool)
+        hit[hit] = _rows_equal(c_values[pos[hit]], X[hit])
+
+        codes[hit] = c_codes[pos[hit]]
+        codes[~hit] = apply_bins(X[~hit], edges)
+        self.hits, self.misses = int(hit.sum()), int((~hit).sum())
+
+        if self.misses:
+            # Keep cached keys that aren't in this batch, replace the rest
+            keep = ~np.isin(c_keys, keys)
+            self._save(meta, edges, *_sorted(
+                np.concatenate([c_keys[keep], keys]),
+                np.concatenate([c_values[keep], X]),
+                np.concatenate([c_codes[keep], codes]),
+            ))
+        return edges, codes
+
+
+def _location_keys(meta, hours, locations):
+    """int64 cache keys of (location, hour); new names are added to meta."""
+    hours = np.asarray(hours, dtype="int64")
+    if locations is None:
+        locations = np.full(len(hours), "")
+    names, inverse = np.unique(np.asarray(locations).astype(str), return_inverse=True)
+    for name in names:
+        if name not in meta["locations"]:
+            meta["locations"].append(name)
+    codes = np.array([meta["locations"].index(name) for name in names], dtype="int64")
+    return codes[inverse] * LOCATION_SHIFT + hours
+
+
+def _sorted(keys, values, codes):
+    order = np.argsort(keys, kind="stable")
+    return keys[order], values[order], codes[order]
+
+
+def _rows_equal(a, b):
+    """Row-wise equality, NaN == NaN."""
+    return ((a == b) | (np.isnan(a) & np.isnan(b))).all(axis=1)
+
+
+# ===========================
+# ESTIMATOR
+# ===========================
+class BinnedHistGradientBoosting(BaseEstimator, RegressorMixin):
+    """
+    HistGradientBoostingRegressor on pre-binned features.
+
+    fit() takes bin codes (see BinnedFeatureCache) and the `bin_edges`
+    they were made with; predict() takes raw feature rows and bins them
+    with the same edges, so the saved model is used like any other.
+    """
+
+    def __init__(self, bin_edges=None, max_iter=500, learning_rate=0.05,
+                 max_leaf_nodes=31, validation_fraction=0.1,
+                 n_iter_no_change=20, random_state=42):
+        self.bin_edges = bin_edges
+        self.max_iter = max_iter
+        self.learning_rate = learning_rate
+        self.max_leaf_nodes = max_leaf_nodes
+        self.validation_fraction = validation_fraction
+        self.n_iter_no_change = n_iter_no_change
+        self.random_state = random_state
+
+    def fit(self, X_binned, y):
+        if hasattr(X_binned, "columns"):
+            self.feature_names_in_ = np.asarray(X_binned.columns, dtype=object)
+        X_binned = np.asarray(X_binned)
+        y = np.asarray(y)
+        n_val = max(1, int(len(y) * self.validation_fraction))
+
+        self.model_ = HistGradientBoostingRegressor(
+            max_iter=self.max_iter,
+            learning_rate=self.learning_rate,
+            max_leaf_nodes=self.max_leaf_nodes,
+            early_stopping=True,
+            n_iter_no_change=self.n_iter_no_change,
+            random_state=self.random_state,
+        )
+        # Validation = the most recent rows (time-ordered tail)
+        self.model_.fit(
+            X_binned[:-n_val], y[:-n_val],
+            X_val=X_binned[-n_val:], y_val=y[-n_val:],
+        )
+        self.n_iter_ = self.model_.n_iter_
+        self.n_features_in_ = X_binned.shape[1]
+        return self
+
+    def predict(self, X):
+        return self.model_.predict(apply_bins(np.asarray(X, dtype="float64"), self.bin_edges))
@@ -0,0 +1,112 @@
+"""
+NumPy kernel for the recursive (one-step model) AQI forecast.
+
+Same numbers as building a FEATURES DataFrame row per step, without
+any per-step DataFrame:
+
+  - one (horizon, N, len(FEATURES)) float64 buffer, preallocated
+  - calendar features for every step filled in at once
+  - AQI history in a fixed-size ring buffer of the last max(LAGS) hours
+  - every step whose lags all point at observed hours (step < min(LAGS))
+    is predicted in one batch; the rest one step at a time, each
+    prediction written back into the ring. With LAGS = [1, 24, 48] that
+    batch is step 0 alone (aqi_lag_1 of step 1 is step 0's prediction),
+    so the saving is the per-step DataFrame, not predict calls
+
+N forecast origins advance together, so a step is one predict over an
+(N, len(FEATURES)) matrix — a backtest from every hour of the history
+costs `horizon` predict calls, not origins x horizon.
+"""
+import warnings
+
+import numpy as np
+
+from src.features.feature_engineering import calendar_features, epoch_hours, FEATURES, LAGS, TARGET, TIME_FEATURES
+from src.utils.config import FORECAST_HORIZON_HOURS
+
+LAG_COLUMNS = [FEATURES.index(f"{TARGET}_lag_{lag}") for lag in LAGS]
+TIME_COLUMNS = [FEATURES.index(name) for name in TIME_FEATURES]
+
+# Origins per batch in recursive_forecast_origins (bounds the feature buffer)
+ORIGIN_BATCH = 4096
+
+
+def recursive_forecast_batch(model, tails, last_hours, horizon):
+    """
+    Forecast `horizon` hours after each of N origins.
+
+    tails is (N, <= max(LAGS)): the latest AQI values on consecutive
+    hours, the last column at epoch hour last_hours[i] (NaN = unknown).
+    Returns an (N, horizon) float64 array.
+    """
+    max_lag, min_lag = max(LAGS), min(LAGS)
+    tails = np.asarray(tails, dtype="float64")[:, -max_lag:]
+    last_hours = np.asarray(last_hours, dtype="int64")
+    n = len(tails)
+
+    # Ring slot of step s (s < 0: observed, s >= 0: predicted) is s % max_lag
+    ring = np.full((n, max_lag), np.nan)
+    ring[:, max_lag - tails.shape[1]:] = tails
+
+    X = np.empty((horizon, n, len(FEATURES)))
+    target_hours = last_hours[None, :] + 1 + np.arange(horizon)[:, None]
+    X[:, :, TIME_COLUMNS] = calendar_features(target_hours.reshape(-1)).reshape(horizon, n, -1)
+    out = np.empty((horizon, n))
+
+    # Models fitted on a DataFrame warn about the bare array; the column
+    # order is FEATURES either way
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+        known = min(min_lag, horizon)
+        if known:
+            steps = np.arange(known)
+            for col, lag in zip(LAG_COLUMNS, LAGS):
+                X[:known, :, col] = ring[:, (steps - lag) % max_lag].T
+            out[:known] = model.predict(X[:known].reshape(known * n, -1)).reshape(known, n)
+            ring[:, steps % max_lag] = out[:known].T
+
+        for step in range(known, horizon):
+            for col, lag in zip(LAG_COLUMNS, LAGS):
+                X[step, :, col] = ring[:, (step - lag) % max_lag]
+            out[step] = model.predict(X[step])
+            ring[:, step % max_lag] = out[step]
+
+    return out.T
+
+
+def recursive_forecast(model, aqi_tail, last_hour, horizon):
+    """
+    Forecast `horizon` hours after epoch hour `last_hour` from one
+    origin. aqi_tail holds the latest observed AQI values on consecutive
+    hours, the last one at `last_hour` (shorter than max(LAGS) → missing
+    lags are NaN). Returns a float64 array of `horizon` predictions.
+    """
+    tail = np.asarray(aqi_tail, dtype="float64")[None, -max(LAGS):]
+    return recursive_forecast_batch(model, tail, [last_hour], horizon)[0]
+
+
+def recursive_forecast_origins(model, df, origins=None, horizon=FORECAST_HORIZON_HOURS,
+                               batch_size=ORIGIN_BATCH):
+    """
+    The forecast generate_forecast would make from df.iloc[:i + 1], for
+    every row position i in `origins` (default: every row with a full
+    max(LAGS) window behind it), in batches of `batch_size` origins.
+    df must be sorted by timestamp.
+    Returns an (len(origins), horizon) array.
+    """
+    max_lag = max(LAGS)
+    values = df[TARGET].to_numpy(dtype="float64")
+    hours = epoch_hours(df)
+    origins = np.arange(max_lag - 1, len(df)) if origins is None else np.asarray(origins, dtype="int64")
+
+    out = np.empty((len(origins), horizon))
+    offsets = np.arange(-max_lag + 1, 1)
+    for start in range(0, len(origins), batch_size):
+        rows = origins[start:start + batch_size]
+        # Same window as generate_forecast: the last max_lag rows, laid on
+        # consecutive hours (NaN before the first row)
+        idx = rows[:, None] + offsets[None, :]
+        tails = np.where(idx >= 0, values[np.maximum(idx, 0)], np.nan)
+        out[start:start + len(rows)] = recursive_forecast_batch(model, tails, hours[rows], horizon)
+    return out
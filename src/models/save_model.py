@@ -2,17 +2,34 @@
 import os
 import json
 
+from src.models.direct_forecast import DIRECT_MODEL_NAME
+
+def select_best_model(metrics):
+    """
+    Name of the one-step model save_models keeps as model.joblib: lowest
+    cross-validated RMSE (single-split RMSE when CV didn't run). The
+    direct forecaster is scored over the whole 72h path, so it isn't
+    comparable and is saved on its own.
+    """
+    one_step = [name for name in metrics if name != DIRECT_MODEL_NAME]
+    return min(one_step, key=lambda x: metrics[x].get("CV_RMSE", metrics[x]["RMSE"]))
+
+
 def save_models(models, metrics, folder="artifacts"):
     os.makedirs(folder, exist_ok=True)
 
-    # Pick best model based on RMSE
-    best_model_name = min(metrics, key=lambda x: metrics[x]["RMSE"])
+    best_model_name = select_best_model(metrics)
     best_model = models[best_model_name]
 
     # Save model
     model_path = os.path.join(folder, "model.joblib")
     joblib.dump(best_model, model_path)
 
+    if DIRECT_MODEL_NAME in models:
+        direct_path = os.path.join(folder, "direct_model.joblib")
+        joblib.dump(models[DIRECT_MODEL_NAME], direct_path)
+        print(f"💾 Direct forecaster saved: {direct_path}")
+
     # Save metrics
     metrics_path = os.path.join(folder, "metrics.json")
     with open(metrics_path, "w") as f:
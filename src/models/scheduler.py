@@ -0,0 +1,137 @@
+"""
+Parallel training scheduler.
+
+Candidate models are fitted concurrently, one per worker process. The
+train/test matrices are written once as .npy files (under /dev/shm when
+available) and every worker opens them with mmap_mode="r", so the data
+is shared through the page cache instead of being pickled to each
+process.
+
+Each worker is a fresh process (maxtasksperchild=1) and resets its
+high-water mark before fitting, so the peak RSS it reports is what one
+fit + predict needed (plus the interpreter and imports).
+"""
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import TRAIN_MAX_WORKERS
+
+
+def _reset_peak_rss():
+    # Linux: "5" resets VmHWM, so the next reading covers this task only
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb():
+    # VmHWM is per address space; ru_maxrss survives exec and would
+    # report the parent's peak in a spawned worker
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def share_arrays(arrays, folder=None):
+    """Dump {name: array} to .npy files; returns (folder, {name: path})."""
+    if folder is None:
+        shm = "/dev/shm"
+        folder = tempfile.mkdtemp(prefix="aqi_train_", dir=shm if os.path.isdir(shm) else None)
+    paths = {}
+    for name, array in arrays.items():
+        paths[name] = os.path.join(folder, f"{name}.npy")
+        np.save(paths[name], np.ascontiguousarray(array))
+    return folder, paths
+
+
+def _fit_candidate(task):
+    """Worker: fit one candidate on the memmapped data and predict the test set."""
+    name, cls, params, matrix, paths, feature_names = task
+    X_train = np.load(paths[matrix], mmap_mode="r")
+    y_train = np.load(paths["y_train"], mmap_mode="r")
+    X_test = np.load(paths["X_test"], mmap_mode="r")
+
+    # Named columns over the memmaps (no copy), so the fitted model
+    # carries feature_names_in_ and checks name/order at predict time
+    if feature_names is not None:
+        X_train = pd.DataFrame(X_train, columns=feature_names, copy=False)
+        X_test = pd.DataFrame(X_test, columns=feature_names, copy=False)
+
+    model = cls(**params)
+    _reset_peak_rss()
+
+    t0 = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_sec = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_sec = time.perf_counter() - t0
+
+    return name, model, np.asarray(y_pred), {
+        "fit_sec": fit_sec,
+        "predict_sec": predict_sec,
+        "peak_mem_mb": _peak_rss_mb(),
+    }
+
+
+def n_jobs_share(n_candidates, max_workers):
+    """Cores left for a multi-threaded estimator while the others run."""
+    cpus = os.cpu_count() or 1
+    return max(1, cpus - (min(n_candidates, max_workers) - 1))
+
+
+def fit_candidates(candidates, X_train, y_train, X_test, max_workers=TRAIN_MAX_WORKERS,
+                   feature_names=None, X_train_binned=None):
+    """
+    Fit {name: (estimator class, params[, "binned"])} concurrently.
+
+    Candidates marked "binned" are fitted on X_train_binned (bin codes)
+    instead of X_train; every candidate predicts on raw X_test.
+
+    Returns {name: (fitted model, test predictions, timing)} in the order
+    of `candidates`. Estimators that take `n_jobs` get the cores the
+    other workers don't use instead of all of them.
+    """
+    arrays = {"X_train": X_train, "y_train": y_train, "X_test": X_test}
+    if X_train_binned is not None:
+        arrays["X_train_binned"] = X_train_binned
+
+    folder, paths = share_arrays(arrays)
+    try:
+        tasks = []
+        for name, (cls, params, *input_kind) in candidates.items():
+            params = dict(params)
+            if params.get("n_jobs") == -1:
+                params["n_jobs"] = n_jobs_share(len(candidates), max_workers)
+            matrix = "X_train_binned" if input_kind == ["binned"] else "X_train"
+            tasks.append((name, cls, params, matrix, paths, feature_names))
+
+        if max_workers <= 1 or len(tasks) == 1:
+            results = [_fit_candidate(task) for task in tasks]
+        else:
+            # spawn: the parent may hold feature-store client threads
+            ctx = multiprocessing.get_context("spawn")
+            with ctx.Pool(min(max_workers, len(tasks)), maxtasksperchild=1) as pool:
+                results = pool.map(_fit_candidate, tasks, chunksize=1)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    return {name: (model, y_pred, timing) for name, model, y_pred, timing in results}
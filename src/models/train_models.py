@@ -4,80 +4,130 @@ from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
 
-from src.features.feature_engineering import create_lag_features, FEATURES, TARGET
+from src.features.feature_engineering import create_lag_features, epoch_hours, FEATURES, TARGET
+from src.models.direct_forecast import train_direct_forecaster, DIRECT_MODEL_NAME
+from src.models.hist_boosting import BinnedFeatureCache, BinnedHistGradientBoosting
+from src.models.scheduler import fit_candidates
+from src.utils.config import TRAIN_MAX_WORKERS
+
+
+# ===========================
+# CANDIDATES
+# name: (estimator class, params[, "binned"]) — plain data so it can be
+# sent to the worker processes. "binned" candidates train on cached bin
+# codes (bin_edges is filled in by train_models)
+# ===========================
+CANDIDATES = {
+    "LinearRegression": (LinearRegression, {}),
+    "RandomForest": (RandomForestRegressor, {
+        "n_estimators": 200,
+        "random_state": 42,
+        "n_jobs": -1,
+    }),
+    "GradientBoosting": (GradientBoostingRegressor, {
+        "n_estimators": 300,
+        "learning_rate": 0.05,
+        "max_depth": 3,
+        "random_state": 42,
+    }),
+    "HistGradientBoosting": (BinnedHistGradientBoosting, {
+        "max_iter": 500,
+        "learning_rate": 0.05,
+        "max_leaf_nodes": 31,
+        "validation_fraction": 0.1,
+        "n_iter_no_change": 20,
+        "random_state": 42,
+    }, "binned"),
+}
+
+
+def build_candidates(overrides=None):
+    """CANDIDATES with {name: params} overrides (e.g. tuned) merged in."""
+    overrides = overrides or {}
+    return {
+        name: (cls, {**params, **overrides.get(name, {})}, *rest)
+        for name, (cls, params, *rest) in CANDIDATES.items()
+    }
+
+
+# Share of the (time-ordered) lag-featured rows used for fitting; the
+# rest is the holdout every candidate is scored on
+TRAIN_FRACTION = 0.8
+
+
+def test_start_hour(df):
+    """Epoch hour of the first holdout row of a lag-featured df."""
+    return int(epoch_hours(df)[int(len(df) * TRAIN_FRACTION)])
 
 
 # ===========================
 # TRAINING
 # ===========================
-def train_models(df):
+def train_models(df, max_workers=TRAIN_MAX_WORKERS, params=None):
     """
     df must have columns: timestamp, aqi (raw historical data).
     This function runs feature engineering internally, then trains.
+    `params` overrides candidate hyperparameters ({name: params}).
+
+    Candidates are fitted concurrently (see src/models/scheduler.py);
+    each model's metrics also carry its fit/predict time and the peak
+    memory of the process that trained it.
+
+    The direct multi-horizon forecaster is trained alongside
+    (DIRECT_MODEL_NAME); its metrics are over the whole 72h path, and
+    the saved one is refit on the full history afterwards.
+
+    Returns (models, metrics, holdout models): the latter are all fitted
+    before the holdout, for an out-of-sample backtest.
     """
+    raw = df
     df = create_lag_features(df)  # adds lag + time features, drops NaN rows
 
-    X = df[FEATURES]
-    y = df[TARGET]
+    # float32 matrix straight from the compact frame (no upcast)
+    X = df[FEATURES].to_numpy()
+    y = df[TARGET].to_numpy()
 
     # ⏳ Time-aware split (NO shuffle — order matters for time series)
-    split_idx = int(len(df) * 0.8)
-    X_train, X_test = X.iloc[:split_idx], X.iloc[split_idx:]
-    y_train, y_test = y.iloc[:split_idx], y.iloc[split_idx:]
+    split_idx = int(len(df) * TRAIN_FRACTION)
+    X_train, X_test = X[:split_idx], X[split_idx:]
+    y_train, y_test = y[:split_idx], y[split_idx:]
 
-    models = {}
-    metrics = {}
+    # Bin codes for the training rows, reused across daily runs
+    cache = BinnedFeatureCache()
+    locations = df["location"].to_numpy()[:split_idx] if "location" in df.columns else None
+    edges, X_train_binned = cache.transform(epoch_hours(df)[:split_idx], X_train, FEATURES, locations)
+    print(f"🗂️ Binned features: {cache.hits} cached row(s), {cache.misses} new")
 
-    # ---------------------------
-    # Linear Regression
-    # ---------------------------
-    lr = LinearRegression()
-    lr.fit(X_train, y_train)
-    y_pred = lr.predict(X_test)
-
-    metrics["LinearRegression"] = {
-        "MAE": mean_absolute_error(y_test, y_pred),
-        "RMSE": mean_squared_error(y_test, y_pred) ** 0.5,
-        "R2": r2_score(y_test, y_pred),
-    }
-    models["LinearRegression"] = lr
-
-    # ---------------------------
-    # Random Forest
-    # ---------------------------
-    rf = RandomForestRegressor(
-        n_estimators=200,
-        random_state=42,
-        n_jobs=-1
-    )
-    rf.fit(X_train, y_train)
-    y_pred = rf.predict(X_test)
+    candidates = {}
+    for name, (cls, model_params, *input_kind) in build_candidates(params).items():
+        if input_kind == ["binned"]:
+            model_params = {**model_params, "bin_edges": edges}
+        candidates[name] = (cls, model_params, *input_kind)
 
-    metrics["RandomForest"] = {
-        "MAE": mean_absolute_error(y_test, y_pred),
-        "RMSE": mean_squared_error(y_test, y_pred) ** 0.5,
-        "R2": r2_score(y_test, y_pred),
-    }
-    models["RandomForest"] = rf
-
-    # ---------------------------
-    # Gradient Boosting
-    # ---------------------------
-    gb = GradientBoostingRegressor(
-        n_estimators=300,
-        learning_rate=0.05,
-        max_depth=3,
-        random_state=42
+    results = fit_candidates(
+        candidates, X_train, y_train, X_test,
+        max_workers=max_workers, feature_names=FEATURES,
+        X_train_binned=X_train_binned
     )
-    gb.fit(X_train, y_train)
-    y_pred = gb.predict(X_test)
 
-    metrics["GradientBoosting"] = {
-        "MAE": mean_absolute_error(y_test, y_pred),
-        "RMSE": mean_squared_error(y_test, y_pred) ** 0.5,
-        "R2": r2_score(y_test, y_pred),
-    }
-    models["GradientBoosting"] = gb
+    models = {}
+    metrics = {}
+
+    for name, (model, y_pred, timing) in results.items():
+        metrics[name] = {
+            "MAE": mean_absolute_error(y_test, y_pred),
+            "RMSE": mean_squared_error(y_test, y_pred) ** 0.5,
+            "R2": r2_score(y_test, y_pred),
+            "fit_sec": timing["fit_sec"],
+            "predict_sec": timing["predict_sec"],
+            "peak_mem_mb": timing["peak_mem_mb"],
+        }
+        models[name] = model
+
+    print("🔭 Training direct multi-horizon forecaster...")
+    holdout_models = dict(models)
+    (models[DIRECT_MODEL_NAME], metrics[DIRECT_MODEL_NAME],
+     holdout_models[DIRECT_MODEL_NAME]) = train_direct_forecaster(raw, test_start_hour(df))
 
     print("✅ Forecasting models trained successfully.")
-    return models, metrics
\ No newline at end of file
+    return models, metrics, holdout_models
@@ -0,0 +1,257 @@
+"""
+Budgeted hyperparameter search (successive halving over time-series folds).
+
+For each tunable candidate, a handful of configurations are scored on the
+most recent CV fold only; the best 1/HPO_ETA move on and are scored on
+more (older) folds, and so on until the survivors have seen every fold.
+Poor configurations are dropped after one cheap fit instead of a full CV.
+
+Configurations of a rung run in parallel in a spawned process pool. The
+whole search has a hard wall-clock budget: whatever is still running at
+the deadline is terminated and the best configuration from the deepest
+completed evaluations wins.
+
+Warm start: the previous run's best configuration (HPO_STATE_PATH) is
+always evaluated first, and the other configurations are its one-step
+neighbours in the grid rather than random draws — fewer of them, so the
+daily search gets cheaper once it has settled.
+"""
+import json
+import math
+import multiprocessing
+import os
+import time
+from datetime import date
+
+import numpy as np
+
+from src.features.feature_engineering import create_lag_features, epoch_hours, FEATURES, TARGET
+from src.models.cross_validation import expanding_folds, prepare_folds, run_fold
+from src.models.train_models import CANDIDATES
+from src.utils.config import (
+    CV_CACHE_DIR,
+    HPO_BUDGET_SEC,
+    HPO_ETA,
+    HPO_COLD_CONFIGS,
+    HPO_WARM_CONFIGS,
+    HPO_STATE_PATH,
+    TRAIN_MAX_WORKERS,
+)
+from src.utils.io import write_json_atomic
+
+
+# Grid per tunable candidate (values in increasing "size" order)
+SEARCH_SPACES = {
+    "RandomForest": {
+        "n_estimators": [100, 200, 400],
+        "max_depth": [8, 16, None],
+        "min_samples_leaf": [1, 2, 5],
+        "max_features": [0.5, 1.0],
+    },
+    "GradientBoosting": {
+        "n_estimators": [150, 300, 600],
+        "learning_rate": [0.02, 0.05, 0.1],
+        "max_depth": [2, 3, 4],
+        "subsample": [0.8, 1.0],
+    },
+    "HistGradientBoosting": {
+        "learning_rate": [0.03, 0.05, 0.1],
+        "max_leaf_nodes": [15, 31, 63],
+        "n_iter_no_change": [10, 20],
+    },
+}
+
+
+# ===========================
+# STATE
+# ===========================
+def load_best_params(path=HPO_STATE_PATH):
+    """{model name: params} from the previous search (empty if none)."""
+    try:
+        with open(path) as f:
+            return {name: entry["params"] for name, entry in json.load(f).items()}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+# ===========================
+# CONFIGURATIONS
+# ===========================
+def _grid_params(base, space):
+    """The part of `base` that lives in the grid (snapped to grid values)."""
+    return {k: (base.get(k) if base.get(k) in values else values[len(values) // 2])
+            for k, values in space.items()}
+
+
+def sample_configs(space, n, rng, incumbent=None, neighbours=True):
+    """
+    Up to n distinct configurations. The incumbent (if any) comes first,
+    then its one-step grid neighbours (if `neighbours`), then random grid
+    points.
+    """
+    configs = []
+
+    def add(cfg):
+        if cfg not in configs:
+            configs.append(cfg)
+
+    if incumbent is not None:
+        add(incumbent)
+    if incumbent is not None and neighbours:
+        adjacent = []
+        for key, values in space.items():
+            i = values.index(incumbent[key])
+            for j in (i - 1, i + 1):
+                if 0 <= j < len(values):
+                    adjacent.append({**incumbent, key: values[j]})
+        for idx in rng.permutation(len(adjacent)):
+            if len(configs) >= n:
+                break
+            add(adjacent[idx])
+
+    tries = 0
+    while len(configs) < n and tries < 50 * n:
+        add({k: values[rng.integers(len(values))] for k, values in space.items()})
+        tries += 1
+    return configs
+
+
+# ===========================
+# SUCCESSIVE HALVING
+# ===========================
+def _rung_sizes(n_folds, eta):
+    """Folds seen by the survivors of each rung: 1, eta, eta², … n_folds."""
+    sizes, size = [], 1
+    while size < n_folds:
+        sizes.append(size)
+        size *= eta
+    return sizes + [n_folds]
+
+
+def successive_halving(name, base_params, binned, configs, fold_dirs, deadline,
+                       eta=HPO_ETA, max_workers=TRAIN_MAX_WORKERS):
+    """
+    Race `configs` over fold_dirs (oldest first). Returns a list of
+    {"params", "scores"} for every configuration, scores keyed by fold.
+    """
+    cls = CANDIDATES[name][0]
+    newest_first = list(reversed(fold_dirs))
+    trials = [{"params": cfg, "scores": {}} for cfg in configs]
+    alive = list(trials)
+    if time.monotonic() >= deadline:
+        return trials
+
+    workers = max(1, min(max_workers, len(configs)))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    # Always a pool, even with one worker: a fit still running at the
+    # deadline can only be stopped by terminating its process
+    pool = multiprocessing.get_context("spawn").Pool(workers)
+    try:
+        for n_seen in _rung_sizes(len(fold_dirs), eta):
+            pending = []
+            for trial in alive:
+                params = {**base_params, **trial["params"]}
+                if params.get("n_jobs") == -1:
+                    params["n_jobs"] = threads
+                for fold_dir in newest_first[:n_seen]:
+                    if fold_dir not in trial["scores"]:
+                        pending.append((trial, fold_dir, (name, cls, params, binned, fold_dir)))
+
+            handles = [(trial, fold_dir, pool.apply_async(run_fold, (task,)))
+                       for trial, fold_dir, task in pending]
+            for trial, fold_dir, handle in handles:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return trials
+                try:
+                    trial["scores"][fold_dir] = handle.get(timeout=remaining)["RMSE"]
+                except multiprocessing.TimeoutError:
+                    return trials
+
+            # Keep the best 1/eta (by mean RMSE over the folds seen so far)
+            alive.sort(key=lambda t: np.mean(list(t["scores"].values())))
+            alive = alive[:max(1, math.ceil(len(alive) / eta))]
+    finally:
+        # Also kills fits still running at the deadline
+        pool.terminate()
+        pool.join()
+    return trials
+
+
+def _best(trials):
+    """Deepest-evaluated trial with the lowest mean RMSE."""
+    scored = [t for t in trials if t["scores"]]
+    if not scored:
+        return None
+    depth = max(len(t["scores"]) for t in scored)
+    deepest = [t for t in scored if len(t["scores"]) == depth]
+    return min(deepest, key=lambda t: np.mean(list(t["scores"].values())))
+
+
+def tune(df, budget_sec=HPO_BUDGET_SEC, state_path=HPO_STATE_PATH,
+         cache_dir=CV_CACHE_DIR, max_workers=TRAIN_MAX_WORKERS, seed=None):
+    """
+    Search SEARCH_SPACES for every tunable candidate within budget_sec
+    (shared across models; time a model doesn't use rolls over).
+    Returns {model name: best params} and saves it to state_path.
+    """
+    t0 = time.monotonic()
+    hard_deadline = t0 + budget_sec
+    rng = np.random.default_rng(date.today().toordinal() if seed is None else seed)
+
+    df = create_lag_features(df)
+    hours = epoch_hours(df)
+    folds = expanding_folds(hours)
+    if not folds:
+        print("⚠️ Not enough history for hyperparameter search")
+        return load_best_params(state_path)
+    _, fold_dirs = prepare_folds(df[FEATURES].to_numpy(), df[TARGET].to_numpy(), hours, folds, cache_dir)
+
+    previous = load_best_params(state_path)
+    state = {}
+    names = [n for n in CANDIDATES if n in SEARCH_SPACES]
+
+    for i, name in enumerate(names):
+        cls, base_params, *input_kind = CANDIDATES[name]
+        space = SEARCH_SPACES[name]
+
+        incumbent = _grid_params(previous[name], space) if name in previous else None
+        if incumbent is not None:
+            configs = sample_configs(space, HPO_WARM_CONFIGS, rng, incumbent)
+        else:
+            # Cold start: the hand-set defaults compete with random points
+            defaults = _grid_params({**cls().get_params(), **base_params}, space)
+            configs = sample_configs(space, HPO_COLD_CONFIGS, rng, defaults, neighbours=False)
+
+        # Even share of what's left for this and the remaining models
+        now = time.monotonic()
+        deadline = min(hard_deadline, now + (hard_deadline - now) / (len(names) - i))
+
+        trials = successive_halving(
+            name, base_params, input_kind == ["binned"], configs, fold_dirs,
+            deadline, max_workers=max_workers
+        )
+        best = _best(trials)
+        if best is None:
+            # Nothing finished in time: keep yesterday's choice, if any
+            if name in previous:
+                state[name] = {"params": previous[name], "CV_RMSE": None, "folds": 0}
+            print(f"⏱️ {name}: no configuration finished within the budget")
+            continue
+
+        state[name] = {
+            "params": best["params"],
+            "CV_RMSE": float(np.mean(list(best["scores"].values()))),
+            "folds": len(best["scores"]),
+            "configs": len(configs),
+            "fits": sum(len(t["scores"]) for t in trials),
+            "warm_start": incumbent is not None,
+        }
+        print(f"🎯 {name}: {state[name]['params']} "
+              f"(RMSE {state[name]['CV_RMSE']:.3f} over {state[name]['folds']} fold(s), "
+              f"{state[name]['fits']} fit(s))")
+
+    write_json_atomic(state_path, state)
+    print(f"⏱️ Hyperparameter search took {time.monotonic() - t0:.1f}s of {budget_sec}s")
+    return {name: entry["params"] for name, entry in state.items()}
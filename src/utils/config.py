@@ -1,9 +1,114 @@
+import os
+
 # Karachi coordinates
 LATITUDE = 24.8607
 LONGITUDE = 67.0011
 
+# Monitoring points for multi-location ingestion: {name: (lat, lon)}
+LOCATIONS = {
+    "karachi": (LATITUDE, LONGITUDE),
+}
+
 # Open-Meteo API
 OPEN_METEO_URL = "https://air-quality-api.open-meteo.com/v1/air-quality"
+HOURLY_VARIABLES = [
+    "pm2_5",
+    "pm10",
+    "carbon_monoxide",
+    "nitrogen_dioxide",
+    "sulphur_dioxide",
+    "ozone",
+]
+FETCH_MAX_WORKERS = 8
+
+# Shared Open-Meteo rate limiter (token bucket, adapts on 429)
+RATE_LIMIT_PER_SEC = 5.0
+RATE_LIMIT_BURST = 10
+RATE_LIMIT_MIN_PER_SEC = 0.5
+RATE_LIMIT_MAX_RETRIES = 5
+
+# Staged ingestion runner (src/Pipeline/staged.py)
+STAGE_WORKERS = {"fetch": 4, "build": 2, "push": 1}
+STAGE_QUEUE_SIZE = 8
+
+# Raw response cache (settled days are never re-fetched)
+RAW_CACHE_DIR = "artifacts/raw_cache"
+RAW_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Backfill (BOOTSTRAP mode)
+BACKFILL_WINDOW_DAYS = 30
+BACKFILL_MAX_WORKERS = 4
+BACKFILL_CHECKPOINT_DIR = "artifacts/backfill"
+
+# Ingestion watermark (last timestamp pushed, per feature group)
+WATERMARK_PATH = "artifacts/watermark.json"
+WATERMARK_MAX_AGE_DAYS = 7
+
+# pm2_5 tail carried between hourly runs by the incremental feature builder
+FEATURE_STATE_PATH = "artifacts/feature_state.json"
+
+# Rolling pollutant statistics (src/features/rolling.py). Off by default:
+# turning it on adds columns to the feature group schema
+ROLLING_FEATURES_ENABLED = os.getenv("ROLLING_FEATURES", "0") == "1"
+ROLLING_WINDOWS = {"3h": 3, "24h": 24, "7d": 24 * 7}
+ROLLING_STATS = ["mean", "std", "min", "max", "ewma"]
+
+# Feature store backend: "hopsworks" or "local" (partitioned Parquet)
+FEATURE_STORE_BACKEND = os.getenv("FEATURE_STORE_BACKEND", "hopsworks")
+LOCAL_STORE_DIR = os.getenv("LOCAL_STORE_DIR", "artifacts/feature_store")
+LOCAL_STORE_ROW_GROUP_SIZE = 24 * 7
+# Partition / index key for rows without a "location" column
+DEFAULT_LOCATION = "default"
+
+# Event-hour membership index shared by hourly runs and backfills
+DEDUP_INDEX_DIR = os.path.join(LOCAL_STORE_DIR, "_event_index")
+
+# Write-behind buffer in front of push_features
+WRITE_BUFFER_MAX_ROWS = 5000
+WRITE_BUFFER_MAX_AGE_SEC = 60
+WRITE_BUFFER_MAX_PENDING_ROWS = 50000
+WRITE_BUFFER_SPILL_DIR = "artifacts/spill"
+
+# Training: candidate models fitted in parallel worker processes
+TRAIN_MAX_WORKERS = int(os.getenv("TRAIN_MAX_WORKERS", os.cpu_count() or 1))
+
+# Expanding-window cross-validation (model selection)
+CV_FOLDS = 5
+CV_TEST_HOURS = 24 * 7
+CV_MIN_TRAIN_HOURS = 24 * 30
+CV_CACHE_DIR = "artifacts/cv"
+CV_REPORT_PATH = "artifacts/cv_results.json"
+
+# Successive-halving hyperparameter search (daily, hard wall-clock budget
+# shared by all tuned models; the warm start needs far less than a cold one)
+HPO_BUDGET_SEC = int(os.getenv("HPO_BUDGET_SEC", 120))
+HPO_ETA = 3
+HPO_COLD_CONFIGS = 9
+HPO_WARM_CONFIGS = 4
+HPO_STATE_PATH = "artifacts/hpo_best.json"
+
+# HistGradientBoosting candidate: bin codes cached across daily runs
+HGB_MAX_BINS = 255
+HGB_BIN_CACHE_DIR = "artifacts/hgb_bins"
+HGB_BIN_CACHE_MAX_AGE_DAYS = 30
+
+# Direct multi-horizon forecaster (src/models/direct_forecast.py): one
+# model for every hour of the forecast path, trained on origins every
+# DIRECT_ORIGIN_STRIDE hours
+FORECAST_HORIZON_HOURS = 72
+DIRECT_ORIGIN_STRIDE = 2
+
+# Rolling-origin 72h backtest (src/models/backtest.py): every
+# BACKTEST_ORIGIN_STRIDE-th hour of the holdout is a forecast origin
+BACKTEST_ORIGIN_STRIDE = 1
+BACKTEST_REPORT_PATH = "artifacts/backtest.json"
+
+# Forecast cache shared by dashboard processes (src/models/forecast_cache.py):
+# one file per (model artifact, last hour, horizon); entries more than
+# FORECAST_CACHE_KEEP_HOURS behind the newest one are evicted
+FORECAST_CACHE_DIR = "artifacts/forecast_cache"
+FORECAST_CACHE_MAX_ENTRIES = 64
+FORECAST_CACHE_KEEP_HOURS = 24
 
 # Hopsworks Feature Store
 FEATURE_GROUP_NAME = "karachi_air_quality"
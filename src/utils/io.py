@@ -0,0 +1,16 @@
+import json
+import os
+
+
+def write_json_atomic(path, data):
+    """
+    Write `data` as JSON to path via a temp file + os.replace, so readers
+    (and a crash mid-write) see either the old file or the new one.
+    """
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
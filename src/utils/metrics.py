@@ -0,0 +1,34 @@
+import bisect
+import threading
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram (thread-safe). `bounds` are upper bucket
+    edges; values above the last edge land in an overflow bucket.
+    """
+
+    def __init__(self, bounds):
+        self.bounds = sorted(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = None
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds, value)] += 1
+            self.count += 1
+            self.total += value
+            self.max = value if self.max is None else max(self.max, value)
+
+    def snapshot(self):
+        with self._lock:
+            labels = [f"<={b:g}" for b in self.bounds] + [f">{self.bounds[-1]:g}"]
+            return {
+                "count": self.count,
+                "mean": self.total / self.count if self.count else 0.0,
+                "max": self.max,
+                "buckets": dict(zip(labels, self.counts)),
+            }
@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Tests import the pipeline as `src.…`, like the scripts do
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.bench_hist_boosting import make_history  # noqa: E402
+
+
+@pytest.fixture
+def hourly_aqi():
+    """Synthetic hourly AQI history: daily cycle + slow drift + noise."""
+    return make_history
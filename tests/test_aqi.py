@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from src.features.aqi import compute_aqi, compute_aqi_pm25_vectorized, POLLUTANT_BREAKPOINTS, sub_index
+from src.features.build_features import compute_aqi_pm25
+
+
+def _pm25_values():
+    """A dense sweep, every band edge, the gaps between bands and the >500.4 tail."""
+    edges = [v for lo, hi, _, _ in POLLUTANT_BREAKPOINTS["pm2_5"][2] for v in (lo, hi)]
+    gaps = [12.05, 35.45, 55.45, 150.45, 250.45, 350.45]
+    tail = [500.41, 501.0, 650.0, 1000.0]
+    return np.concatenate([np.linspace(0, 520, 5201), edges, gaps, tail, [np.nan]])
+
+
+def test_vectorized_pm25_matches_scalar_exactly():
+    values = _pm25_values()
+    expected = np.array([compute_aqi_pm25(v) for v in values])
+
+    np.testing.assert_array_equal(compute_aqi_pm25_vectorized(values), expected)
+    np.testing.assert_array_equal(compute_aqi(pd.DataFrame({"pm2_5": values}))["aqi"], expected)
+
+
+def test_ozone_uses_the_8hr_table():
+    # 150 ppb sits in the 106-200 ppb → 201-300 band
+    factor = POLLUTANT_BREAKPOINTS["ozone"][0]
+    aqi = sub_index("ozone", [150.5 / factor])[0]
+    assert aqi == 201 + (150 - 106) * (300 - 201) / (200 - 106)
@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from src.features.feature_engineering import create_lag_features, epoch_hours, FEATURES, LAGS, SECONDS_PER_HOUR, TARGET
+from src.models.backtest import backtest, origin_rows
+from src.models.recursive_forecast import recursive_forecast
+from src.models import train_models
+
+HORIZON = 24
+
+
+def _fit(df):
+    features = create_lag_features(df)
+    return LinearRegression().fit(features[FEATURES], features[TARGET])
+
+
+def test_origin_rows_cover_the_holdout_with_full_windows(hourly_aqi):
+    df = hourly_aqi(300)
+    hours = epoch_hours(df)
+
+    # Forecasts start at or after hour 200 and end inside the history
+    rows = origin_rows(df, hours[200], horizon=HORIZON, stride=5)
+    np.testing.assert_array_equal(rows, np.arange(199, len(df) - HORIZON, 5))
+
+    # ...and never before a full lag window
+    assert origin_rows(df, hours[0], horizon=HORIZON, stride=1)[0] == max(LAGS) - 1
+
+
+def test_curves_match_per_origin_forecasts(tmp_path, hourly_aqi):
+    df = hourly_aqi(400)
+    model = _fit(df.iloc[:250])
+    hours = epoch_hours(df)
+    values = df[TARGET].to_numpy(dtype="float64")
+
+    report_path = tmp_path / "backtest.json"
+    report = backtest(df, {"LinearRegression": model}, start_hour=hours[250], horizon=HORIZON,
+                      stride=7, max_workers=1, report_path=str(report_path))
+
+    rows = origin_rows(df, hours[250], horizon=HORIZON, stride=7)
+    err = np.array([
+        recursive_forecast(model, values[row - max(LAGS) + 1:row + 1], hours[row], HORIZON)
+        - values[row + 1:row + 1 + HORIZON]
+        for row in rows
+    ])
+    curves = report["curves"]["LinearRegression"]
+    np.testing.assert_allclose(curves["MAE"], np.abs(err).mean(axis=0), rtol=1e-9)
+    np.testing.assert_allclose(curves["RMSE"], np.sqrt((err ** 2).mean(axis=0)), rtol=1e-9)
+    assert report["origins"] == len(rows)
+    assert report["summary"]["LinearRegression"]["BT_MAE_h1"] == curves["MAE"][0]
+    assert json.loads(report_path.read_text())["curves"] == report["curves"]
+
+
+def test_default_start_is_the_training_holdout(hourly_aqi):
+    df = hourly_aqi(400)
+    report = backtest(df, {"LinearRegression": _fit(df)}, horizon=HORIZON, max_workers=1, report_path=None)
+
+    # The first origin is the hour before the first holdout row
+    start = train_models.test_start_hour(create_lag_features(df))
+    first_origin = pd.Timestamp(report["first_origin"])
+    assert first_origin.value // (SECONDS_PER_HOUR * 10**9) == start - 1
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.features.build_features as bf
+from src.features.build_features import (
+    build_features,
+    build_features_incremental,
+    load_feature_state,
+    save_feature_state,
+    seed_feature_state,
+    ROLLING_SEED_HOURS,
+)
+from src.features.rolling import RollingFeatures
+from src.utils.config import HOURLY_VARIABLES
+
+BOOTSTRAP_HOURS = 240
+
+
+@pytest.fixture
+def raw():
+    """400 hours of raw Open-Meteo rows (timestamp + pollutants)."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"timestamp": pd.date_range("2024-01-01", periods=400, freq="h", tz="UTC")})
+    for col in HOURLY_VARIABLES:
+        df[col] = rng.uniform(5, 120, len(df))
+    return df
+
+
+@pytest.fixture(autouse=True)
+def rolling_enabled(monkeypatch):
+    monkeypatch.setattr(bf, "ROLLING_FEATURES_ENABLED", True)
+
+
+def _batch(raw):
+    """One build_features over the whole history, from the first hourly run on."""
+    features = build_features(raw, rolling=RollingFeatures())
+    return features[features["timestamp"] > raw["timestamp"].iloc[BOOTSTRAP_HOURS - 1]]
+
+
+def _hourly_runs(raw, state, state_path):
+    """Hourly runs of a few hours each, the state saved and loaded in between."""
+    out = []
+    for start in range(BOOTSTRAP_HOURS, len(raw), 7):
+        # Each fetch overlaps the previous one, like main.py's day-aligned start
+        fetched = raw.iloc[start - 5:start + 7]
+        features, state = build_features_incremental(fetched, state)
+        save_feature_state("aqi", state, path=state_path)
+        state = load_feature_state("aqi", path=state_path)
+        out.append(features)
+    return pd.concat(out)
+
+
+def test_hourly_runs_match_one_batch_build(raw, tmp_path):
+    # Fresh state: the bootstrap build hands its engine over to the state
+    rolling = RollingFeatures()
+    build_features(raw.iloc[:BOOTSTRAP_HOURS], rolling=rolling)
+    state = seed_feature_state(raw.iloc[:BOOTSTRAP_HOURS], rolling=rolling)
+
+    incremental = _hourly_runs(raw, state, str(tmp_path / "state.json"))
+    pd.testing.assert_frame_equal(incremental, _batch(raw))
+
+
+def test_stale_state_reseed_matches_one_batch_build(raw, tmp_path):
+    # main.py with a stale state: reseed from ROLLING_SEED_HOURS before the watermark
+    seed = raw.iloc[BOOTSTRAP_HOURS - ROLLING_SEED_HOURS:BOOTSTRAP_HOURS]
+    state = seed_feature_state(seed)
+
+    incremental = _hourly_runs(raw, state, str(tmp_path / "state.json"))
+    expected = _batch(raw)
+
+    # Every window statistic only looks ROLLING_SEED_HOURS back: identical
+    ewma = [c for c in expected.columns if "_ewma_" in c]
+    pd.testing.assert_frame_equal(incremental.drop(columns=ewma), expected.drop(columns=ewma))
+
+    # The EWMA has unbounded memory, so the reseeded one differs by at most
+    # the value range, decayed over the hours since the seed started
+    engine = RollingFeatures()
+    hours_since_seed = np.arange(1, len(expected) + 1) + ROLLING_SEED_HOURS
+    for col in ewma:
+        pollutant, label = col.split("_ewma_")
+        alpha = engine.accumulators[(pollutant, label)].alpha
+        bound = np.ptp(raw[pollutant]) * (1 - alpha) ** hours_since_seed + 1e-4
+        assert (np.abs(incremental[col].to_numpy() - expected[col].to_numpy()) <= bound).all(), col
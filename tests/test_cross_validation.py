@@ -0,0 +1,37 @@
+from sklearn.linear_model import LinearRegression
+
+from src.models.cross_validation import cross_validate
+
+CANDIDATES = {"LinearRegression": (LinearRegression, {})}
+
+
+def _cv(df, tmp_path):
+    return cross_validate(df, candidates=CANDIDATES, n_folds=3, test_hours=24, min_train_hours=24 * 5,
+                          max_workers=1, cache_dir=str(tmp_path / "cv"), report_path=None)
+
+
+def test_unchanged_folds_are_reused(tmp_path, hourly_aqi):
+    full = hourly_aqi(24 * 13)
+    history = full.iloc[:24 * 12]
+
+    first = _cv(history, tmp_path)
+    assert (first["computed"], first["reused"]) == (3, 0)
+
+    again = _cv(history, tmp_path)
+    assert (again["computed"], again["reused"]) == (0, 3)
+    assert again["summary"] == first["summary"]
+
+    # One more day: a new fold, the two before it are read back
+    longer = _cv(full, tmp_path)
+    assert (longer["computed"], longer["reused"]) == (1, 2)
+
+
+def test_backfilled_rows_refit_their_folds(tmp_path, hourly_aqi):
+    history = hourly_aqi(24 * 12)
+    _cv(history, tmp_path)
+
+    # A rewrite inside the newest test window only touches that fold
+    backfilled = history.copy()
+    backfilled.loc[len(history) - 5, "aqi"] += 10
+    report = _cv(backfilled, tmp_path)
+    assert (report["computed"], report["reused"]) == (1, 2)
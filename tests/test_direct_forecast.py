@@ -0,0 +1,22 @@
+import numpy as np
+
+from src.models.direct_forecast import DirectForecaster, HourlySeries, train_direct_forecaster
+
+
+def test_train_scores_holdout_then_refits_on_everything(hourly_aqi, monkeypatch):
+    df = hourly_aqi(1200)
+    split_hour = HourlySeries.from_frame(df).start + 960
+
+    fits = []
+    fit = DirectForecaster.fit
+
+    def recording_fit(self, frame, until_hour=None):
+        fits.append(until_hour)
+        return fit(self, frame, until_hour=until_hour)
+
+    monkeypatch.setattr(DirectForecaster, "fit", recording_fit)
+    model, metrics, holdout = train_direct_forecaster(df, split_hour, max_iter=20)
+
+    assert fits == [split_hour, None]
+    assert model is not holdout
+    assert np.isfinite(metrics["MAE"]) and metrics["fit_sec"] > 0
@@ -0,0 +1,34 @@
+import pandas as pd
+
+from src.features.feature_engineering import create_lag_features
+
+
+def test_lags_follow_the_hour_not_the_row(hourly_aqi):
+    df = hourly_aqi(100)
+    gapped = df.drop(index=[70])
+
+    out = create_lag_features(gapped).set_index("timestamp")
+    ts = df["timestamp"]
+    # The hour after the gap has no 1h lag, so it is dropped...
+    assert ts[71] not in out.index
+    # ...and a later row's 24h lag is still the value exactly 24h back
+    assert out.loc[ts[95], "aqi_lag_24"] == df["aqi"].astype(out["aqi_lag_24"].dtype)[71]
+
+
+def test_repeated_hours_keep_the_latest_row(hourly_aqi):
+    df = hourly_aqi(100)
+    repeat = df.iloc[[80]].assign(aqi=999.0)
+    out = create_lag_features(pd.concat([df, repeat], ignore_index=True))
+
+    assert out["timestamp"].is_unique
+    assert len(out) == len(df) - 48
+    row = out.set_index("timestamp").loc[df["timestamp"][81]]
+    assert row["aqi_lag_1"] == 999.0
+
+
+def test_repeated_hours_are_per_location(hourly_aqi):
+    karachi = hourly_aqi(100).assign(location="karachi")
+    lahore = hourly_aqi(100, seed=1).assign(location="lahore")
+    out = create_lag_features(pd.concat([karachi, lahore], ignore_index=True), by="location")
+
+    assert out.groupby("location").size().to_dict() == {"karachi": 52, "lahore": 52}
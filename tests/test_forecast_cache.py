@@ -0,0 +1,80 @@
+import joblib
+import pandas as pd
+
+from src.models.forecast_cache import ForecastCache, load_artifact
+
+HORIZON = 72
+ROWS = 24 * 7
+
+
+def _forecast(value=1.0):
+    return pd.DataFrame({"timestamp": pd.date_range("2024-02-01", periods=3, freq="h", tz="UTC"),
+                         "aqi_predicted": [value] * 3})
+
+
+def _calls(cache, model_hash, history, rows=ROWS):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return _forecast()
+
+    _, hit = cache.get_or_compute(model_hash, history, HORIZON, rows, compute)
+    return hit, len(calls)
+
+
+def test_hit_after_miss(tmp_path, hourly_aqi):
+    cache = ForecastCache(root=tmp_path)
+    history = hourly_aqi(400)
+
+    assert _calls(cache, "a" * 64, history) == (False, 1)
+    assert _calls(cache, "a" * 64, history) == (True, 0)
+    assert _calls(cache, "b" * 64, history) == (False, 1)
+
+
+def test_rewrite_anywhere_in_the_window_misses(tmp_path, hourly_aqi):
+    cache = ForecastCache(root=tmp_path)
+    history = hourly_aqi(400)
+    _calls(cache, "a" * 64, history)
+
+    # Older than max(LAGS), but still inside the rows the forecast reads
+    backfilled = history.copy()
+    backfilled.loc[len(history) - 100, "aqi"] += 5
+    assert _calls(cache, "a" * 64, backfilled) == (False, 1)
+
+    # Outside the window: same forecast
+    backfilled = history.copy()
+    backfilled.loc[0, "aqi"] += 5
+    assert _calls(cache, "a" * 64, backfilled) == (True, 0)
+
+
+def test_key_follows_the_loaded_model(tmp_path, hourly_aqi):
+    path = tmp_path / "model.joblib"
+    joblib.dump({"version": 1}, path)
+    model, model_hash = load_artifact(path)
+
+    # A retrain replaces the file; the loaded model's hash doesn't change
+    joblib.dump({"version": 2}, path)
+    assert model == {"version": 1}
+    assert load_artifact(path)[1] != model_hash
+
+    cache = ForecastCache(root=tmp_path / "cache")
+    history = hourly_aqi(400)
+    _calls(cache, model_hash, history)
+    assert _calls(cache, model_hash, history) == (True, 0)
+
+
+def test_eviction(tmp_path, hourly_aqi):
+    cache = ForecastCache(root=tmp_path, max_entries=2, keep_hours=24)
+    history = hourly_aqi(400)
+
+    # Entries a day behind the newest go on the next write...
+    _calls(cache, "a" * 64, history.iloc[:300])
+    _calls(cache, "a" * 64, history)
+    assert len(cache) == 1
+
+    # ...and beyond max_entries the least recently used
+    for end in [398, 399]:
+        _calls(cache, "a" * 64, history.iloc[:end])
+    assert len(cache) == 2
+    assert _calls(cache, "a" * 64, history) == (False, 1)
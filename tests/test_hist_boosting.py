@@ -0,0 +1,49 @@
+import numpy as np
+
+from src.models.hist_boosting import BinnedFeatureCache
+
+FEATURES = ["a", "b"]
+
+
+def _rows(n, seed):
+    return np.random.default_rng(seed).normal(size=(n, len(FEATURES))).astype("float32")
+
+
+def test_cache_reuses_unchanged_rows(tmp_path):
+    hours = np.arange(1000, 1100)
+    X = _rows(100, 0)
+
+    _, codes = BinnedFeatureCache(root=str(tmp_path)).transform(hours, X, FEATURES)
+    cache = BinnedFeatureCache(root=str(tmp_path))
+    _, again = cache.transform(hours, X, FEATURES)
+
+    assert (cache.hits, cache.misses) == (100, 0)
+    np.testing.assert_array_equal(again, codes)
+
+
+def test_cache_keys_on_location_and_hour(tmp_path):
+    hours = np.arange(1000, 1100)
+    karachi, lahore = _rows(100, 0), _rows(100, 1)
+    BinnedFeatureCache(root=str(tmp_path)).transform(hours, karachi, FEATURES, ["karachi"] * 100)
+
+    # Same hours at another location are new rows, not overwrites
+    cache = BinnedFeatureCache(root=str(tmp_path))
+    cache.transform(hours, lahore, FEATURES, ["lahore"] * 100)
+    assert (cache.hits, cache.misses) == (0, 100)
+
+    # ...so both stay cached side by side
+    both = np.concatenate([karachi, lahore])
+    cache.transform(np.concatenate([hours, hours]), both, FEATURES,
+                    ["karachi"] * 100 + ["lahore"] * 100)
+    assert (cache.hits, cache.misses) == (200, 0)
+
+
+def test_cache_misses_changed_rows(tmp_path):
+    hours = np.arange(1000, 1100)
+    X = _rows(100, 0)
+    BinnedFeatureCache(root=str(tmp_path)).transform(hours, X, FEATURES)
+
+    X[:10] += 1
+    cache = BinnedFeatureCache(root=str(tmp_path))
+    cache.transform(hours, X, FEATURES)
+    assert (cache.hits, cache.misses) == (90, 10)
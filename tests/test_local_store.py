@@ -0,0 +1,55 @@
+import pandas as pd
+
+from src.feature_store.local_store import LocalFeatureStore
+
+
+def _batch(hours, start="2024-03-30 12:00"):
+    ts = pd.date_range(start, periods=hours, freq="h", tz="UTC")
+    return pd.DataFrame({
+        "event_id": (ts.asi8 // 10**9).astype("int64"),
+        "timestamp": ts,
+        "pm2_5": [float(i) for i in range(hours)],
+    })
+
+
+def _group(tmp_path):
+    fs = LocalFeatureStore(root=str(tmp_path))
+    return fs.get_or_create_feature_group(
+        "aqi", 1, primary_key=["event_id"], event_time="timestamp"
+    )
+
+
+def test_insert_drops_duplicates_on_first_write(tmp_path):
+    fg = _group(tmp_path)
+    batch = _batch(48)  # spans two monthly partitions
+    dupes = batch.iloc[:5].assign(pm2_5=-1.0)
+    fg.insert(pd.concat([batch, dupes], ignore_index=True))
+
+    out = fg.read()
+    assert len(out) == 48
+    assert out["event_id"].is_unique
+    # keep="last": the later copy of a duplicated key wins
+    assert (out.set_index("event_id").loc[batch["event_id"].iloc[:5], "pm2_5"] == -1.0).all()
+
+
+def test_insert_is_idempotent(tmp_path):
+    fg = _group(tmp_path)
+    batch = pd.concat([_batch(48), _batch(48).iloc[:5]], ignore_index=True)
+
+    fg.insert(batch)
+    first = fg.read()
+    fg.insert(batch)
+    second = fg.read()
+
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_insert_upserts_on_primary_key(tmp_path):
+    fg = _group(tmp_path)
+    fg.insert(_batch(24))
+    fg.insert(_batch(24).assign(pm2_5=100.0).iloc[10:])
+
+    out = fg.read()
+    assert len(out) == 24
+    assert (out["pm2_5"].iloc[10:] == 100.0).all()
+    assert (out["pm2_5"].iloc[:10] == range(10)).all()
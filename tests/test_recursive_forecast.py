@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.linear_model import LinearRegression
+
+from src.features.feature_engineering import create_lag_features, epoch_hours, FEATURES, LAGS, TARGET
+from src.models.recursive_forecast import recursive_forecast, recursive_forecast_origins
+
+HORIZON = 72
+
+
+@pytest.fixture(params=["linear", "boosting"])
+def model(request, hourly_aqi):
+    df = create_lag_features(hourly_aqi(600))
+    if request.param == "linear":
+        return LinearRegression().fit(df[FEATURES], df[TARGET])
+    return GradientBoostingRegressor(n_estimators=30, max_depth=3, random_state=0).fit(df[FEATURES], df[TARGET])
+
+
+def baseline_generate_forecast(historical_df, model, days):
+    """Frozen copy of the per-step loop ui/utils.generate_forecast ran before the kernel."""
+    hours = days * 24
+    max_lag = max(LAGS)
+    history_aqi = list(historical_df["aqi"].tail(max_lag + 1))
+    last_ts = pd.to_datetime(historical_df.iloc[-1]["timestamp"])
+
+    forecasts = []
+    for step in range(hours):
+        next_ts = last_ts + timedelta(hours=1)
+        row = {}
+        for lag in LAGS:
+            row[f"{TARGET}_lag_{lag}"] = history_aqi[-lag]
+        row["hour"] = next_ts.hour
+        row["day"] = next_ts.day
+        row["month"] = next_ts.month
+        row["weekday"] = next_ts.weekday()
+
+        X = pd.DataFrame([row])[FEATURES]
+        aqi_pred = float(model.predict(X)[0])
+        forecasts.append({"timestamp": next_ts, "aqi_predicted": aqi_pred})
+        history_aqi.append(aqi_pred)
+        last_ts = next_ts
+    return pd.DataFrame(forecasts)
+
+
+def test_kernel_matches_baseline_loop(model, hourly_aqi):
+    history = hourly_aqi(300, seed=1)
+    tail = history[TARGET].tail(max(LAGS) + 1).to_numpy(dtype="float64")
+    last_hour = int(epoch_hours(history.tail(1))[0])
+
+    baseline = baseline_generate_forecast(history, model, days=HORIZON // 24)
+    np.testing.assert_allclose(recursive_forecast(model, tail, last_hour, HORIZON),
+                               baseline["aqi_predicted"], rtol=1e-9, atol=1e-9)
+
+
+def test_batched_origins_match_one_at_a_time(model, hourly_aqi):
+    history = hourly_aqi(300, seed=2)
+    origins = np.arange(max(LAGS) - 1, len(history), 17)
+
+    batched = recursive_forecast_origins(model, history, origins, HORIZON, batch_size=4)
+    hours = epoch_hours(history)
+    values = history[TARGET].to_numpy(dtype="float64")
+    for path, row in zip(batched, origins):
+        single = recursive_forecast(model, values[max(0, row - max(LAGS) + 1):row + 1], hours[row], HORIZON)
+        np.testing.assert_allclose(path, single, rtol=1e-12)
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.feature_engineering import epoch_hours
+from src.features.rolling import RollingFeatures
+
+COLUMNS = ["pm2_5", "pm10"]
+
+
+@pytest.fixture
+def pollutants():
+    """600 hours with 80 ingestion gaps and some missing pm2_5 values."""
+    rng = np.random.default_rng(0)
+    ts = pd.date_range("2024-01-01", periods=600, freq="h", tz="UTC")
+    keep = np.ones(len(ts), dtype=bool)
+    keep[rng.choice(len(ts), 80, replace=False)] = False
+    df = pd.DataFrame({"timestamp": ts[keep]})
+    for col in COLUMNS:
+        df[col] = rng.normal(50, 10, len(df))
+    df.loc[rng.choice(len(df), 30, replace=False), "pm2_5"] = np.nan
+    return df
+
+
+def _stream(engine, df):
+    rows = df[COLUMNS].to_dict("records")
+    out = [engine.update(hour, row) for hour, row in zip(epoch_hours(df), rows)]
+    return pd.DataFrame(out, index=df.index)[engine.feature_names]
+
+
+def test_transform_matches_pandas_time_rolling(pollutants):
+    features = RollingFeatures(COLUMNS).transform(pollutants)
+
+    for col in COLUMNS:
+        series = pollutants.set_index("timestamp")[col]
+        for label, hours in RollingFeatures().windows.items():
+            window = series.rolling(f"{hours}h", min_periods=1)
+            for stat in ["mean", "std", "min", "max"]:
+                expected = getattr(window, stat)().to_numpy()
+                np.testing.assert_allclose(features[f"{col}_{stat}_{label}"], expected,
+                                           rtol=1e-9, atol=1e-9)
+
+
+def test_transform_matches_streaming(pollutants):
+    batch = RollingFeatures(COLUMNS).transform(pollutants)
+    stream = _stream(RollingFeatures(COLUMNS), pollutants)
+
+    np.testing.assert_allclose(batch, stream, rtol=1e-9, atol=1e-9)
+
+
+def test_transform_continues_from_previous_rows(pollutants):
+    whole = RollingFeatures(COLUMNS).transform(pollutants)
+
+    engine = RollingFeatures(COLUMNS)
+    head = engine.transform(pollutants.iloc[:250])
+    restored = RollingFeatures.from_state(engine.state())
+    tail = restored.transform(pollutants.iloc[250:])
+    np.testing.assert_allclose(pd.concat([head, tail]), whole, rtol=1e-9, atol=1e-9)
+
+    # ...and streaming picks up where batch mode stopped
+    engine = RollingFeatures(COLUMNS)
+    engine.transform(pollutants.iloc[:250])
+    np.testing.assert_allclose(_stream(engine, pollutants.iloc[250:]), whole.iloc[250:],
+                               rtol=1e-9, atol=1e-9)
+
+
+def test_transform_rejects_hours_before_the_state(pollutants):
+    engine = RollingFeatures(COLUMNS)
+    engine.transform(pollutants.iloc[:100])
+    with pytest.raises(ValueError):
+        engine.transform(pollutants.iloc[50:150])
@@ -0,0 +1,119 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.Pipeline.staged as staged
+from src.feature_store.local_store import LocalFeatureStore
+from src.feature_store.watermark import read_watermark, watermark_key, write_watermark
+from src.Pipeline.staged import Stage, StagedPipeline
+from src.utils.config import HOURLY_VARIABLES
+
+
+def _run_with_timeout(pipeline, items, timeout=10):
+    """pipeline.run(items) on a thread; fails the test instead of hanging."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["metrics"] = pipeline.run(items)
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "pipeline deadlocked"
+    return outcome
+
+
+def test_pipeline_drains_every_item_in_order():
+    seen = []
+    pipeline = StagedPipeline([
+        Stage("double", lambda x: x * 2, queue_size=2),
+        Stage("drop_thirds", lambda x: None if x % 3 == 0 else x + 1, queue_size=2),
+        Stage("sink", seen.append, queue_size=2),
+    ])
+    outcome = _run_with_timeout(pipeline, range(100))
+
+    expected = [x * 2 + 1 for x in range(100) if (x * 2) % 3]
+    assert seen == expected
+    stages = outcome["metrics"]["stages"]
+    assert [stages[name]["items"] for name in ["double", "drop_thirds", "sink"]] == [100, 100, len(expected)]
+
+
+def test_parallel_workers_drain_everything():
+    seen, lock = [], threading.Lock()
+
+    def sink(x):
+        with lock:
+            seen.append(x)
+
+    pipeline = StagedPipeline([Stage("square", lambda x: x * x, workers=4), Stage("sink", sink, workers=3)])
+    _run_with_timeout(pipeline, range(200))
+    assert sorted(seen) == [x * x for x in range(200)]
+
+
+def test_stage_error_raises_without_deadlock():
+    def explode(x):
+        if x == 5:
+            raise ValueError("bad item")
+        return x
+
+    # Tiny queues and a slow sink: upstream workers are blocked on full
+    # queues when the failure happens
+    pipeline = StagedPipeline([
+        Stage("fetch", lambda x: x, queue_size=1),
+        Stage("build", explode, queue_size=1),
+        Stage("push", lambda x: time.sleep(0.01), queue_size=1),
+    ])
+    outcome = _run_with_timeout(pipeline, range(1000))
+
+    assert isinstance(outcome.get("error"), RuntimeError)
+    assert "build" in str(outcome["error"])
+
+
+def test_queue_depth_metrics():
+    # Fast producer, slow consumer: the consumer's inbox fills up to its bound
+    pipeline = StagedPipeline([
+        Stage("fast", lambda x: x, queue_size=4),
+        Stage("slow", lambda x: time.sleep(0.005), queue_size=3),
+    ])
+    metrics = _run_with_timeout(pipeline, range(60))["metrics"]["stages"]
+
+    slow = metrics["slow"]
+    assert 1 <= slow["queue_depth_max"] <= 3
+    assert 0 < slow["queue_depth_mean"] <= slow["queue_depth_max"]
+    assert slow["items"] == 60 and slow["busy_sec"] > 0
+    assert 0 < slow["utilization"] <= 1
+
+
+@pytest.fixture
+def raw_fetch(monkeypatch):
+    """fetch_openmeteo_data stand-in: synthetic pollutants for any date range."""
+    def fetch(start, end, latitude=None, longitude=None, cache=None):
+        ts = pd.date_range(start, pd.Timestamp(end) + pd.Timedelta(hours=23), freq="h", tz="UTC")
+        rng = np.random.default_rng(len(ts))
+        return pd.DataFrame({"timestamp": ts, **{c: rng.uniform(5, 80, len(ts)) for c in HOURLY_VARIABLES}})
+
+    monkeypatch.setattr(staged, "fetch_openmeteo_data", fetch)
+
+
+def test_backfill_never_moves_the_watermark_back(tmp_path, monkeypatch, raw_fetch):
+    monkeypatch.chdir(tmp_path)
+    fg = LocalFeatureStore(root=str(tmp_path / "store")).get_or_create_feature_group(
+        "aqi", 1, primary_key=["event_id"], event_time="timestamp"
+    )
+    key = watermark_key(fg)
+    hourly = pd.Timestamp("2024-06-01 12:00", tz="UTC")
+    write_watermark(key, hourly)
+
+    metrics = staged.run_staged_ingestion(fg, {"karachi": (24.86, 67.0)}, "2024-03-01", "2024-03-03")
+    assert metrics["rows"] > 0
+    assert read_watermark(key) == hourly
+
+    # A run past the watermark still advances it
+    staged.run_staged_ingestion(fg, {"karachi": (24.86, 67.0)}, "2024-06-02", "2024-06-03")
+    assert read_watermark(key) == pd.Timestamp("2024-06-03 23:00", tz="UTC")
@@ -0,0 +1,60 @@
+import json
+import time
+
+import numpy as np
+
+from src.models import tuning
+from src.utils.config import HPO_WARM_CONFIGS
+
+# Enough for CV_FOLDS weekly test windows after CV_MIN_TRAIN_HOURS
+ROWS = 24 * 70
+
+
+def _one_step_apart(a, b):
+    return sum(a[k] != b[k] for k in a) == 1
+
+
+def test_tune_stays_within_budget(tmp_path, hourly_aqi):
+    budget_sec = 3
+    t0 = time.monotonic()
+    tuning.tune(hourly_aqi(ROWS), budget_sec=budget_sec, state_path=str(tmp_path / "hpo.json"),
+                cache_dir=str(tmp_path / "cv"), max_workers=2, seed=0)
+
+    # Fits still running at the deadline are terminated, not waited for
+    assert time.monotonic() - t0 < budget_sec + 2
+    assert (tmp_path / "hpo.json").exists()
+
+
+def test_warm_start_tries_incumbent_and_neighbours_first(tmp_path, hourly_aqi, monkeypatch):
+    incumbents = {name: {k: values[0] for k, values in space.items()}
+                  for name, space in tuning.SEARCH_SPACES.items()}
+    state_path = tmp_path / "hpo.json"
+    state_path.write_text(json.dumps({name: {"params": params} for name, params in incumbents.items()}))
+
+    raced = {}
+
+    def recording_halving(name, base_params, binned, configs, fold_dirs, deadline, **kwargs):
+        raced[name] = configs
+        return []
+
+    monkeypatch.setattr(tuning, "successive_halving", recording_halving)
+    best = tuning.tune(hourly_aqi(ROWS), budget_sec=1, state_path=str(state_path),
+                       cache_dir=str(tmp_path / "cv"), seed=0)
+
+    assert raced.keys() == incumbents.keys()
+    for name, configs in raced.items():
+        assert configs[0] == incumbents[name]
+        assert len(configs) == HPO_WARM_CONFIGS
+        assert all(_one_step_apart(cfg, incumbents[name]) for cfg in configs[1:])
+
+    # Nothing finished: yesterday's choice is kept
+    assert best == incumbents
+
+
+def test_sample_configs_are_distinct_grid_points():
+    space = tuning.SEARCH_SPACES["GradientBoosting"]
+    configs = tuning.sample_configs(space, 9, np.random.default_rng(0))
+
+    assert len(configs) == 9
+    assert len({json.dumps(c, sort_keys=True) for c in configs}) == 9
+    assert all(c[k] in space[k] for c in configs for k in space)
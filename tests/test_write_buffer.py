@@ -0,0 +1,108 @@
+import os
+from types import SimpleNamespace
+
+import pandas as pd
+
+from src.feature_store.dedup_index import EventIdIndex
+from src.feature_store.write_buffer import WriteBehindBuffer
+
+FG = SimpleNamespace(name="aqi", version=1)
+
+
+def _batch(hours, start="2024-01-01", location=None):
+    ts = pd.date_range(start, periods=hours, freq="h", tz="UTC")
+    df = pd.DataFrame({
+        "event_id": (ts.asi8 // 10**9).astype("int64"),
+        "timestamp": ts,
+        "pm2_5": [float(i) for i in range(hours)],
+    })
+    return df if location is None else df.assign(location=location)
+
+
+class Sink:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.frames = []
+
+    def __call__(self, fg, df):
+        if self.fail:
+            raise OSError("sink down")
+        self.frames.append(df)
+
+
+def _buffer(tmp_path, sink, **kwargs):
+    kwargs.setdefault("max_age", 0.05)
+    return WriteBehindBuffer(FG, spill_dir=str(tmp_path / "spill"), sink=sink, **kwargs)
+
+
+def _spill_files(tmp_path):
+    folder = tmp_path / "spill" / "aqi_v1"
+    return [f for f in os.listdir(folder) if f.endswith(".parquet")]
+
+
+def test_flush_dedupes_across_batches(tmp_path):
+    sink = Sink()
+    # Nothing is due before close(), so both batches go in one flush
+    with _buffer(tmp_path, sink, max_rows=10**6, max_age=60) as buffer:
+        buffer.add(_batch(10))
+        buffer.add(_batch(5).assign(pm2_5=-1.0))
+
+    out = pd.concat(sink.frames, ignore_index=True)
+    assert len(out) == 10
+    assert out["event_id"].is_unique
+    assert (out.sort_values("event_id")["pm2_5"].iloc[:5] == -1.0).all()
+    assert _spill_files(tmp_path) == []
+
+
+def test_failed_flush_stays_spilled_and_is_replayed(tmp_path):
+    flushed = []
+    with _buffer(tmp_path, Sink(fail=True), on_flush=flushed.append) as buffer:
+        buffer.add(_batch(24))
+
+    assert buffer.stats()["pending_rows"] == 24
+    assert flushed == []
+    assert len(_spill_files(tmp_path)) == 1
+
+    # Next run: the spilled batch is recovered and flushed first
+    sink = Sink()
+    with _buffer(tmp_path, sink, on_flush=flushed.append) as buffer:
+        pass
+
+    assert sum(len(df) for df in sink.frames) == 24
+    assert sum(len(df) for df in flushed) == 24
+    assert _spill_files(tmp_path) == []
+
+
+def test_index_marks_rows_only_after_successful_flush(tmp_path):
+    index = EventIdIndex(FG, root=str(tmp_path / "index"))
+    batch = _batch(24)
+
+    with _buffer(tmp_path, Sink(fail=True), on_flush=index.add) as buffer:
+        buffer.add(index.filter_new(batch))
+
+    # The push failed: a retry of the same batch must not be dropped
+    assert len(index.filter_new(batch)) == 24
+
+    # Replaying the spill file indexes its rows
+    with _buffer(tmp_path, Sink(), on_flush=index.add):
+        pass
+    assert index.filter_new(batch).empty
+
+
+def test_index_filters_seen_and_repeated_rows_per_location(tmp_path):
+    index = EventIdIndex(FG, root=str(tmp_path / "index"))
+    index.add(_batch(10, location="a"))
+    index.save()
+
+    index = EventIdIndex(FG, root=str(tmp_path / "index"))
+    batch = pd.concat([
+        _batch(12, location="a"),
+        _batch(12, location="b"),
+        _batch(2, location="b").assign(pm2_5=-1.0),
+    ], ignore_index=True)
+    out = index.filter_new(batch)
+
+    assert len(out[out["location"] == "a"]) == 2
+    assert len(out[out["location"] == "b"]) == 12
+    # Repeats inside the batch keep the last copy
+    assert (out[out["location"] == "b"]["pm2_5"].iloc[-2:] == -1.0).all()
@@ -5,7 +5,6 @@ import plotly.graph_objects as go
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
-import hopsworks
 import os
 from dotenv import load_dotenv
 import numpy as np
@@ -22,7 +21,13 @@ load_dotenv()
 # ===========================
 # ✅ FIX: Import the CORRECT recursive forecast from utils.py
 # ===========================
-from utils import generate_forecast
+from utils import generate_forecast, generate_forecast_direct, HISTORY_ROWS, DIRECT_HISTORY_ROWS
+from src.feature_store.connect import connect_feature_store
+from src.features.schema import apply_dtype_policy
+from src.models.direct_forecast import DIRECT_MODEL_NAME
+from src.models.forecast_cache import ForecastCache, load_artifact
+from src.models.save_model import select_best_model
+from src.utils.config import FORECAST_CACHE_DIR
 
 # ===========================
 # PAGE CONFIGURATION
@@ -528,11 +533,7 @@ def load_historical_data():
                 if attempt > 0:
                     time.sleep(2)
                 
-                project = hopsworks.login(
-                    api_key_value=os.getenv("HOPSWORKS_API_KEY"),
-                    project=os.getenv("HOPSWORKS_PROJECT_NAME")
-                )
-                fs = project.get_feature_store()
+                fs = connect_feature_store()
                 
                 # Try Feature View first (same as training pipeline)
                 df = None
@@ -556,6 +557,7 @@ def load_historical_data():
                     raise Exception("No data returned from Hopsworks")
                 
                 df["timestamp"] = pd.to_datetime(df["timestamp"])
+                df = apply_dtype_policy(df, keep_event_id=False)
                 
                 if "hour" not in df.columns:
                     df["hour"] = df["timestamp"].dt.hour
@@ -626,15 +628,27 @@ def load_historical_data():
     st.error("⚠️ Failed to load data")
     st.stop()
 
-@st.cache_resource(show_spinner=False)
-def get_model_metadata():
-    """Get model metadata from artifacts directory."""
+def artifact_mtimes(*names):
+    """
+    Modification times of artifacts/<name> (None when missing) — passed
+    to the cached loaders below so a retrain invalidates them.
+    """
+    folder = Path(__file__).parent.parent / "artifacts"
+    return tuple(
+        (folder / name).stat().st_mtime if (folder / name).exists() else None
+        for name in names
+    )
+
+@st.cache_data(show_spinner=False)
+def get_model_metadata(mtimes):
+    """Get model metadata from artifacts directory (`mtimes` keys the cache)."""
     metadata = {
         "name": "GradientBoosting",
         "best_model": "GradientBoosting",
         "mae": 0.2776,
         "rmse": 2.0713,
         "r2": 0.9976,
+        "direct_mae": None,
         "status": "✅ Model Loaded"
     }
     
@@ -647,12 +661,14 @@ def get_model_metadata():
                 loaded_metrics = json.load(f)
                 
                 if 'GradientBoosting' in loaded_metrics:
-                    gb_metrics = loaded_metrics['GradientBoosting']
+                    # The one-step model save_models kept as model.joblib
+                    best_name = select_best_model(loaded_metrics)
+                    best_metrics = loaded_metrics[best_name]
                     metadata.update({
-                        "mae": gb_metrics.get('MAE', metadata['mae']),
-                        "rmse": gb_metrics.get('RMSE', metadata['rmse']),
-                        "r2": gb_metrics.get('R2', metadata['r2']),
-                        "best_model": loaded_metrics.get('best_model', 'GradientBoosting')
+                        "mae": best_metrics.get('MAE', metadata['mae']),
+                        "rmse": best_metrics.get('RMSE', metadata['rmse']),
+                        "r2": best_metrics.get('R2', metadata['r2']),
+                        "best_model": best_name
                     })
                 else:
                     metadata.update({
@@ -661,6 +677,11 @@ def get_model_metadata():
                         "r2": loaded_metrics.get('r2', metadata['r2']),
                         "best_model": loaded_metrics.get('best_model', 'GradientBoosting')
                     })
+
+                # The direct forecaster is scored over the whole 72h path:
+                # backtest MAE when there is one, else its holdout MAE
+                direct_metrics = loaded_metrics.get(DIRECT_MODEL_NAME, {})
+                metadata["direct_mae"] = direct_metrics.get('BT_MAE', direct_metrics.get('MAE'))
                 
                 metadata['status'] = "✅ Metrics Loaded"
     except Exception as e:
@@ -668,21 +689,78 @@ def get_model_metadata():
     
     return metadata
 
-@st.cache_resource(show_spinner=False)
-def load_model():
-    """Load the trained model from artifacts directory."""
+@st.cache_data(show_spinner=False)
+def load_model_comparison(mtimes):
+    """
+    Model comparison from the daily training artifacts: one-step holdout
+    scores (metrics.json) next to the rolling-origin 72h backtest
+    (backtest.json). `mtimes` (of those two files) keys the cache.
+    Returns (DataFrame, backtest report) or (None, None).
+    """
+    try:
+        project_root = Path(__file__).parent.parent
+        with open(project_root / "artifacts" / "backtest.json") as f:
+            report = json.load(f)
+        metrics_path = project_root / "artifacts" / "metrics.json"
+        metrics = {}
+        if metrics_path.exists():
+            with open(metrics_path) as f:
+                metrics = json.load(f)
+    except Exception:
+        return None, None
+
+    rows = []
+    for name, bt in report["summary"].items():
+        # The direct model has no one-step score
+        one_step = metrics.get(name, {}) if name != DIRECT_MODEL_NAME else {}
+        rows.append({
+            "Model": name,
+            "MAE (1h)": one_step.get("MAE"),
+            "RMSE (1h)": one_step.get("RMSE"),
+            "R² (1h)": one_step.get("R2"),
+            "72h MAE": bt["BT_MAE"],
+            "72h RMSE": bt["BT_RMSE"],
+            "MAE @ 72h": bt["BT_MAE_h72"],
+            "ms / path": bt["BT_ms_per_path"],
+        })
+    return pd.DataFrame(rows), report
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_model(mtimes):
+    """
+    Load the trained model from artifacts directory. `mtimes` (of
+    model.joblib) keys the cache, so a retrained model is picked up.
+    Returns (model, content hash of the loaded artifact) or (None, None).
+    """
     try:
         project_root = Path(__file__).parent.parent
         model_path = project_root / "artifacts" / "model.joblib"
         
         if model_path.exists():
-            model = joblib.load(model_path)
-            return model
+            return load_artifact(model_path)
         else:
-            return None
+            return None, None
     except Exception as e:
         st.warning(f"⚠️ Could not load model: {str(e)}")
-        return None
+        return None, None
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_direct_model(mtimes):
+    """
+    Load the direct multi-horizon forecaster. `mtimes` (of
+    direct_model.joblib) keys the cache.
+    Returns (model, content hash of the loaded artifact) or (None, None).
+    """
+    try:
+        project_root = Path(__file__).parent.parent
+        model_path = project_root / "artifacts" / "direct_model.joblib"
+        
+        if model_path.exists():
+            return load_artifact(model_path)
+        return None, None
+    except Exception as e:
+        st.warning(f"⚠️ Could not load direct forecaster: {str(e)}")
+        return None, None
 
 # ===========================
 # SHOW INITIAL LOADING STATE
@@ -710,11 +788,12 @@ try:
     progress_bar.progress(60)
     status_text.text("📊 Loading model metadata...")
     
-    model_metadata = get_model_metadata()
+    model_metadata = get_model_metadata(artifact_mtimes("metrics.json"))
     progress_bar.progress(80)
     status_text.text("🤖 Loading prediction model...")
     
-    model = load_model()
+    model, model_hash = load_model(artifact_mtimes("model.joblib"))
+    direct_model, direct_model_hash = load_direct_model(artifact_mtimes("direct_model.joblib"))
     progress_bar.progress(100)
     status_text.text("✅ Ready!")
     
@@ -902,13 +981,42 @@ elif current_aqi > 100:
 # ===========================
 st.markdown("<div class='section-header'>🔮 3-Day Forecast</div>", unsafe_allow_html=True)
 
+# Direct multi-horizon model when trained (one batched predict for the
+# whole path), otherwise the recursive one-step model
+if direct_model is not None:
+    forecast_method = "Direct multi-horizon forecasting"
+    forecast_model_name = DIRECT_MODEL_NAME
+    forecast_score = model_metadata['direct_mae']
+    forecast_score_label = "72h MAE"
+else:
+    forecast_method = "Recursive multi-step forecasting"
+    forecast_model_name = model_metadata['best_model']
+    forecast_score = model_metadata['mae']
+    forecast_score_label = "MAE"
+
 if model is not None:
-    st.info(f"📊 Predictions from {model_metadata['best_model']} (MAE: {model_metadata['mae']:.2f}) — Recursive multi-step forecasting")
+    score_text = f" ({forecast_score_label}: {forecast_score:.2f})" if forecast_score is not None else ""
+    st.info(f"📊 Predictions from {forecast_model_name}{score_text} — {forecast_method}")
 
 st.markdown("<br>", unsafe_allow_html=True)
 
 if model is not None:
-    forecast_df = generate_forecast(historical_df, model, days=3)
+    # Shared on-disk cache: the forecast only changes with the loaded
+    # model (hashed when it was loaded) or the history window it reads,
+    # so reruns and other sessions skip inference entirely
+    project_root = Path(__file__).parent.parent
+    forecast_cache = ForecastCache(root=project_root / FORECAST_CACHE_DIR)
+    forecast_days = 3
+    if direct_model is not None:
+        forecast_df, _ = forecast_cache.get_or_compute(
+            direct_model_hash, historical_df, forecast_days * 24, DIRECT_HISTORY_ROWS,
+            lambda: generate_forecast_direct(historical_df, direct_model, days=forecast_days)
+        )
+    else:
+        forecast_df, _ = forecast_cache.get_or_compute(
+            model_hash, historical_df, forecast_days * 24, HISTORY_ROWS,
+            lambda: generate_forecast(historical_df, model, days=forecast_days)
+        )
     
     if forecast_df is not None and not forecast_df.empty:
         col_left, col_right = st.columns([2, 1])
@@ -973,7 +1081,7 @@ if model is not None:
                 </div>
                 """, unsafe_allow_html=True)
             
-            st.caption(f"Model: {model_metadata['best_model']} | Recursive forecasting")
+            st.caption(f"Model: {forecast_model_name} | {forecast_method}")
     else:
         st.warning("⚠️ Forecast returned empty. Check that historical_df has an 'aqi' column and at least 49 rows.")
 else:
@@ -1185,28 +1293,68 @@ with col2:
 
 st.markdown("#### 🏆 Model Comparison")
 
-metrics_data = {
-    "Model": ["LinearRegression", "RandomForest", "GradientBoosting"],
-    "MAE": [6.9263, 6.9418, 6.5196],
-    "RMSE": [10.7103, 10.2606, 9.7755],
-    "R²": [0.8809, 0.8907, 0.9008]
-}
-metrics_df = pd.DataFrame(metrics_data)
-
-def highlight_best(row):
-    if row["Model"] == "GradientBoosting":
-        return ['background-color: #667eea; color: white;'] * len(row)
-    return ['color: #e0e0e0;'] * len(row)
-
-st.dataframe(
-    metrics_df.style.apply(highlight_best, axis=1)
-                    .format({"MAE": "{:.4f}", "RMSE": "{:.4f}", "R²": "{:.4f}"}),
-    use_container_width=True,
-    hide_index=True
-)
+comparison_df, backtest_report = load_model_comparison(artifact_mtimes("backtest.json", "metrics.json"))
+
+if comparison_df is not None:
+    # Ranked by the error of the 72h forecast; the highlighted row is
+    # the model the forecast above actually came from
+    best_name = comparison_df.loc[comparison_df["72h MAE"].idxmin(), "Model"]
+    active_name = forecast_model_name if model is not None else None
+    comparison_df.insert(1, "Active", np.where(comparison_df["Model"] == active_name, "✅", ""))
+
+    def highlight_best(row):
+        if row["Model"] == active_name:
+            return ['background-color: #667eea; color: white;'] * len(row)
+        return ['color: #e0e0e0;'] * len(row)
+
+    number_columns = [c for c in comparison_df.columns if c not in ("Model", "Active")]
+    st.dataframe(
+        comparison_df.style.apply(highlight_best, axis=1)
+                           .format({c: "{:.4f}" for c in number_columns}, na_rep="—"),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    curves = pd.concat([
+        pd.DataFrame({"Horizon (h)": range(1, len(c["MAE"]) + 1), "MAE": c["MAE"], "Model": name})
+        for name, c in backtest_report["curves"].items()
+    ], ignore_index=True)
+    fig = px.line(curves, x="Horizon (h)", y="MAE", color="Model",
+                  title="72h Backtest: MAE by Forecast Horizon")
+    fig.update_layout(height=350, hovermode='x unified')
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.success(f"✅ **Lowest 72h forecast error: {best_name}**"
+               + (f" | Serving: {active_name}" if active_name else ""))
+    st.caption(
+        f"**Backtest:** {backtest_report['origins']} forecast origins every "
+        f"{backtest_report['stride']}h from {backtest_report['first_origin'][:10]} to "
+        f"{backtest_report['last_origin'][:10]} ({backtest_report['wall_sec']:.1f}s). "
+        f"1h columns are the one-step holdout scores."
+    )
+else:
+    metrics_data = {
+        "Model": ["LinearRegression", "RandomForest", "GradientBoosting"],
+        "MAE": [6.9263, 6.9418, 6.5196],
+        "RMSE": [10.7103, 10.2606, 9.7755],
+        "R²": [0.8809, 0.8907, 0.9008]
+    }
+    metrics_df = pd.DataFrame(metrics_data)
+
+    def highlight_best(row):
+        if row["Model"] == "GradientBoosting":
+            return ['background-color: #667eea; color: white;'] * len(row)
+        return ['color: #e0e0e0;'] * len(row)
+
+    st.dataframe(
+        metrics_df.style.apply(highlight_best, axis=1)
+                        .format({"MAE": "{:.4f}", "RMSE": "{:.4f}", "R²": "{:.4f}"}),
+        use_container_width=True,
+        hide_index=True
+    )
 
-st.success("✅ **Best Model: GradientBoosting** (Lowest MAE & RMSE, Highest R²)")
-st.caption("**Training data:** 8870 samples")
+    st.success("✅ **Best Model: GradientBoosting** (Lowest MAE & RMSE, Highest R²)")
+    st.caption("**Training data:** 8870 samples")
 
 st.divider()
 
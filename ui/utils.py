@@ -11,7 +11,17 @@ import pandas as pd
 _ROOT = Path(__file__).resolve().parent                      # AQI_PREDICTOR/
 sys.path.insert(0, str(_ROOT / "src" / "features"))          # adds src/features/ to path
 
-from src.features.feature_engineering import FEATURES, TARGET, LAGS      # now this works ✅
+from src.features.feature_engineering import TARGET, LAGS, SECONDS_PER_HOUR      # now this works ✅
+from src.models.recursive_forecast import recursive_forecast
+
+# Rows of history each forecast path reads (the forecast cache digests
+# exactly these): the recursive window, and the direct forecaster's
+HISTORY_ROWS = max(LAGS) + 1
+DIRECT_HISTORY_ROWS = 24 * 7
+
+
+def _epoch_hour(ts):
+    return pd.to_datetime(ts, utc=True).value // (SECONDS_PER_HOUR * 10**9)
 
 
 def generate_forecast(historical_df, model, days=3):
@@ -21,8 +31,9 @@ def generate_forecast(historical_df, model, days=3):
     How it works:
       - We keep a rolling window of past AQI values (at least 48 rows,
         because the deepest lag is 48 hours).
-      - Each iteration: build features from that window, predict one hour,
-        append the prediction as the newest "known" AQI, and repeat.
+      - Each step predicts one hour from that window and feeds the
+        prediction back in as the newest "known" AQI. The loop runs in
+        src/models/recursive_forecast.py on preallocated NumPy buffers.
 
     Args:
         historical_df: DataFrame with columns including 'timestamp' and 'aqi'.
@@ -33,45 +44,35 @@ def generate_forecast(historical_df, model, days=3):
         return None
 
     hours = days * 24
-    max_lag = max(LAGS)  # 48 — we need at least this many past rows
 
-    # Keep enough history to compute all lags at every step
-    history_aqi = list(historical_df["aqi"].tail(max_lag + 1))
+    # The window (max(LAGS) + 1 = 49 rows) is laid on consecutive hours
+    # ending at the last timestamp, so a lag is "n rows ago"
+    tail_aqi = historical_df["aqi"].tail(HISTORY_ROWS).to_numpy(dtype="float64")
     last_ts = pd.to_datetime(historical_df.iloc[-1]["timestamp"])
+    last_hour = _epoch_hour(last_ts)
 
-    forecasts = []
-
-    for step in range(hours):
-        # --- 1. Next timestamp ---
-        next_ts = last_ts + timedelta(hours=1)
-
-        # --- 2. Build feature row ---
-        row = {}
-
-        # Lag features: aqi_lag_1 = 1 hour ago, aqi_lag_24 = 24 hours ago, etc.
-        for lag in LAGS:
-            row[f"{TARGET}_lag_{lag}"] = history_aqi[-lag]
-
-        # Time features
-        row["hour"] = next_ts.hour
-        row["day"] = next_ts.day
-        row["month"] = next_ts.month
-        row["weekday"] = next_ts.weekday()
+    predictions = recursive_forecast(model, tail_aqi, last_hour, hours)
 
-        # --- 3. Predict ---
-        X = pd.DataFrame([row])[FEATURES]  # enforce column order
-        aqi_pred = float(model.predict(X)[0])
+    return pd.DataFrame({
+        "timestamp": [last_ts + timedelta(hours=h) for h in range(1, hours + 1)],
+        "aqi_predicted": predictions,
+    })
 
-        # --- 4. Record the prediction ---
-        forecasts.append({
-            "timestamp": next_ts,
-            "aqi_predicted": aqi_pred
-        })
 
-        # --- 5. Feed prediction back as the next "known" value (recursive) ---
-        history_aqi.append(aqi_pred)
+def generate_forecast_direct(historical_df, direct_model, days=3):
+    """
+    Direct multi-horizon AQI forecast (hourly): the whole path comes from
+    one batched predict of the direct forecaster (no feedback loop).
+    Same output columns as generate_forecast.
 
-        # Move timestamp forward
-        last_ts = next_ts
+    Args:
+        historical_df: DataFrame with columns including 'timestamp' and 'aqi'.
+        direct_model:  A fitted src.models.direct_forecast.DirectForecaster.
+        days:          Number of days to forecast.
+    """
+    if historical_df is None or historical_df.empty:
+        return None
 
-    return pd.DataFrame(forecasts)
\ No newline at end of file
+    # The deepest lag is 48h: more history than that doesn't change the path
+    history = historical_df[["timestamp", TARGET]].tail(DIRECT_HISTORY_ROWS)
+    return direct_model.forecast(history, horizon=days * 24)